@@ -0,0 +1,199 @@
+import logging
+from collections import Counter, defaultdict
+
+from django.db import IntegrityError, transaction
+from django.db.models import F
+
+from oscar.core.buffers import WriteBuffer
+from oscar.core.loading import get_classes
+
+UserSearch, UserRecord, ProductRecord, UserProductView = get_classes(
+    'analytics.models', ['UserSearch', 'UserRecord', 'ProductRecord',
+                         'UserProductView'])
+
+logger = logging.getLogger('oscar.analytics')
+
+
+class EventBuffer(WriteBuffer):
+    """
+    Collects analytics events in memory and writes them to the database in
+    batches.
+
+    Counter increments for the same product or user are aggregated, so a
+    flush runs a handful of queries per model no matter how many events were
+    recorded. Flushing happens when the buffer is full, at the end of a
+    request once OSCAR_ANALYTICS_FLUSH_INTERVAL seconds have passed since
+    the last flush, and when the process exits.
+
+    Note that events are only persisted when the buffer is flushed, so the
+    creation dates of user product views and searches are the flush time.
+    """
+    size_setting = 'OSCAR_ANALYTICS_BUFFER_SIZE'
+    interval_setting = 'OSCAR_ANALYTICS_FLUSH_INTERVAL'
+
+    def _reset(self):
+        self.product_counters = defaultdict(Counter)
+        self.user_counters = defaultdict(Counter)
+        self.user_last_orders = {}
+        self.product_views = []
+        self.searches = []
+
+    # Recording events
+
+    def record_product_view(self, product, user=None):
+        def record():
+            self.product_counters[product.pk]['num_views'] += 1
+            if user is not None:
+                self.user_counters[user.pk]['num_product_views'] += 1
+                self.product_views.append((user.pk, product.pk))
+        self.add(record)
+
+    def record_basket_addition(self, product, user=None):
+        def record():
+            self.product_counters[product.pk]['num_basket_additions'] += 1
+            if user is not None:
+                self.user_counters[user.pk]['num_basket_additions'] += 1
+        self.add(record)
+
+    def record_order(self, order, user=None):
+        lines = list(order.lines.values_list('product_id', 'quantity'))
+
+        def record():
+            for product_id, quantity in lines:
+                if product_id is not None:
+                    self.product_counters[product_id]['num_purchases'] += \
+                        quantity
+            if user is not None:
+                self.user_counters[user.pk].update({
+                    'num_orders': 1,
+                    'num_order_lines': len(lines),
+                    'num_order_items': sum(qty for __, qty in lines),
+                    'total_spent': order.total_incl_tax})
+                self._set_last_order(user.pk, order.date_placed)
+        self.add(record)
+
+    def record_search(self, query, user):
+        def record():
+            self.searches.append((user.pk, query))
+        self.add(record)
+
+    def _set_last_order(self, user_id, date_placed):
+        last_order = self.user_last_orders.get(user_id)
+        if last_order is None or date_placed > last_order:
+            self.user_last_orders[user_id] = date_placed
+
+    # Flushing
+
+    def get_contents(self):
+        return {
+            'product_counters': self.product_counters,
+            'user_counters': self.user_counters,
+            'user_last_orders': self.user_last_orders,
+            'product_views': self.product_views,
+            'searches': self.searches,
+        }
+
+    def merge(self, contents):
+        for counters, unwritten in (
+                (self.product_counters, contents['product_counters']),
+                (self.user_counters, contents['user_counters'])):
+            for key, increments in unwritten.items():
+                counters[key].update(increments)
+        for user_id, date_placed in contents['user_last_orders'].items():
+            self._set_last_order(user_id, date_placed)
+        self.product_views[:0] = contents['product_views']
+        self.searches[:0] = contents['searches']
+
+    def write(self, contents):
+        with transaction.atomic():
+            self.update_records(
+                ProductRecord, 'product_id', contents['product_counters'])
+            user_values = {
+                user_id: {'date_last_order': date}
+                for user_id, date in contents['user_last_orders'].items()}
+            self.update_records(
+                UserRecord, 'user_id', contents['user_counters'],
+                user_values)
+
+            UserProductView._default_manager.bulk_create([
+                UserProductView(user_id=user_id, product_id=product_id)
+                for user_id, product_id in contents['product_views']])
+            UserSearch._default_manager.bulk_create([
+                UserSearch(user_id=user_id, query=query)
+                for user_id, query in contents['searches']])
+
+    def update_records(self, model, key_field, increments, values=None):
+        """
+        Apply the buffered counter increments to the records of a model.
+
+        Missing records are bulk created with the increments as their initial
+        values. Existing records that need the same increments are updated
+        with a single query.
+
+        :param model: The model class of the recording model
+        :param key_field: The name of the field identifying the record, e.g.
+                          ``product_id``
+        :param increments: A mapping of key to a mapping of counter field name
+                           to increment
+        :param values: An optional mapping of key to a mapping of field name
+                       to value that gets set on the record as is
+        """
+        if not increments:
+            return
+        values = values or {}
+        manager = model._default_manager
+        keys = set(increments)
+        existing_keys = set(
+            manager.filter(**{'%s__in' % key_field: keys})
+            .order_by().values_list(key_field, flat=True))
+
+        new_records = [
+            model(**self._get_initial_values(
+                key_field, key, increments[key], values.get(key, {})))
+            for key in keys - existing_keys]
+        if new_records:
+            self._create_records(manager, key_field, new_records, increments,
+                                 values)
+
+        groups = defaultdict(list)
+        for key in existing_keys:
+            group = (frozenset(increments[key].items()),
+                     frozenset(values.get(key, {}).items()))
+            groups[group].append(key)
+        for (group_increments, group_values), group_keys in groups.items():
+            self._update_group(manager, key_field, group_keys,
+                               dict(group_increments), dict(group_values))
+
+    def _create_records(self, manager, key_field, records, increments,
+                        values):
+        try:
+            with transaction.atomic():
+                manager.bulk_create(records)
+        except IntegrityError:
+            # Another process created some of the records in the meantime;
+            # fall back to updating or creating them one by one.
+            logger.warning(
+                "IntegrityError when creating analytics records for %s",
+                manager.model)
+            for record in records:
+                key = getattr(record, key_field)
+                self._update_group(manager, key_field, [key],
+                                   increments[key], values.get(key, {}),
+                                   create=True)
+
+    def _update_group(self, manager, key_field, keys, increments, values,
+                      create=False):
+        updates = {field: F(field) + increment
+                   for field, increment in increments.items()}
+        updates.update(values)
+        affected = manager.filter(
+            **{'%s__in' % key_field: keys}).update(**updates)
+        if create and not affected:
+            manager.create(**self._get_initial_values(
+                key_field, keys[0], increments, values))
+
+    def _get_initial_values(self, key_field, key, increments, values):
+        initial = dict(increments)
+        initial.update(values)
+        initial[key_field] = key
+        return initial
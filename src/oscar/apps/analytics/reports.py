@@ -13,21 +13,19 @@ UserRecord = get_model('analytics', 'UserRecord')
 
 class ProductReportCSVFormatter(ReportCSVFormatter):
     filename_template = 'conditional-offer-performance.csv'
+    streaming = True
 
-    def generate_csv(self, response, products):
-        writer = self.get_csv_writer(response)
-        header_row = [_('Product'),
-                      _('Views'),
-                      _('Basket additions'),
-                      _('Purchases')]
-        writer.writerow(header_row)
+    def get_header_row(self):
+        return [_('Product'),
+                _('Views'),
+                _('Basket additions'),
+                _('Purchases')]
 
-        for record in products:
-            row = [record.product,
-                   record.num_views,
-                   record.num_basket_additions,
-                   record.num_purchases]
-            writer.writerow(row)
+    def get_row(self, record):
+        return [record.product,
+                record.num_views,
+                record.num_basket_additions,
+                record.num_purchases]
 
 
 class ProductReportHTMLFormatter(ReportHTMLFormatter):
@@ -46,7 +44,7 @@ class ProductReportGenerator(ReportGenerator):
         return self.description
 
     def generate(self):
-        records = ProductRecord._default_manager.all()
+        records = ProductRecord._default_manager.select_related('product')
         return self.formatter.generate_response(records)
 
     def is_available_to(self, user):
@@ -55,31 +53,29 @@ class ProductReportGenerator(ReportGenerator):
 
 class UserReportCSVFormatter(ReportCSVFormatter):
     filename_template = 'user-analytics.csv'
-
-    def generate_csv(self, response, users):
-        writer = self.get_csv_writer(response)
-        header_row = [_('Name'),
-                      _('Date registered'),
-                      _('Product views'),
-                      _('Basket additions'),
-                      _('Orders'),
-                      _('Order lines'),
-                      _('Order items'),
-                      _('Total spent'),
-                      _('Date of last order')]
-        writer.writerow(header_row)
-
-        for record in users:
-            row = [record.user.get_full_name(),
-                   self.format_date(record.user.date_joined),
-                   record.num_product_views,
-                   record.num_basket_additions,
-                   record.num_orders,
-                   record.num_order_lines,
-                   record.num_order_items,
-                   record.total_spent,
-                   self.format_datetime(record.date_last_order)]
-            writer.writerow(row)
+    streaming = True
+
+    def get_header_row(self):
+        return [_('Name'),
+                _('Date registered'),
+                _('Product views'),
+                _('Basket additions'),
+                _('Orders'),
+                _('Order lines'),
+                _('Order items'),
+                _('Total spent'),
+                _('Date of last order')]
+
+    def get_row(self, record):
+        return [record.user.get_full_name(),
+                self.format_date(record.user.date_joined),
+                record.num_product_views,
+                record.num_basket_additions,
+                record.num_orders,
+                record.num_order_lines,
+                record.num_order_items,
+                record.total_spent,
+                self.format_datetime(record.date_last_order)]
 
 
 class UserReportHTMLFormatter(ReportHTMLFormatter):
@@ -84,6 +84,10 @@ class AbstractBasket(models.Model):
         self._lines = None
         self.offer_applications = OfferApplications()
 
+        # Set by the Applicator while it applies offers to this basket, so
+        # conditions and benefits can share work between applications.
+        self.offer_evaluation_context = None
+
     def __str__(self):
         return _(
             "%(status)s basket (owner: %(owner)s, lines: %(num_lines)d)") \
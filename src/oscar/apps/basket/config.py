@@ -6,3 +6,6 @@ class BasketConfig(AppConfig):
     label = 'basket'
     name = 'oscar.apps.basket'
     verbose_name = _('Basket')
+
+    def ready(self):
+        from . import receivers  # noqa
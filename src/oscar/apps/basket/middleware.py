@@ -4,13 +4,18 @@ from django.core.signing import BadSignature, Signer
 from django.utils.functional import SimpleLazyObject, empty
 from django.utils.translation import gettext_lazy as _
 
-from oscar.core.loading import get_class, get_model
+from oscar.core.loading import get_class, get_classes, get_model
 
 Applicator = get_class('offer.applicator', 'Applicator')
 Basket = get_model('basket', 'basket')
+BasketSnapshotCache = get_class('basket.snapshots', 'BasketSnapshotCache')
+BasketSummary, BasketSummaryCache = get_classes(
+    'basket.summary', ['BasketSummary', 'BasketSummaryCache'])
 Selector = get_class('partner.strategy', 'Selector')
 
 selector = Selector()
+basket_snapshots = BasketSnapshotCache()
+basket_summaries = BasketSummaryCache()
 
 
 class BasketMiddleware:
@@ -39,6 +44,8 @@ class BasketMiddleware:
             basket = self.get_basket(request)
             basket.strategy = request.strategy
             self.apply_offers_to_basket(request, basket)
+            if basket_summaries.is_enabled():
+                basket_summaries.save(basket)
 
             return basket
 
@@ -57,6 +64,8 @@ class BasketMiddleware:
         # when the attribute is accessed.
         request.basket = SimpleLazyObject(load_full_basket)
         request.basket_hash = SimpleLazyObject(load_basket_hash)
+        request.basket_summary = SimpleLazyObject(
+            lambda: self.get_basket_summary(request))
 
         response = self.get_response(request)
         return self.process_response(request, response)
@@ -176,6 +185,41 @@ class BasketMiddleware:
 
         return basket
 
+    def get_basket_summary(self, request):
+        """
+        Return the summary of the open basket for this request.
+
+        If summaries are cached, this avoids loading the basket unless it
+        changed since it was last loaded. Anonymous users without a basket
+        cookie get an empty summary without any lookups.
+        """
+        basket_is_loaded = not (
+            isinstance(request.basket, SimpleLazyObject)
+            and request.basket._wrapped is empty)
+        if basket_is_loaded or not basket_summaries.is_enabled():
+            return BasketSummary.from_basket(request.basket)
+
+        cookie_key = self.get_cookie_key(request)
+        summary = None
+        if request.user.is_authenticated:
+            # A cookie basket needs to be merged into the user's basket first
+            if cookie_key not in request.COOKIES:
+                summary = basket_summaries.get(user_id=request.user.pk)
+        elif cookie_key in request.COOKIES:
+            try:
+                basket_id = Signer().unsign(request.COOKIES[cookie_key])
+            except BadSignature:
+                pass
+            else:
+                summary = basket_summaries.get(basket_id=basket_id)
+        else:
+            return BasketSummary()
+
+        if summary is None:
+            # Loading the basket caches its summary
+            summary = BasketSummary.from_basket(request.basket)
+        return summary
+
     def merge_baskets(self, master, slave):
         """
         Merge one basket into another.
@@ -203,8 +247,16 @@ class BasketMiddleware:
         return basket
 
     def apply_offers_to_basket(self, request, basket):
-        if not basket.is_empty:
-            Applicator().apply(basket, request.user, request)
+        if basket.is_empty:
+            return
+        # Unchanged baskets can be restored from a snapshot of the last time
+        # offers were applied, if snapshots are enabled.
+        use_snapshots = basket_snapshots.is_enabled()
+        if use_snapshots and basket_snapshots.restore(basket):
+            return
+        Applicator().apply(basket, request.user, request)
+        if use_snapshots:
+            basket_snapshots.save(basket)
 
     def get_basket_hash(self, basket_id):
         return Signer().sign(basket_id)
@@ -0,0 +1,127 @@
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+
+from oscar.core.loading import get_class, get_model
+
+Basket = get_model('basket', 'Basket')
+Line = get_model('basket', 'Line')
+LineAttribute = get_model('basket', 'LineAttribute')
+Product = get_model('catalogue', 'Product')
+ProductCategory = get_model('catalogue', 'ProductCategory')
+StockRecord = get_model('partner', 'StockRecord')
+Range = get_model('offer', 'Range')
+RangeProduct = get_model('offer', 'RangeProduct')
+Voucher = get_model('voucher', 'Voucher')
+BasketSnapshotCache = get_class('basket.snapshots', 'BasketSnapshotCache')
+BasketSummaryCache = get_class('basket.summary', 'BasketSummaryCache')
+
+
+@receiver(post_save, sender=Basket)
+def invalidate_basket_snapshots(sender, instance, **kwargs):
+    BasketSnapshotCache.invalidate_basket(instance.pk)
+
+
+@receiver(post_save, sender=Line)
+@receiver(post_delete, sender=Line)
+def invalidate_basket_snapshots_for_line(sender, instance, **kwargs):
+    BasketSnapshotCache.invalidate_basket(instance.basket_id)
+
+
+@receiver(post_save, sender=LineAttribute)
+@receiver(post_delete, sender=LineAttribute)
+def invalidate_basket_snapshots_for_line_attribute(sender, instance,
+                                                   **kwargs):
+    if BasketSnapshotCache.is_enabled():
+        BasketSnapshotCache.invalidate_basket(instance.line.basket_id)
+
+
+@receiver(m2m_changed, sender=Basket.vouchers.through)
+def invalidate_basket_snapshots_for_vouchers(sender, instance, action,
+                                             reverse, pk_set, **kwargs):
+    if not action.startswith('post_'):
+        return
+    if not reverse:
+        BasketSnapshotCache.invalidate_basket(instance.pk)
+    else:
+        # The vouchers of several baskets changed
+        BasketSnapshotCache.invalidate()
+
+
+@receiver(post_save, sender=Basket)
+def invalidate_basket_summaries(sender, instance, **kwargs):
+    BasketSummaryCache.invalidate(instance)
+
+
+@receiver(post_save, sender=Line)
+@receiver(post_delete, sender=Line)
+def invalidate_basket_summaries_for_line(sender, instance, **kwargs):
+    BasketSummaryCache.invalidate_basket(instance.basket_id)
+
+
+@receiver(post_save, sender=LineAttribute)
+@receiver(post_delete, sender=LineAttribute)
+def invalidate_basket_summaries_for_line_attribute(sender, instance,
+                                                   **kwargs):
+    # Resolving the line costs a query, so only do it if summaries are cached
+    if BasketSummaryCache.is_enabled():
+        BasketSummaryCache.invalidate_basket(instance.line.basket_id)
+
+
+@receiver(m2m_changed, sender=Basket.vouchers.through)
+def invalidate_basket_summaries_for_vouchers(sender, instance, action,
+                                             reverse, pk_set, **kwargs):
+    if not BasketSummaryCache.is_enabled():
+        return
+    if not reverse:
+        if action.startswith('post_'):
+            BasketSummaryCache.invalidate(instance)
+    elif action in ('post_add', 'post_remove', 'pre_clear'):
+        # The vouchers of several baskets change
+        if pk_set is None:
+            baskets = Basket.objects.filter(vouchers=instance)
+        else:
+            baskets = Basket.objects.filter(pk__in=pk_set)
+        for basket in baskets:
+            BasketSummaryCache.invalidate(basket)
+
+
+@receiver(post_save, sender=Product)
+@receiver(post_delete, sender=Product)
+@receiver(post_save, sender=ProductCategory)
+@receiver(post_delete, sender=ProductCategory)
+@receiver(post_delete, sender=StockRecord)
+@receiver(post_save, sender=RangeProduct)
+@receiver(post_delete, sender=RangeProduct)
+@receiver(post_save, sender=Voucher)
+@receiver(post_delete, sender=Voucher)
+def invalidate_all_basket_snapshots(sender, **kwargs):
+    BasketSnapshotCache.invalidate()
+
+
+#: Stock record fields that don't affect prices or offers
+STOCK_LEVEL_FIELDS = frozenset([
+    'num_in_stock', 'num_allocated', 'low_stock_threshold', 'date_updated'])
+
+
+@receiver(post_save, sender=StockRecord)
+def invalidate_all_basket_snapshots_for_stock_record(sender, update_fields=None,
+                                                     **kwargs):
+    # Stock is allocated for every line of every order; that doesn't change
+    # any basket's prices or offers.
+    if update_fields is not None and set(update_fields) <= STOCK_LEVEL_FIELDS:
+        return
+    BasketSnapshotCache.invalidate()
+
+
+def invalidate_basket_snapshots_for_m2m_change(sender, action, **kwargs):
+    if action.startswith('post_'):
+        BasketSnapshotCache.invalidate()
+
+
+for m2m_field in ('excluded_products', 'classes', 'included_categories'):
+    m2m_changed.connect(
+        invalidate_basket_snapshots_for_m2m_change,
+        sender=getattr(Range, m2m_field).through)
+m2m_changed.connect(
+    invalidate_basket_snapshots_for_m2m_change,
+    sender=Voucher.offers.through)
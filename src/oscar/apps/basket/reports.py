@@ -1,3 +1,4 @@
+from django.db.models import Count, Sum
 from django.utils.translation import gettext_lazy as _
 
 from oscar.core.loading import get_class, get_model
@@ -10,35 +11,40 @@ ReportHTMLFormatter = get_class('dashboard.reports.reports',
 Basket = get_model('basket', 'Basket')
 
 
+def get_report_queryset(**filters):
+    """
+    Return the baskets for a report, with their owners and line counts
+    fetched in the same query.
+    """
+    return Basket._default_manager.filter(**filters).select_related(
+        'owner').annotate(report_num_lines=Count('lines'),
+                          report_num_items=Sum('lines__quantity'))
+
+
 class OpenBasketReportCSVFormatter(ReportCSVFormatter):
     filename_template = 'open-baskets-%s-%s.csv'
-
-    def generate_csv(self, response, baskets):
-        writer = self.get_csv_writer(response)
-        header_row = [_('User ID'),
-                      _('Name'),
-                      _('Email'),
-                      _('Basket status'),
-                      _('Num lines'),
-                      _('Num items'),
-                      _('Date of creation'),
-                      _('Time since creation'),
-                      ]
-        writer.writerow(header_row)
-
-        for basket in baskets:
-            if basket.owner:
-                row = [basket.owner_id, basket.owner.get_full_name(),
-                       basket.owner.email,
-                       basket.status, basket.num_lines,
-                       self.format_datetime(basket.date_created),
-                       basket.time_since_creation]
-            else:
-                row = [basket.owner_id, None, None, basket.status,
-                       basket.num_lines, basket.num_items,
-                       self.format_datetime(basket.date_created),
-                       basket.time_since_creation]
-            writer.writerow(row)
+    streaming = True
+
+    def get_header_row(self):
+        return [_('User ID'),
+                _('Name'),
+                _('Email'),
+                _('Basket status'),
+                _('Num lines'),
+                _('Num items'),
+                _('Date of creation'),
+                _('Time since creation'),
+                ]
+
+    def get_row(self, basket):
+        if basket.owner:
+            name, email = basket.owner.get_full_name(), basket.owner.email
+        else:
+            name, email = None, None
+        return [basket.owner_id, name, email, basket.status,
+                basket.report_num_lines, basket.report_num_items or 0,
+                self.format_datetime(basket.date_created),
+                basket.time_since_creation]
 
     def filename(self, **kwargs):
         return self.filename_template % (kwargs['start_date'],
@@ -65,34 +71,32 @@ class OpenBasketReportGenerator(ReportGenerator):
         additional_data = {
             'start_date': self.start_date,
             'end_date': self.end_date}
-        baskets = Basket._default_manager.filter(status=Basket.OPEN)
+        baskets = get_report_queryset(status=Basket.OPEN)
         return self.formatter.generate_response(baskets, **additional_data)
 
 
 class SubmittedBasketReportCSVFormatter(ReportCSVFormatter):
     filename_template = 'submitted_baskets-%s-%s.csv'
-
-    def generate_csv(self, response, baskets):
-        writer = self.get_csv_writer(response)
-        header_row = [_('User ID'),
-                      _('User'),
-                      _('Basket status'),
-                      _('Num lines'),
-                      _('Num items'),
-                      _('Date created'),
-                      _('Time between creation and submission'),
-                      ]
-        writer.writerow(header_row)
-
-        for basket in baskets:
-            row = [basket.owner_id,
-                   basket.owner,
-                   basket.status,
-                   basket.num_lines,
-                   basket.num_items,
-                   self.format_datetime(basket.date_created),
-                   basket.time_before_submit]
-            writer.writerow(row)
+    streaming = True
+
+    def get_header_row(self):
+        return [_('User ID'),
+                _('User'),
+                _('Basket status'),
+                _('Num lines'),
+                _('Num items'),
+                _('Date created'),
+                _('Time between creation and submission'),
+                ]
+
+    def get_row(self, basket):
+        return [basket.owner_id,
+                basket.owner,
+                basket.status,
+                basket.report_num_lines,
+                basket.report_num_items or 0,
+                self.format_datetime(basket.date_created),
+                basket.time_before_submit]
 
     def filename(self, **kwargs):
         return self.filename_template % (kwargs['start_date'],
@@ -120,5 +124,5 @@ class SubmittedBasketReportGenerator(ReportGenerator):
         additional_data = {
             'start_date': self.start_date,
             'end_date': self.end_date}
-        baskets = Basket._default_manager.filter(status=Basket.SUBMITTED)
+        baskets = get_report_queryset(status=Basket.SUBMITTED)
         return self.formatter.generate_response(baskets, **additional_data)
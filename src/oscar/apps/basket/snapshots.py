@@ -0,0 +1,127 @@
+import hashlib
+
+from django.conf import settings
+from django.core.cache import cache
+
+from oscar.core.cache import bump_version, get_versions
+from oscar.core.loading import get_class
+from oscar.core.utils import clone_instance
+
+OfferApplications = get_class('offer.results', 'OfferApplications')
+SiteOfferCache = get_class('offer.cache', 'SiteOfferCache')
+RANGE_INDEX_VERSION_KEY = get_class('offer.utils', 'RANGE_INDEX_VERSION_KEY')
+
+
+class BasketSnapshotCache(object):
+    """
+    Caches the result of applying offers to a basket (the offer applications
+    and the discounts and consumed quantities of every line), so an unchanged
+    basket doesn't need to have its offers re-evaluated on every request.
+
+    A snapshot is keyed by the basket ID, the basket's version (bumped when
+    its lines, line attributes or vouchers change) and the versions of the
+    data offers depend on: the offers themselves, range contents, and the
+    catalogue (products, stock records and vouchers). Any change to these
+    makes the snapshot unreachable.
+
+    Snapshots assume that the pricing strategy and the available offers only
+    depend on the basket (and its owner), and not on anything else in the
+    request; they can be stale for up to OSCAR_BASKET_SNAPSHOT_TIMEOUT
+    seconds when offers or vouchers start or end.
+    """
+    basket_version_key = 'oscar-basket-version-%s'
+    catalogue_version_key = 'oscar-basket-snapshot-catalogue-version'
+
+    @classmethod
+    def is_enabled(cls):
+        return bool(settings.OSCAR_BASKET_SNAPSHOT_TIMEOUT)
+
+    @classmethod
+    def invalidate_basket(cls, basket_id):
+        """
+        Invalidate the snapshots of a basket
+        """
+        if cls.is_enabled():
+            bump_version(cls.basket_version_key % basket_id)
+
+    @classmethod
+    def invalidate(cls):
+        """
+        Invalidate the snapshots of all baskets
+        """
+        if cls.is_enabled():
+            bump_version(cls.catalogue_version_key)
+
+    def get_cache_key(self, basket):
+        keys = [self.basket_version_key % basket.id,
+                self.catalogue_version_key, SiteOfferCache.version_key,
+                RANGE_INDEX_VERSION_KEY]
+        versions = get_versions(keys)
+        strategy = basket.strategy.__class__
+        parts = [versions[key] for key in keys] + [
+            strategy.__module__, strategy.__name__]
+        digest = hashlib.md5('-'.join(parts).encode('utf8')).hexdigest()
+        return 'oscar-basket-snapshot-%s-%s' % (basket.id, digest)
+
+    def save(self, basket):
+        """
+        Store the snapshot of a basket that just had offers applied
+        """
+        lines = {}
+        for line in basket.all_lines():
+            affected_quantity, consumptions = line.consumer.get_state()
+            lines[line.pk] = (
+                line.quantity, line._discount_excl_tax,
+                line._discount_incl_tax, affected_quantity, consumptions)
+
+        applications = []
+        for application in basket.offer_applications:
+            # Store copies without any related objects
+            application = dict(application)
+            application['offer'] = clone_instance(application['offer'])
+            if application['voucher'] is not None:
+                application['voucher'] = clone_instance(
+                    application['voucher'])
+            applications.append(application)
+
+        snapshot = {'lines': lines, 'applications': applications}
+        cache.set(self.get_cache_key(basket), snapshot,
+                  settings.OSCAR_BASKET_SNAPSHOT_TIMEOUT)
+
+    def restore(self, basket):
+        """
+        Apply the snapshot of a basket, if there is one. Returns whether the
+        basket could be restored; if not, offers need to be applied.
+        """
+        snapshot = cache.get(self.get_cache_key(basket))
+        if snapshot is None:
+            return False
+
+        lines = list(basket.all_lines())
+        quantities = {pk: data[0] for pk, data in snapshot['lines'].items()}
+        if quantities != {line.pk: line.quantity for line in lines}:
+            return False
+
+        applications = OfferApplications()
+        offers = {}
+        for application in snapshot['applications']:
+            offer = application['offer']
+            offer.set_voucher(application['voucher'])
+            offers[offer.pk] = offer
+            applications.applications[offer.pk] = application
+
+        for data in snapshot['lines'].values():
+            if not set(data[4]).issubset(offers):
+                return False
+
+        for line in lines:
+            __, discount_excl_tax, discount_incl_tax, affected_quantity, \
+                consumptions = snapshot['lines'][line.pk]
+            line.clear_discount()
+            line._discount_excl_tax = discount_excl_tax
+            line._discount_incl_tax = discount_incl_tax
+            line.consumer.set_state(affected_quantity, {
+                offers[offer_id]: quantity
+                for offer_id, quantity in consumptions.items()})
+        basket.offer_applications = applications
+        return True
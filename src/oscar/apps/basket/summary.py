@@ -0,0 +1,148 @@
+from decimal import Decimal as D
+
+from django.conf import settings
+from django.core.cache import cache
+
+from oscar.core.cache import delete_on_commit, get_versions
+from oscar.core.loading import get_class, get_model
+
+Basket = get_model('basket', 'Basket')
+SiteOfferCache = get_class('offer.cache', 'SiteOfferCache')
+RANGE_INDEX_VERSION_KEY = get_class('offer.utils', 'RANGE_INDEX_VERSION_KEY')
+
+
+class BasketSummary(object):
+    """
+    The handful of basket values needed to render a basket's item count and
+    total, e.g. in the page header, without loading the basket.
+    """
+    fields = ('basket_id', 'num_lines', 'num_items', 'is_tax_known',
+              'total_excl_tax', 'total_incl_tax', 'currency')
+
+    def __init__(self, basket_id=None, num_lines=0, num_items=0,
+                 is_tax_known=True, total_excl_tax=D('0.00'),
+                 total_incl_tax=D('0.00'), currency=None):
+        self.basket_id = basket_id
+        self.num_lines = num_lines
+        self.num_items = num_items
+        self.is_tax_known = is_tax_known
+        self.total_excl_tax = total_excl_tax
+        self.total_incl_tax = total_incl_tax
+        self.currency = currency
+
+    def __repr__(self):
+        return '<BasketSummary: basket %s, %d items>' % (
+            self.basket_id, self.num_items)
+
+    @classmethod
+    def from_basket(cls, basket):
+        if basket.is_empty:
+            return cls(basket_id=basket.id)
+        is_tax_known = basket.is_tax_known
+        return cls(
+            basket_id=basket.id,
+            num_lines=basket.num_lines,
+            num_items=sum(line.quantity for line in basket.all_lines()),
+            is_tax_known=is_tax_known,
+            total_excl_tax=basket.total_excl_tax,
+            total_incl_tax=basket.total_incl_tax if is_tax_known else None,
+            currency=basket.currency)
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(**data)
+
+    def as_dict(self):
+        return {field: getattr(self, field) for field in self.fields}
+
+    @property
+    def is_empty(self):
+        return self.num_lines == 0
+
+
+class BasketSummaryCache(object):
+    """
+    Caches the summary of the open basket of each user, and of each
+    anonymous basket, so that ``request.basket_summary`` can be served
+    without loading the basket and applying offers to it.
+
+    Summaries are deleted whenever a basket, its lines or its vouchers
+    change, and are ignored once the site offers or range contents change.
+    Changes to prices can leave a summary stale for up to
+    OSCAR_BASKET_SUMMARY_TIMEOUT seconds.
+    """
+    user_key = 'oscar-basket-summary-user-%s'
+    basket_key = 'oscar-basket-summary-basket-%s'
+    version_keys = (SiteOfferCache.version_key, RANGE_INDEX_VERSION_KEY)
+
+    @classmethod
+    def is_enabled(cls):
+        return bool(settings.OSCAR_BASKET_SUMMARY_TIMEOUT)
+
+    @classmethod
+    def get_cache_key(cls, user_id=None, basket_id=None):
+        if user_id is not None:
+            return cls.user_key % user_id
+        return cls.basket_key % basket_id
+
+    @classmethod
+    def invalidate(cls, basket):
+        """
+        Delete the summaries of a basket
+        """
+        if not cls.is_enabled() or basket.id is None:
+            return
+        cls.delete(basket.id, basket.owner_id)
+
+    @classmethod
+    def invalidate_basket(cls, basket_id):
+        """
+        Delete the summaries of a basket, looking up its owner only if
+        summaries are cached at all
+        """
+        if not cls.is_enabled():
+            return
+        owner_id = Basket._default_manager.filter(pk=basket_id).values_list(
+            'owner_id', flat=True).first()
+        cls.delete(basket_id, owner_id)
+
+    @classmethod
+    def delete(cls, basket_id, owner_id=None):
+        keys = [cls.get_cache_key(basket_id=basket_id)]
+        if owner_id is not None:
+            keys.append(cls.get_cache_key(user_id=owner_id))
+        delete_on_commit(keys)
+
+    def get(self, user_id=None, basket_id=None):
+        """
+        Return the cached summary of a user's or an anonymous basket, or None
+        """
+        keys = [self.get_cache_key(user_id, basket_id)]
+        keys.extend(self.version_keys)
+        values = cache.get_many(keys)
+        data = values.get(keys[0])
+        if data is None:
+            return None
+        versions = [values.get(key) for key in self.version_keys]
+        if data['versions'] != versions:
+            return None
+        return BasketSummary.from_dict(data['summary'])
+
+    def save(self, basket):
+        """
+        Store the summary of a basket that just had offers applied, and
+        return it.
+        """
+        summary = BasketSummary.from_basket(basket)
+        if basket.id is None:
+            return summary
+        versions = get_versions(self.version_keys)
+        data = {
+            'summary': summary.as_dict(),
+            'versions': [versions.get(key) for key in self.version_keys]}
+        if basket.owner_id is not None:
+            key = self.get_cache_key(user_id=basket.owner_id)
+        else:
+            key = self.get_cache_key(basket_id=basket.id)
+        cache.set(key, data, settings.OSCAR_BASKET_SUMMARY_TIMEOUT)
+        return summary
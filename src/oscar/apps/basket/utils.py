@@ -113,6 +113,28 @@ class LineOfferConsumer(object):
             available = self.available(offer)
             self.__consumptions[offer.pk] += min(available, quantity)
 
+    def get_state(self):
+        """
+        return the number of items consumed by any offer, and a dict
+        of the number of items consumed by each offer (keyed by the
+        offer's ID), e.g. for storing them in a basket snapshot
+        """
+        consumptions = {offer_id: quantity for offer_id, quantity
+                        in self.__consumptions.items() if quantity}
+        return self.__affected_quantity, consumptions
+
+    def set_state(self, affected_quantity, consumptions):
+        """
+        restore the state returned by get_state, given a dict of the
+        number of items consumed by each offer (keyed by the offer)
+        """
+        self.__affected_quantity = affected_quantity
+        self.__consumptions = defaultdict(int)
+        self.__offers = dict()
+        for offer, quantity in consumptions.items():
+            self.__cache(offer)
+            self.__consumptions[offer.pk] = quantity
+
     def consumed(self, offer=None):
         """
         check how many items on this line have been
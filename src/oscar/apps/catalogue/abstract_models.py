@@ -20,6 +20,8 @@ from django.utils.translation import gettext_lazy as _
 from django.utils.translation import get_language, pgettext_lazy
 from treebeard.mp_tree import MP_Node
 
+from oscar.apps.catalogue.signals import category_moved
+from oscar.core.compat import bulk_update
 from oscar.core.loading import get_class, get_classes, get_model
 from oscar.core.utils import slugify
 from oscar.core.validators import non_python_keyword
@@ -91,37 +93,78 @@ class AbstractCategory(MP_Node):
                               null=True, max_length=255)
     slug = SlugField(_('Slug'), max_length=255, db_index=True)
 
+    # The following fields are derived from the category's ancestors and kept
+    # up to date when categories are saved or moved, so they can be read
+    # without querying the ancestors.
+
+    #: The names of the category and it's ancestors, e.g.
+    #: 'Books > Non-fiction > Essential programming'
+    full_name = models.TextField(_('Full name'), editable=False, blank=True)
+    #: The slugs of the category and it's ancestors, e.g.
+    #: 'books/non-fiction/essential-programming'
+    full_slug = models.TextField(_('Full slug'), editable=False, blank=True)
+    #: The comma-separated IDs of the category's ancestors, starting with the
+    #: root category; see get_ancestor_ids()
+    ancestor_ids = models.TextField(
+        _('Ancestor IDs'), editable=False, blank=True)
+
     _slug_separator = '/'
     _full_name_separator = ' > '
+    _ancestor_ids_separator = ','
 
     def __str__(self):
-        return self.full_name
+        return self.full_name or self.name
 
-    @property
-    def full_name(self):
+    def get_ancestor_ids(self):
         """
-        Returns a string representation of the category and it's ancestors,
-        e.g. 'Books > Non-fiction > Essential programming'.
-
-        It's rarely used in Oscar's codebase, but used to be stored as a
-        CharField and is hence kept for backwards compatibility. It's also
-        sufficiently useful to keep around.
+        Returns the IDs of the category's ancestors, starting with the root
+        category.
         """
-        names = [category.name for category in self.get_ancestors_and_self()]
-        return self._full_name_separator.join(names)
+        if not self.ancestor_ids:
+            return []
+        return [int(pk) for pk in
+                self.ancestor_ids.split(self._ancestor_ids_separator)]
 
-    @property
-    def full_slug(self):
+    def set_ancestor_data(self, parent):
         """
-        Returns a string of this category's slug concatenated with the slugs
-        of it's ancestors, e.g. 'books/non-fiction/essential-programming'.
-
-        Oscar used to store this as in the 'slug' model field, but this field
-        has been re-purposed to only store this category's slug and to not
-        include it's ancestors' slugs.
+        Sets the fields derived from the category's ancestors, given its
+        parent (or None for root categories). The parent's fields need to be
+        up to date.
         """
-        slugs = [category.slug for category in self.get_ancestors_and_self()]
-        return self._slug_separator.join(slugs)
+        if parent is None:
+            self.full_name = self.name
+            self.full_slug = self.slug
+            self.ancestor_ids = ''
+        else:
+            self.full_name = self._full_name_separator.join(
+                [parent.full_name, self.name])
+            self.full_slug = self._slug_separator.join(
+                [parent.full_slug, self.slug])
+            self.ancestor_ids = self._ancestor_ids_separator.join(
+                [pk for pk in [parent.ancestor_ids, str(parent.pk)] if pk])
+
+    def get_ancestor_data(self):
+        return (self.full_name, self.full_slug, self.ancestor_ids)
+
+    def update_ancestor_data(self, include_self=True):
+        """
+        Recomputes the fields derived from the ancestors for the whole
+        subtree of the category, with a handful of queries.
+        """
+        if include_self:
+            self.set_ancestor_data(None if self.is_root() else
+                                   self.get_parent(update=True))
+        categories = [self]
+        parents = {self.path: self}
+        for category in self.get_descendants():
+            parent = parents[category.path[:-self.steplen]]
+            category.set_ancestor_data(parent)
+            parents[category.path] = category
+            categories.append(category)
+        if not include_self:
+            categories.remove(self)
+        bulk_update(self.__class__, categories,
+                    ['full_name', 'full_slug', 'ancestor_ids'])
 
     def generate_slug(self):
         """
@@ -156,16 +199,46 @@ class AbstractCategory(MP_Node):
         """
         if self.slug:
             # Slug was supplied. Hands off!
-            super().save(*args, **kwargs)
+            self._save_with_ancestor_data(*args, **kwargs)
         else:
             self.slug = self.generate_slug()
-            super().save(*args, **kwargs)
+            self._save_with_ancestor_data(*args, **kwargs)
             # We auto-generated a slug, so we need to make sure that it's
             # unique. As we need to be able to inspect the category's siblings
             # for that, we need to wait until the instance is saved. We
             # update the slug and save again if necessary.
             self.ensure_slug_uniqueness()
 
+    def _save_with_ancestor_data(self, *args, **kwargs):
+        adding = self._state.adding
+        old_data = self.get_ancestor_data()
+        if self.is_root():
+            parent = None
+        else:
+            # Treebeard caches the parent when adding children
+            parent = self.get_parent(update=not adding)
+        self.set_ancestor_data(parent)
+        super().save(*args, **kwargs)
+        if not adding and old_data != self.get_ancestor_data():
+            # The category was renamed, so the descendants need updating
+            self.update_ancestor_data(include_self=False)
+
+    def move(self, target, pos=None):
+        """
+        Moves the category (and its descendants) in the tree. Treebeard
+        updates the paths with a raw query, so the ``category_moved`` signal
+        is sent for receivers that would otherwise miss the change.
+        """
+        super().move(target, pos)
+        # Treebeard doesn't update the instance itself
+        moved = self.__class__._default_manager.get(pk=self.pk)
+        moved.update_ancestor_data()
+        for field in ('path', 'depth', 'full_name', 'full_slug',
+                      'ancestor_ids'):
+            setattr(self, field, getattr(moved, field))
+        category_moved.send(
+            sender=self.__class__, instance=self, target=target, pos=pos)
+
     def get_ancestors_and_self(self):
         """
         Gets ancestors and includes itself. Use treebeard's get_ancestors
@@ -196,6 +269,10 @@ class AbstractCategory(MP_Node):
         you change that logic, you'll have to reconsider the caching
         approach.
         """
+        # Categories loaded from the category tree cache know their URL
+        url = getattr(self, '_absolute_url', None)
+        if url:
+            return url
         cache_key = self.get_url_cache_key()
         url = cache.get(cache_key)
         if not url:
@@ -1,7 +1,20 @@
+import threading
+from bisect import bisect_right
+from collections import namedtuple
+
+from django.core.cache import cache
+from django.urls import reverse
+from django.utils.translation import get_language
+
+from oscar.core.cache import bump_version, get_version
 from oscar.core.loading import get_model
 
 Category = get_model('catalogue', 'category')
 
+# A category as stored in the category tree cache
+CategoryNode = namedtuple(
+    'CategoryNode', ['path', 'depth', 'values', 'url'])
+
 
 def create_from_sequence(bits):
     """
@@ -42,3 +55,101 @@ def create_from_breadcrumbs(breadcrumb_str, separator='>'):
     category_names = [x.strip() for x in breadcrumb_str.split(separator)]
     categories = create_from_sequence(category_names)
     return categories[-1]
+
+
+class CategoryTree(object):
+    """
+    A cached copy of the whole category tree.
+
+    The tree is serialised (with the depth and URL of every category) and
+    stored in the Django cache under a key that includes the tree version,
+    which is bumped whenever a category is saved, moved or deleted (see
+    invalidate()). Each process also keeps the tree of the current version in
+    memory, so slicing it needs no queries, and only the categories that are
+    actually used are turned into model instances.
+    """
+    version_key = 'oscar-category-tree-version'
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._version = None
+        self._trees = {}
+
+    @classmethod
+    def get_version(cls):
+        return get_version(cls.version_key)
+
+    @classmethod
+    def invalidate(cls):
+        """
+        Force all processes to reload the category tree.
+        """
+        bump_version(cls.version_key)
+
+    def get_cache_key(self, version, language):
+        return 'oscar-category-tree-%s-%s' % (version, language)
+
+    def get_nodes(self):
+        """
+        Return the nodes of the whole tree, ordered by path.
+        """
+        return self.load()[0]
+
+    def get_descendants(self, category):
+        """
+        Return the nodes of the descendants of a category, ordered by path.
+        """
+        nodes, paths = self.load()
+        start = bisect_right(paths, category.path)
+        end = start
+        while end < len(paths) and paths[end].startswith(category.path):
+            end += 1
+        return nodes[start:end]
+
+    def load(self):
+        version = self.get_version()
+        # URLs might contain the language
+        language = get_language()
+        with self._lock:
+            if version != self._version:
+                self._trees = {}
+                self._version = version
+            tree = self._trees.get(language)
+
+        if tree is None:
+            cache_key = self.get_cache_key(version, language)
+            nodes = cache.get(cache_key)
+            if nodes is None:
+                nodes = self.serialise()
+                cache.set(cache_key, nodes)
+            tree = (nodes, [node.path for node in nodes])
+            with self._lock:
+                if version == self._version:
+                    self._trees[language] = tree
+        return tree
+
+    def serialise(self):
+        fields = [field.attname for field in Category._meta.concrete_fields]
+        # Python's string ordering might differ from the database collation
+        rows = sorted(
+            (dict(zip(fields, values))
+             for values in Category.objects.values_list(*fields)),
+            key=lambda category: category['path'])
+        return [
+            CategoryNode(path=category['path'], depth=category['depth'],
+                         values=category, url=self.get_url(category))
+            for category in rows]
+
+    def get_url(self, values):
+        return reverse('catalogue:category', kwargs={
+            'category_slug': values['full_slug'], 'pk': values['id']})
+
+    def get_category(self, node):
+        """
+        Return a category instance for a node
+        """
+        fields = list(node.values)
+        category = Category.from_db(
+            None, fields, [node.values[field] for field in fields])
+        category._absolute_url = node.url
+        return category
@@ -26,9 +26,13 @@ def remove_ancestor_slugs(apps, schema_editor):
 
 def add_ancestor_slugs(apps, schema_editor):
     MigrationCategory = apps.get_model('catalogue', 'Category')
-    for category in MigrationCategory.objects.all():
-        orm_category = ORMCategory.objects.get(pk=category.pk)
-        category.slug = orm_category.full_slug
+    full_slugs = {}
+    for category in MigrationCategory.objects.order_by('path'):
+        parent_slug = full_slugs.get(category.path[:-ORMCategory.steplen])
+        if parent_slug is not None:
+            category.slug = ORMCategory._slug_separator.join(
+                [parent_slug, category.slug])
+        full_slugs[category.path] = category.slug
         category.save()
 
 
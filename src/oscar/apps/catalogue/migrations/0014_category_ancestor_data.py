@@ -0,0 +1,56 @@
+# -*- coding: utf-8 -*-
+from django.db import migrations, models
+
+from oscar.core.loading import get_model
+
+# The separators are custom properties of the category model, which aren't
+# exposed by the migration's snapshot of the model, so we fetch them from the
+# actual ORM model. We MUST NOT use that to save data.
+
+ORMCategory = get_model('catalogue', 'Category')
+
+
+def populate_ancestor_data(apps, schema_editor):
+    MigrationCategory = apps.get_model('catalogue', 'Category')
+    parents = {}
+    for category in MigrationCategory.objects.order_by('path'):
+        parent = parents.get(category.path[:-ORMCategory.steplen])
+        if parent is None:
+            category.full_name = category.name
+            category.full_slug = category.slug
+            category.ancestor_ids = ''
+        else:
+            category.full_name = ORMCategory._full_name_separator.join(
+                [parent.full_name, category.name])
+            category.full_slug = ORMCategory._slug_separator.join(
+                [parent.full_slug, category.slug])
+            category.ancestor_ids = ORMCategory._ancestor_ids_separator.join(
+                [pk for pk in [parent.ancestor_ids, str(parent.pk)] if pk])
+        category.save()
+        parents[category.path] = category
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('catalogue', '0013_auto_20170821_1548'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='category',
+            name='ancestor_ids',
+            field=models.TextField(blank=True, editable=False, verbose_name='Ancestor IDs'),
+        ),
+        migrations.AddField(
+            model_name='category',
+            name='full_name',
+            field=models.TextField(blank=True, editable=False, verbose_name='Full name'),
+        ),
+        migrations.AddField(
+            model_name='category',
+            name='full_slug',
+            field=models.TextField(blank=True, editable=False, verbose_name='Full slug'),
+        ),
+        migrations.RunPython(populate_ancestor_data, migrations.RunPython.noop),
+    ]
@@ -1,6 +1,91 @@
+import threading
+from collections import defaultdict
+
 from django.core.exceptions import ValidationError
+from django.db.models import prefetch_related_objects
 from django.utils.translation import gettext_lazy as _
 
+from oscar.core.cache import bump_version, get_version
+from oscar.core.loading import get_model
+from oscar.core.utils import clone_instance
+
+
+class ProductClassAttributeCache(object):
+    """
+    A process-wide cache of the attributes of each product class.
+
+    The attributes are kept in memory until the version stored in the Django
+    cache changes (see invalidate(), which is called whenever an attribute is
+    saved or deleted). Callers are handed copies of the cached instances.
+    """
+    version_key = 'oscar-product-class-attributes-version'
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._version = None
+        self._attributes = {}
+
+    @classmethod
+    def get_version(cls):
+        return get_version(cls.version_key)
+
+    @classmethod
+    def invalidate(cls):
+        """
+        Force all processes to reload the product class attributes.
+        """
+        bump_version(cls.version_key)
+
+    def get_attributes(self, product_class):
+        """
+        Return the attributes of a product class, ordered as per the model's
+        default ordering.
+        """
+        version = self.get_version()
+        with self._lock:
+            if version != self._version:
+                self._attributes = {}
+                self._version = version
+            attributes = self._attributes.get(product_class.pk)
+
+        if attributes is None:
+            attributes = list(product_class.attributes.all())
+            with self._lock:
+                if version == self._version:
+                    self._attributes[product_class.pk] = attributes
+        return [clone_instance(attribute) for attribute in attributes]
+
+
+product_class_attributes = ProductClassAttributeCache()
+
+
+def prefetch_product_attributes(products):
+    """
+    Initialise the ``attr`` containers of a list of products and of their
+    parents with two queries at most: one to fetch the parents if they aren't
+    loaded yet, and one to fetch the attribute values of all products.
+    """
+    ProductAttributeValue = get_model('catalogue', 'ProductAttributeValue')
+
+    products = list(products)
+    prefetch_related_objects(
+        [product for product in products if product.parent_id], 'parent')
+    products.extend([product.parent for product in products
+                     if product.parent_id])
+    pending = {product.pk: product for product in products
+               if product.pk is not None and not product.attr.initialised}
+    if not pending:
+        return
+
+    values = defaultdict(list)
+    queryset = ProductAttributeValue.objects.filter(
+        product_id__in=pending).select_related('attribute')
+    for value in queryset:
+        values[value.product_id].append(value)
+    for product in products:
+        if product.pk in pending and not product.attr.initialised:
+            product.attr.initiate_attributes(values[product.pk])
+
 
 class ProductAttributesContainer(object):
     """
@@ -19,8 +104,9 @@ class ProductAttributesContainer(object):
         self.product = product
         self.initialised = False
 
-    def initiate_attributes(self):
-        values = self.get_values().select_related('attribute')
+    def initiate_attributes(self, values=None):
+        if values is None:
+            values = self.get_values().select_related('attribute')
         for v in values:
             setattr(self, v.attribute.code, v.value)
         self.initialised = True
@@ -56,10 +142,19 @@ class ProductAttributesContainer(object):
         return self.get_values().get(attribute=attribute)
 
     def get_all_attributes(self):
-        return self.product.get_product_class().attributes.all()
+        product_class = self.product.get_product_class()
+        if product_class is None:
+            return []
+        return product_class_attributes.get_attributes(product_class)
 
     def get_attribute_by_code(self, code):
-        return self.get_all_attributes().get(code=code)
+        for attribute in self.get_all_attributes():
+            if attribute.code == code:
+                return attribute
+        ProductAttribute = get_model('catalogue', 'ProductAttribute')
+        raise ProductAttribute.DoesNotExist(
+            "%s has no attribute with code '%s'" % (
+                self.product.get_product_class(), code))
 
     def __iter__(self):
         return iter(self.get_values())
@@ -1,19 +1,40 @@
 # -*- coding: utf-8 -*-
 
 from django.conf import settings
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
 
-if settings.OSCAR_DELETE_IMAGE_FILES:
+from oscar.apps.catalogue.signals import category_moved
+from oscar.core.loading import get_class, get_model
+
+Category = get_model('catalogue', 'Category')
+ProductAttribute = get_model('catalogue', 'ProductAttribute')
+CategoryTree = get_class('catalogue.categories', 'CategoryTree')
+ProductClassAttributeCache = get_class(
+    'catalogue.product_attributes', 'ProductClassAttributeCache')
+
+
+@receiver(post_save, sender=ProductAttribute)
+@receiver(post_delete, sender=ProductAttribute)
+def invalidate_product_class_attributes(sender, **kwargs):
+    ProductClassAttributeCache.invalidate()
 
-    from oscar.core.loading import get_model
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+@receiver(category_moved, sender=Category)
+def invalidate_category_tree(sender, **kwargs):
+    CategoryTree.invalidate()
+
+
+if settings.OSCAR_DELETE_IMAGE_FILES:
 
     from django.db import models
-    from django.db.models.signals import post_delete
 
     from sorl import thumbnail
     from sorl.thumbnail.helpers import ThumbnailError
 
     ProductImage = get_model('catalogue', 'ProductImage')
-    Category = get_model('catalogue', 'Category')
 
     def delete_image_files(sender, instance, **kwargs):
         """
@@ -136,6 +136,9 @@ class CatalogueView(TemplateView):
         search_context = self.search_handler.get_search_context_data(
             self.context_object_name)
         ctx.update(search_context)
+        # Resolve prices and availability for the whole page at once
+        self.request.strategy.fetch_for_products(
+            ctx[self.context_object_name])
         return ctx
 
 
@@ -226,4 +229,7 @@ class ProductCategoryView(TemplateView):
         search_context = self.search_handler.get_search_context_data(
             self.context_object_name)
         context.update(search_context)
+        # Resolve prices and availability for the whole page at once
+        self.request.strategy.fetch_for_products(
+            context[self.context_object_name])
         return context
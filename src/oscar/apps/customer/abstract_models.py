@@ -208,12 +208,39 @@ class AbstractCommunicationEventType(models.Model):
         verbose_name = _("Communication event type")
         verbose_name_plural = _("Communication event types")
 
-    def get_messages(self, ctx=None):
+    def get_messages(self, ctx=None, templates=None):
         """
         Return a dict of templates with the context merged in
 
         We look first at the field templates but fail over to
         a set of file templates that follow a conventional path.
+
+        The templates returned by ``get_templates`` can be passed in to avoid
+        loading them again when rendering many messages.
+        """
+        if templates is None:
+            templates = self.get_templates()
+
+        # Pass base URL for serving images within HTML emails
+        if ctx is None:
+            ctx = {}
+        ctx['static_base_url'] = getattr(
+            settings, 'OSCAR_STATIC_BASE_URL', None)
+
+        messages = {}
+        for name, template in templates.items():
+            messages[name] = template.render(ctx) if template else ''
+
+        # Ensure the email subject doesn't contain any newlines
+        messages['subject'] = messages['subject'].replace("\n", "")
+        messages['subject'] = messages['subject'].replace("\r", "")
+
+        return messages
+
+    def get_templates(self):
+        """
+        Return a dict of message name to Template instance (or None if there
+        is no template for a message)
         """
         code = self.code.lower()
 
@@ -234,22 +261,7 @@ class AbstractCommunicationEventType(models.Model):
                     templates[name] = get_template(template_name)
                 except TemplateDoesNotExist:
                     templates[name] = None
-
-        # Pass base URL for serving images within HTML emails
-        if ctx is None:
-            ctx = {}
-        ctx['static_base_url'] = getattr(
-            settings, 'OSCAR_STATIC_BASE_URL', None)
-
-        messages = {}
-        for name, template in templates.items():
-            messages[name] = template.render(ctx) if template else ''
-
-        # Ensure the email subject doesn't contain any newlines
-        messages['subject'] = messages['subject'].replace("\n", "")
-        messages['subject'] = messages['subject'].replace("\r", "")
-
-        return messages
+        return templates
 
     def __str__(self):
         return self.name
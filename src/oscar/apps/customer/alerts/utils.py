@@ -3,32 +3,30 @@ import warnings
 
 from django.contrib.sites.models import Site
 from django.core import mail
-from django.db.models import Max
+from django.db import transaction
+from django.db.models import Count, prefetch_related_objects
 from django.template import TemplateDoesNotExist, loader
+from django.utils import timezone
 
 from oscar.apps.customer.notifications import services
 from oscar.core.loading import get_class, get_model
 from oscar.utils.deprecation import RemovedInOscar20Warning
 
 CommunicationEventType = get_model('customer', 'CommunicationEventType')
+Notification = get_model('customer', 'Notification')
 ProductAlert = get_model('customer', 'ProductAlert')
-Product = get_model('catalogue', 'Product')
+StockRecord = get_model('partner', 'StockRecord')
 Dispatcher = get_class('customer.utils', 'Dispatcher')
 Selector = get_class('partner.strategy', 'Selector')
 
 logger = logging.getLogger('oscar.alerts')
 
 
-def send_alerts():
+def send_alerts(chunk_size=None):
     """
     Send out product alerts
     """
-    products = Product.objects.filter(
-        productalert__status=ProductAlert.ACTIVE
-    ).distinct()
-    logger.info("Found %d products with active alerts", products.count())
-    for product in products:
-        send_product_alerts(product)
+    AlertSender(chunk_size=chunk_size).send_all()
 
 
 def send_alert_confirmation(alert):
@@ -73,121 +71,252 @@ def send_alert_confirmation(alert):
         Dispatcher().dispatch_direct_messages(alert.email, messages)
 
 
-def send_product_alerts(product):   # noqa C901 too complex
+def send_product_alerts(product):
     """
     Check for notifications for this product and send email to users
     if the product is back in stock. Add a little 'hurry' note if the
     amount of in-stock items is less then the number of notifications.
     """
-    stockrecords = product.stockrecords.all()
-    num_stockrecords = len(stockrecords)
-    if not num_stockrecords:
-        return
-
-    logger.info("Sending alerts for '%s'", product)
-    alerts = ProductAlert.objects.filter(
-        product_id__in=(product.id, product.parent_id),
-        status=ProductAlert.ACTIVE,
-    )
-
-    # Determine 'hurry mode'
-    if num_stockrecords == 1:
-        num_in_stock = stockrecords[0].num_in_stock
-    else:
-        result = stockrecords.aggregate(max_in_stock=Max('num_in_stock'))
-        num_in_stock = result['max_in_stock']
-
-    # hurry_mode is false if num_in_stock is None
-    hurry_mode = num_in_stock is not None and alerts.count() > num_in_stock
+    AlertSender().send_for_product(product)
 
-    # For backwards compability, we check if the old (non-communication-event)
-    # templates exist, and use them if they do.
-    # This will be removed in Oscar 2.0
-    try:
-        email_subject_tpl = loader.get_template('customer/alerts/emails/'
-                                                'alert_subject.txt')
-        email_body_tpl = loader.get_template('customer/alerts/emails/'
-                                             'alert_body.txt')
 
-        use_deprecated_templates = True
-        warnings.warn(
-            "Product alert notifications now use the CommunicationEvent. "
-            "Move '{}' to '{}', and '{}' to '{}'".format(
-                'customer/alerts/emails/alert_subject.txt',
-                'customer/emails/commtype_product_alert_subject.txt',
-                'customer/alerts/emails/alert_body.txt',
-                'customer/emails/commtype_product_alert_body.txt',
-            ),
-            category=RemovedInOscar20Warning, stacklevel=2
-        )
+class AlertSender(object):
+    """
+    Sends the product alerts of products that are back in stock in bulk.
 
-    except TemplateDoesNotExist:
-        code = 'PRODUCT_ALERT'
+    Active alerts are read in chunks of *chunk_size*, ordered by their ID and
+    joined with their products and users, and only alerts for products with
+    stock records are considered. For every chunk, the stock records of all
+    its products are loaded at once. The messages are rendered with
+    templates that are only loaded once, and all emails of a run are sent
+    over a single mail connection, which is only opened once there are
+    alerts to send.
+
+    The alerts of a chunk are closed and their site notifications created
+    with bulk queries once the chunk has been processed. This happens even
+    when sending fails part-way, so running the sender again after a failure
+    resumes with the alerts that haven't been sent yet.
+    """
+    chunk_size = 500
+
+    def __init__(self, chunk_size=None):
+        if chunk_size is not None:
+            self.chunk_size = chunk_size
+        self.selector = Selector()
+        self.num_notifications = 0
+        self.num_messages = 0
+        # Maps product IDs to whether 'hurry mode' applies to them
+        self._hurry_modes = {}
+        self._templates = None
+
+    def send_all(self):
+        """
+        Send the alerts of all products that are back in stock
+        """
+        stocked_product_ids = StockRecord.objects.values('product_id')
+        alerts = ProductAlert.objects.filter(
+            status=ProductAlert.ACTIVE, product_id__in=stocked_product_ids)
+        self.send(alerts)
+
+    def send_for_product(self, product):
+        """
+        Send the alerts of a product, or of its parent, if the product is
+        back in stock
+        """
+        if not product.stockrecords.exists():
+            return
+        logger.info("Sending alerts for '%s'", product)
+        alerts = ProductAlert.objects.filter(
+            product_id__in=(product.id, product.parent_id),
+            status=ProductAlert.ACTIVE)
+        self.send(alerts, product=product)
+
+    def send(self, alerts, product=None):
+        """
+        Send the given alerts. By default, the availability of each alert's
+        product is checked; pass *product* to check that product instead
+        (e.g. the child product of alerts for a parent product).
+        """
+        alerts = alerts.select_related(
+            'user', 'product', 'product__product_class',
+            'product__parent__product_class').order_by('pk')
+        # Stock records are saved on every checkout, and most of the time
+        # there are no alerts to send, so don't connect to the mail server
+        # unless there are.
+        connection = None
         try:
-            event_type = CommunicationEventType.objects.get(code=code)
-        except CommunicationEventType.DoesNotExist:
-            event_type = CommunicationEventType.objects.model(code=code)
-        use_deprecated_templates = False
-
-    messages_to_send = []
-    user_messages_to_send = []
-    num_notifications = 0
-    selector = Selector()
-    for alert in alerts:
-        # Check if the product is available to this user
-        strategy = selector.strategy(user=alert.user)
+            last_id = None
+            while True:
+                chunk = alerts if last_id is None else alerts.filter(
+                    pk__gt=last_id)
+                chunk = list(chunk[:self.chunk_size])
+                if not chunk:
+                    break
+                if connection is None:
+                    connection = mail.get_connection()
+                    connection.open()
+                    dispatcher = Dispatcher(mail_connection=connection)
+                self.send_chunk(chunk, dispatcher, product)
+                last_id = chunk[-1].pk
+        finally:
+            if connection is not None:
+                connection.close()
+        logger.info("Sent %d notifications and %d messages",
+                    self.num_notifications, self.num_messages)
+
+    def send_chunk(self, alerts, dispatcher, product=None):
+        if product is None:
+            products = [alert.product for alert in alerts]
+        else:
+            products = [product]
+        prefetch_related_objects(products, 'stockrecords')
+        self.load_hurry_modes(alerts, product)
+
+        processed = []
+        try:
+            for alert in alerts:
+                alert_product = alert.product if product is None else product
+                ctx = self.send_alert(alert, alert_product, dispatcher)
+                if ctx is not None:
+                    processed.append((alert, ctx))
+        finally:
+            self.close_alerts(processed)
+
+    def send_alert(self, alert, product, dispatcher):
+        """
+        Send the messages of an alert, if its product is available to the
+        alert's user. Returns the message context if the alert was
+        processed, and None otherwise.
+        """
+        strategy = self.selector.strategy(user=alert.user)
         data = strategy.fetch_for_product(product)
         if not data.availability.is_available_to_buy:
-            continue
+            return None
 
         ctx = {
             'alert': alert,
-            'site': Site.objects.get_current(),
-            'hurry': hurry_mode,
+            'site': self.get_site(),
+            'hurry': self._hurry_modes[product.pk],
         }
-        if alert.user:
-            # Send a site notification
-            num_notifications += 1
-            subj_tpl = loader.get_template('customer/alerts/message_subject.html')
-            message_tpl = loader.get_template('customer/alerts/message.html')
-            services.notify_user(
-                alert.user,
-                subj_tpl.render(ctx).strip(),
-                body=message_tpl.render(ctx).strip()
-            )
+        messages = self.get_messages(ctx)
+        if messages and messages['body']:
+            if alert.user:
+                dispatcher.dispatch_user_messages(alert.user, messages)
+            else:
+                dispatcher.dispatch_direct_messages(
+                    alert.get_email_address(), messages)
+            self.num_messages += 1
+        return ctx
+
+    def close_alerts(self, processed):
+        """
+        Close processed alerts and create their site notifications, given a
+        list of (alert, message context) tuples
+        """
+        if not processed:
+            return
+        subject_tpl, message_tpl = self.get_templates()['notification']
+        notifications = [
+            Notification(
+                recipient=alert.user,
+                subject=subject_tpl.render(ctx).strip(),
+                body=message_tpl.render(ctx).strip())
+            for alert, ctx in processed if alert.user]
+        with transaction.atomic():
+            ProductAlert.objects.filter(
+                pk__in=[alert.pk for alert, __ in processed]).update(
+                    status=ProductAlert.CLOSED, date_closed=timezone.now())
+            services.create_notifications(notifications)
+        self.num_notifications += len(notifications)
+
+    def load_hurry_modes(self, alerts, product=None):
+        """
+        Determine 'hurry mode' for the products of the alerts: there are
+        more active alerts than items in stock. This is done once per
+        product, before any of its alerts are closed.
+        """
+        if product is not None:
+            if product.pk not in self._hurry_modes:
+                num_alerts = ProductAlert.objects.filter(
+                    product_id__in=(product.id, product.parent_id),
+                    status=ProductAlert.ACTIVE).count()
+                self._hurry_modes[product.pk] = self.is_hurry_mode(
+                    product, num_alerts)
+            return
+
+        products = {alert.product_id: alert.product for alert in alerts
+                    if alert.product_id not in self._hurry_modes}
+        if not products:
+            return
+        alert_counts = dict(
+            ProductAlert.objects.filter(
+                product_id__in=products, status=ProductAlert.ACTIVE)
+            .order_by().values_list('product_id')
+            .annotate(num_alerts=Count('id')))
+        for product_id, alert_product in products.items():
+            self._hurry_modes[product_id] = self.is_hurry_mode(
+                alert_product, alert_counts.get(product_id, 0))
+
+    def is_hurry_mode(self, product, num_alerts):
+        stock_levels = [stockrecord.num_in_stock
+                        for stockrecord in product.stockrecords.all()
+                        if stockrecord.num_in_stock is not None]
+        # hurry mode is false if the stock level is unknown
+        return bool(stock_levels) and num_alerts > max(stock_levels)
 
-        # Build message and add to list
-        if use_deprecated_templates:
-            messages = {
+    def get_site(self):
+        return Site.objects.get_current()
+
+    def get_messages(self, ctx):
+        templates = self.get_templates()
+        if templates['deprecated'] is not None:
+            email_subject_tpl, email_body_tpl = templates['deprecated']
+            return {
                 'subject': email_subject_tpl.render(ctx).strip(),
                 'body': email_body_tpl.render(ctx),
                 'html': '',
                 'sms': '',
             }
-        else:
-            messages = event_type.get_messages(ctx)
+        event_type, event_templates = templates['event_type']
+        return event_type.get_messages(ctx, event_templates)
 
-        if messages and messages['body']:
-            if alert.user:
-                user_messages_to_send.append(
-                    (alert.user, messages)
-                )
-            else:
-                messages_to_send.append(
-                    (alert.get_email_address(), messages)
-                )
-        alert.close()
-
-    # Send all messages using one SMTP connection to avoid opening lots of them
-    if messages_to_send or user_messages_to_send:
-        connection = mail.get_connection()
-        connection.open()
-        disp = Dispatcher(mail_connection=connection)
-        for message in messages_to_send:
-            disp.dispatch_direct_messages(*message)
-        for message in user_messages_to_send:
-            disp.dispatch_user_messages(*message)
-        connection.close()
-
-    logger.info("Sent %d notifications and %d messages", num_notifications,
-                len(messages_to_send) + len(user_messages_to_send))
+    def get_templates(self):
+        if self._templates is None:
+            self._templates = self.load_templates()
+        return self._templates
+
+    def load_templates(self):
+        templates = {
+            'notification': (
+                loader.get_template('customer/alerts/message_subject.html'),
+                loader.get_template('customer/alerts/message.html')),
+            'deprecated': None,
+        }
+
+        # For backwards compability, we check if the old
+        # (non-communication-event) templates exist, and use them if they do.
+        # This will be removed in Oscar 2.0
+        try:
+            templates['deprecated'] = (
+                loader.get_template('customer/alerts/emails/'
+                                    'alert_subject.txt'),
+                loader.get_template('customer/alerts/emails/'
+                                    'alert_body.txt'))
+            warnings.warn(
+                "Product alert notifications now use the CommunicationEvent. "
+                "Move '{}' to '{}', and '{}' to '{}'".format(
+                    'customer/alerts/emails/alert_subject.txt',
+                    'customer/emails/commtype_product_alert_subject.txt',
+                    'customer/alerts/emails/alert_body.txt',
+                    'customer/emails/commtype_product_alert_body.txt',
+                ),
+                category=RemovedInOscar20Warning, stacklevel=2
+            )
+        except TemplateDoesNotExist:
+            code = 'PRODUCT_ALERT'
+            try:
+                event_type = CommunicationEventType.objects.get(code=code)
+            except CommunicationEventType.DoesNotExist:
+                event_type = CommunicationEventType.objects.model(code=code)
+            templates['event_type'] = (event_type, event_type.get_templates())
+        return templates
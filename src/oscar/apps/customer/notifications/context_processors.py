@@ -1,12 +1,9 @@
-from oscar.core.loading import get_model
-
-Notification = get_model('customer', 'Notification')
+from oscar.apps.customer.notifications import services
 
 
 def notifications(request):
     ctx = {}
     if getattr(request, 'user', None) and request.user.is_authenticated:
-        num_unread = Notification.objects.filter(
-            recipient=request.user, date_read=None).count()
-        ctx['num_unread_notifications'] = num_unread
+        ctx['num_unread_notifications'] = services.get_unread_count(
+            request.user)
     return ctx
@@ -1,7 +1,13 @@
+from django.core.cache import cache
+from django.db.models.query import QuerySet
+
+from oscar.core.cache import delete_on_commit
 from oscar.core.loading import get_model
 
 Notification = get_model('customer', 'Notification')
 
+UNREAD_COUNT_KEY = 'oscar-unread-notifications-%s'
+
 
 def notify_user(user, subject, **kwargs):
     """
@@ -10,9 +16,53 @@ def notify_user(user, subject, **kwargs):
     Notification.objects.create(recipient=user, subject=subject, **kwargs)
 
 
-def notify_users(users, subject, **kwargs):
+def notify_users(users, subject, batch_size=1000, **kwargs):
+    """
+    Send a simple notification to an iterable of users. The notifications
+    are created in batches of *batch_size*; pass a queryset of users to
+    avoid loading the users themselves.
+    """
+    if isinstance(users, QuerySet):
+        user_ids = users.values_list('pk', flat=True).iterator()
+    else:
+        user_ids = (user.pk for user in users)
+    notifications = []
+    for user_id in user_ids:
+        notifications.append(Notification(
+            recipient_id=user_id, subject=subject, **kwargs))
+        if len(notifications) >= batch_size:
+            create_notifications(notifications)
+            notifications = []
+    create_notifications(notifications)
+
+
+def create_notifications(notifications):
+    """
+    Save a list of unsaved notifications with a single query
+    """
+    if not notifications:
+        return
+    Notification.objects.bulk_create(notifications)
+    invalidate_unread_counts(
+        {notification.recipient_id for notification in notifications})
+
+
+def get_unread_count(user):
+    """
+    Return the number of unread notifications of a user. The count is cached
+    until the user's notifications change.
+    """
+    key = UNREAD_COUNT_KEY % user.pk
+    num_unread = cache.get(key)
+    if num_unread is None:
+        num_unread = Notification.objects.filter(
+            recipient=user, date_read=None).count()
+        cache.set(key, num_unread)
+    return num_unread
+
+
+def invalidate_unread_counts(user_ids):
     """
-    Send a simple notification to an iterable of users
+    Discard the cached unread counts of users
     """
-    for user in users:
-        notify_user(user, subject, **kwargs)
+    delete_on_commit([UNREAD_COUNT_KEY % user_id for user_id in user_ids])
@@ -1,8 +1,13 @@
+from django.db.models.signals import post_delete, post_save
 from django.dispatch import receiver
 
 from oscar.apps.catalogue.signals import product_viewed
+from oscar.core.loading import get_model
 
 from . import history
+from .notifications import services
+
+Notification = get_model('customer', 'Notification')
 
 
 @receiver(product_viewed)
@@ -13,3 +18,9 @@ def receive_product_view(sender, product, user, request, response, **kwargs):
     Requires the request and response objects due to dependence on cookies
     """
     return history.update(product, request, response)
+
+
+@receiver(post_save, sender=Notification)
+@receiver(post_delete, sender=Notification)
+def invalidate_unread_count(sender, instance, **kwargs):
+    services.invalidate_unread_counts([instance.recipient_id])
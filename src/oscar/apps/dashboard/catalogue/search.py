@@ -0,0 +1,89 @@
+from django.conf import settings
+from django.contrib.postgres.search import SearchQuery, SearchVector
+from django.db.models import Q
+from django.utils.module_loading import import_string
+
+from oscar.core.loading import get_class, get_model
+
+Product = get_model('catalogue', 'Product')
+
+
+def get_product_search_backend():
+    """
+    Return an instance of the search backend used by the dashboard product
+    list, as set by OSCAR_DASHBOARD_PRODUCT_SEARCH_BACKEND.
+    """
+    if settings.OSCAR_DASHBOARD_PRODUCT_SEARCH_BACKEND is not None:
+        backend_class = import_string(
+            settings.OSCAR_DASHBOARD_PRODUCT_SEARCH_BACKEND)
+    else:
+        backend_class = get_class(
+            'dashboard.catalogue.search', 'ProductSearchBackend')
+    return backend_class()
+
+
+class ProductSearchBackend(object):
+    """
+    Filters the dashboard product list by UPC and title.
+
+    An exact UPC match takes precedence; otherwise, UPCs and titles are
+    matched with ``upc_lookup`` and ``title_lookup``. Substring matching
+    works on every database, but can't use an index.
+    """
+    upc_lookup = 'icontains'
+    title_lookup = 'icontains'
+
+    def search(self, queryset, upc=None, title=None):
+        if upc:
+            queryset = self.filter_upc(queryset, upc)
+        if title:
+            queryset = self.filter_title(queryset, title)
+        return queryset
+
+    def filter_upc(self, queryset, upc):
+        # UPCs are unique, so this is a single row at most. Child products
+        # are shown through their parents.
+        exact_matches = Product.objects.filter(upc=upc).values_list(
+            'pk', 'parent_id')
+        ids = {pk for match in exact_matches for pk in match if pk}
+        if ids:
+            return queryset.filter(pk__in=ids)
+        matches = Product.objects.filter(**{'upc__' + self.upc_lookup: upc})
+        return queryset.filter(
+            Q(id__in=matches.values('id')) |
+            Q(id__in=matches.values('parent_id')))
+
+    def filter_title(self, queryset, title):
+        return queryset.filter(**{'title__' + self.title_lookup: title})
+
+
+class PrefixProductSearchBackend(ProductSearchBackend):
+    """
+    Matches the beginning of UPCs and titles.
+
+    The UPC lookup is case-sensitive, so the index on the UPC column can be
+    used for it. Titles are matched case-insensitively, which PostgreSQL
+    compiles to ``UPPER(title) LIKE ...``; that needs an index on the
+    ``UPPER(title)`` expression, as a plain index on the title column can't
+    be used for it.
+    """
+    upc_lookup = 'startswith'
+    title_lookup = 'istartswith'
+
+
+class PostgresProductSearchBackend(PrefixProductSearchBackend):
+    """
+    Uses PostgreSQL's full-text search for titles, and matches the beginning
+    of UPCs.
+
+    Requires ``django.contrib.postgres`` in ``INSTALLED_APPS``. The title is
+    searched as a ``to_tsvector(search_config, title)`` expression, so it can
+    be served by a GIN index on that expression.
+    """
+    search_config = 'simple'
+
+    def filter_title(self, queryset, title):
+        return queryset.annotate(
+            title_search=SearchVector('title', config=self.search_config),
+        ).filter(
+            title_search=SearchQuery(title, config=self.search_config))
@@ -9,7 +9,7 @@ from django.utils.translation import gettext_lazy as _
 from django.views import generic
 from django_tables2 import SingleTableMixin, SingleTableView
 
-from oscar.core.loading import get_classes, get_model
+from oscar.core.loading import get_class, get_classes, get_model
 from oscar.views.generic import ObjectLookupView
 
 (ProductForm,
@@ -51,6 +51,8 @@ ProductTable, CategoryTable, AttributeOptionGroupTable \
                   ('PopUpWindowCreateMixin',
                    'PopUpWindowUpdateMixin',
                    'PopUpWindowDeleteMixin'))
+get_product_search_backend = get_class(
+    'dashboard.catalogue.search', 'get_product_search_backend')
 Product = get_model('catalogue', 'Product')
 Category = get_model('catalogue', 'Category')
 ProductImage = get_model('catalogue', 'ProductImage')
@@ -120,11 +122,20 @@ class ProductListView(SingleTableView):
         """
         Build the queryset for this list
         """
-        queryset = Product.browsable.base_queryset()
+        # The table only shows one page, and the related objects are only
+        # prefetched for that page. The option counts of base_queryset()
+        # aren't used by the table, so they're left out to keep the count
+        # and page queries cheap.
+        queryset = Product.browsable.select_related(
+            'product_class').prefetch_related('children', 'stockrecords',
+                                              'images')
         queryset = self.filter_queryset(queryset)
         queryset = self.apply_search(queryset)
         return queryset
 
+    def get_search_backend(self):
+        return get_product_search_backend()
+
     def apply_search(self, queryset):
         """
         Filter the queryset and set the description according to the search
@@ -136,27 +147,8 @@ class ProductListView(SingleTableView):
             return queryset
 
         data = self.form.cleaned_data
-
-        if data.get('upc'):
-            # Filter the queryset by upc
-            # If there's an exact match, return it, otherwise return results
-            # that contain the UPC
-            matches_upc = Product.objects.filter(upc=data['upc'])
-            qs_match = queryset.filter(
-                Q(id__in=matches_upc.values('id')) |
-                Q(id__in=matches_upc.values('parent_id')))
-
-            if qs_match.exists():
-                queryset = qs_match
-            else:
-                matches_upc = Product.objects.filter(upc__icontains=data['upc'])
-                queryset = queryset.filter(
-                    Q(id__in=matches_upc.values('id')) | Q(id__in=matches_upc.values('parent_id')))
-
-        if data.get('title'):
-            queryset = queryset.filter(title__icontains=data['title'])
-
-        return queryset
+        return self.get_search_backend().search(
+            queryset, upc=data.get('upc'), title=data.get('title'))
 
 
 class ProductCreateRedirectView(generic.RedirectView):
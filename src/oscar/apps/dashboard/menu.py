@@ -1,25 +1,131 @@
 from django.conf import settings
 from django.core.exceptions import ImproperlyConfigured
+from django.urls import NoReverseMatch
 from django.utils.module_loading import import_string
 
-from oscar.core.loading import get_class
+from oscar.core.loading import get_classes
 
-Node = get_class('dashboard.nav', 'Node')
+Node, default_access_fn, get_url_permissions = get_classes(
+    'dashboard.nav', ['Node', 'default_access_fn', 'get_url_permissions'])
 
 
 def get_nodes(user):
     """
     Return the visible navigation nodes for the passed user
     """
-    all_nodes = create_menu(settings.OSCAR_DASHBOARD_NAVIGATION)
-    visible_nodes = []
-    for node in all_nodes:
-        filtered_node = node.filter(user)
-        # don't append headings without children
-        if filtered_node and (filtered_node.has_children() or
-                              not filtered_node.is_heading):
-            visible_nodes.append(filtered_node)
-    return visible_nodes
+    return get_menu().get_nodes(user)
+
+
+def get_menu():
+    """
+    Return the compiled navigation menu for OSCAR_DASHBOARD_NAVIGATION
+
+    The menu is built once and rebuilt only if the navigation settings
+    change.
+    """
+    global _menu
+    menu = _menu
+    if (menu is None
+            or menu.menu_items is not settings.OSCAR_DASHBOARD_NAVIGATION
+            or menu.default_access_fn_path
+            != settings.OSCAR_DASHBOARD_DEFAULT_ACCESS_FUNCTION):
+        menu = _menu = Menu(settings.OSCAR_DASHBOARD_NAVIGATION)
+    return menu
+
+
+_menu = None
+
+
+class Menu(object):
+    """
+    The dashboard navigation tree, with the visible nodes memoized per
+    distinct set of permissions.
+
+    The permissions required by nodes with the default access function are
+    looked up once. A user's cache key is made up of the user attributes and
+    permissions those nodes check, plus the visibility of the nodes that use
+    a custom access function, so users with the same permissions share a
+    menu and looking it up is a dictionary access.
+    """
+
+    def __init__(self, menu_items):
+        self.menu_items = menu_items
+        self.default_access_fn_path = \
+            settings.OSCAR_DASHBOARD_DEFAULT_ACCESS_FUNCTION
+        self.nodes = create_menu(menu_items)
+        self._visible_nodes = {}
+        self._requirements = None
+
+    def iter_nodes(self, nodes=None):
+        for node in self.nodes if nodes is None else nodes:
+            yield node
+            yield from self.iter_nodes(node.children)
+
+    def get_requirements(self):
+        """
+        Return the user attributes and permissions the nodes check, and the
+        nodes whose visibility can't be derived from them.
+        """
+        if self._requirements is None:
+            conditions, permissions, custom_nodes = set(), set(), []
+            for node in self.iter_nodes():
+                if node.access_fn not in (None, default_access_fn):
+                    custom_nodes.append(node)
+                    continue
+                for perms in self.get_permission_lists(node):
+                    permissions.update(perm for perm in perms if '.' in perm)
+                    conditions.update(perm for perm in perms if '.' not in perm)
+            if conditions:
+                # check_permissions adds this to most permission lists
+                conditions.add('is_active')
+            self._requirements = (
+                sorted(conditions), sorted(permissions), custom_nodes)
+        return self._requirements
+
+    def get_permission_lists(self, node):
+        """
+        Return the lists of permissions the default access function checks
+        for the passed node
+        """
+        if node.access_fn is None or node.is_heading:
+            return []
+        try:
+            required = get_url_permissions(
+                node.url_name, node.url_args, node.url_kwargs)
+        except NoReverseMatch:
+            return []
+        if isinstance(required, list):
+            return [required]
+        return required or []
+
+    def get_cache_key(self, user):
+        conditions, permissions, custom_nodes = self.get_requirements()
+        values = []
+        for condition in conditions:
+            value = getattr(user, condition)
+            values.append(bool(value() if callable(value) else value))
+        return (tuple(values),
+                frozenset(perm for perm in permissions if user.has_perm(perm)),
+                tuple(node.is_visible(user) for node in custom_nodes))
+
+    def get_nodes(self, user):
+        """
+        Return the visible navigation nodes for the passed user
+        """
+        key = self.get_cache_key(user)
+        try:
+            return self._visible_nodes[key]
+        except KeyError:
+            pass
+        visible_nodes = []
+        for node in self.nodes:
+            filtered_node = node.filter(user)
+            # don't append headings without children
+            if filtered_node and (filtered_node.has_children() or
+                                  not filtered_node.is_heading):
+                visible_nodes.append(filtered_node)
+        self._visible_nodes[key] = visible_nodes
+        return visible_nodes
 
 
 def create_menu(menu_items, parent=None):
@@ -1,8 +1,10 @@
 import logging
 import re
+from functools import lru_cache
 
+from django.conf import settings
 from django.core.exceptions import ImproperlyConfigured
-from django.urls import NoReverseMatch, resolve, reverse
+from django.urls import NoReverseMatch, get_urlconf, resolve, reverse
 
 from oscar.core.loading import AppNotFoundError, get_class
 from oscar.views.decorators import check_permissions
@@ -68,26 +70,50 @@ def default_access_fn(user, url_name, url_args=None, url_kwargs=None):
     Once the permissions for the view are known, the access logic used
     by the dashboard decorator is evaluated
 
-    This function might seem costly, but a simple comparison with DTT
-    did not show any change in response time
+    The permissions of each URL are only looked up once (see
+    ``get_url_permissions``), so this is cheap to call repeatedly.
     """
-    exception = ImproperlyConfigured(
-        "Please follow Oscar's default dashboard app layout or set a "
-        "custom access_fn")
     if url_name is None:  # it's a heading
         return True
 
-    # get view module string.
     try:
-        url = reverse(url_name, args=url_args, kwargs=url_kwargs)
+        permissions = get_url_permissions(url_name, url_args, url_kwargs)
     except NoReverseMatch:
         # In Oscar 1.5 this exception was silently ignored which made debugging
         # very difficult. Now it is being logged and in future the exception will
         # be propagated.
         logger.exception('Invalid URL name {}'.format(url_name))
         return False
+    return check_permissions(user, permissions)
 
-    view_module = resolve(url).func.__module__
+
+def get_url_permissions(url_name, url_args=None, url_kwargs=None):
+    """
+    Return the permissions required to access the dashboard view of a URL, as
+    accepted by ``check_permissions``.
+
+    The lookup involves reversing and resolving the URL and loading the
+    view's application, so its result is memoized per URL configuration.
+    Raises ``NoReverseMatch`` for invalid URL names.
+    """
+    if url_args is not None:
+        url_args = tuple(url_args)
+    if url_kwargs is not None:
+        url_kwargs = tuple(sorted(url_kwargs.items()))
+    urlconf = get_urlconf() or settings.ROOT_URLCONF
+    return _get_url_permissions(urlconf, url_name, url_args, url_kwargs)
+
+
+@lru_cache(maxsize=None)
+def _get_url_permissions(urlconf, url_name, url_args, url_kwargs):
+    exception = ImproperlyConfigured(
+        "Please follow Oscar's default dashboard app layout or set a "
+        "custom access_fn")
+
+    # get view module string.
+    url = reverse(url_name, urlconf=urlconf, args=url_args,
+                  kwargs=dict(url_kwargs) if url_kwargs is not None else None)
+    view_module = resolve(url, urlconf=urlconf).func.__module__
 
     # We can't assume that the view has the same parent module as the app,
     # as either the app or view can be customised. So we turn the module
@@ -110,5 +136,4 @@ def default_access_fn(user, url_name, url_args=None, url_kwargs=None):
         view_name = url_name.split(':')[1]
     else:
         view_name = url_name
-    permissions = app_instance.get_permissions(view_name)
-    return check_permissions(user, permissions)
+    return app_instance.get_permissions(view_name)
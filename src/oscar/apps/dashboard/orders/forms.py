@@ -67,6 +67,7 @@ class OrderStatsForm(forms.Form):
 class OrderSearchForm(forms.Form):
     order_number = forms.CharField(required=False, label=_("Order number"))
     name = forms.CharField(required=False, label=_("Customer name"))
+    email = forms.CharField(required=False, label=_("Customer email"))
     product_title = forms.CharField(required=False, label=_("Product name"))
     upc = forms.CharField(required=False, label=_("UPC"))
     partner_sku = forms.CharField(required=False, label=_("Partner SKU"))
@@ -6,8 +6,9 @@ from decimal import InvalidOperation
 from django.conf import settings
 from django.contrib import messages
 from django.core.exceptions import ObjectDoesNotExist
-from django.db.models import Count, Q, Sum, fields
-from django.http import Http404, HttpResponse, HttpResponseRedirect
+from django.db.models import (
+    Count, OuterRef, Q, QuerySet, Subquery, Sum, fields)
+from django.http import Http404, HttpResponseRedirect, StreamingHttpResponse
 from django.shortcuts import get_object_or_404, redirect
 from django.urls import reverse
 from django.utils.translation import gettext_lazy as _
@@ -15,7 +16,8 @@ from django.views.generic import DetailView, FormView, ListView, UpdateView
 
 from oscar.apps.order import exceptions as order_exceptions
 from oscar.apps.payment.exceptions import PaymentError
-from oscar.core.compat import UnicodeCSVWriter
+from oscar.core.compat import (
+    StreamingCSVBuffer, UnicodeCSVWriter, queryset_iterator)
 from oscar.core.loading import get_class, get_model
 from oscar.core.utils import datetime_combine, format_datetime
 from oscar.views import sort_queryset
@@ -28,6 +30,7 @@ Order = get_model('order', 'Order')
 OrderNote = get_model('order', 'OrderNote')
 ShippingAddress = get_model('order', 'ShippingAddress')
 Line = get_model('order', 'Line')
+OrderSearchTerm = get_model('order', 'OrderSearchTerm')
 ShippingEventType = get_model('order', 'ShippingEventType')
 PaymentEventType = get_model('order', 'PaymentEventType')
 EventHandler = get_class('order.processing', 'EventHandler')
@@ -117,6 +120,7 @@ class OrderListView(BulkEditMixin, ListView):
     form_class = OrderSearchForm
     paginate_by = settings.OSCAR_DASHBOARD_ITEMS_PER_PAGE
     actions = ('download_selected_orders', 'change_order_statuses')
+    download_chunk_size = 2000
 
     def dispatch(self, request, *args, **kwargs):
         # base_queryset is equal to all orders the user is allowed to access
@@ -155,6 +159,8 @@ class OrderListView(BulkEditMixin, ListView):
             queryset = self.base_queryset.filter(
                 number__istartswith=data['order_number'])
 
+        # The other filters look up the orders' search terms, which is a
+        # single indexed query per filter and doesn't need DISTINCT.
         if data['name']:
             # If the value is two words, then assume they are first name and
             # last name
@@ -164,27 +170,32 @@ class OrderListView(BulkEditMixin, ListView):
             if len(parts) == 1:
                 parts = [data['name'], data['name']]
             else:
-                parts = [parts[0], parts[1:]]
+                parts = [parts[0], ' '.join(parts[1:])]
 
-            filter = Q(user__first_name__istartswith=parts[0])
-            filter |= Q(user__last_name__istartswith=parts[1])
+            first_name_fields = [OrderSearchTerm.FIRST_NAME]
+            last_name_fields = [OrderSearchTerm.LAST_NAME]
             if allow_anon:
-                filter |= Q(billing_address__first_name__istartswith=parts[0])
-                filter |= Q(shipping_address__first_name__istartswith=parts[0])
-                filter |= Q(billing_address__last_name__istartswith=parts[1])
-                filter |= Q(shipping_address__last_name__istartswith=parts[1])
+                first_name_fields.append(OrderSearchTerm.ADDRESS_FIRST_NAME)
+                last_name_fields.append(OrderSearchTerm.ADDRESS_LAST_NAME)
 
-            queryset = queryset.filter(filter).distinct()
-
-        if data['product_title']:
             queryset = queryset.filter(
-                lines__title__istartswith=data['product_title']).distinct()
-
-        if data['upc']:
-            queryset = queryset.filter(lines__upc=data['upc'])
-
-        if data['partner_sku']:
-            queryset = queryset.filter(lines__partner_sku=data['partner_sku'])
+                Q(id__in=OrderSearchTerm.get_order_ids(
+                    first_name_fields, parts[0]))
+                | Q(id__in=OrderSearchTerm.get_order_ids(
+                    last_name_fields, parts[1])))
+
+        search_fields = [
+            ('email', OrderSearchTerm.EMAIL),
+            ('product_title', OrderSearchTerm.PRODUCT_TITLE),
+            ('upc', OrderSearchTerm.UPC),
+            ('partner_sku', OrderSearchTerm.PARTNER_SKU),
+            ('voucher', OrderSearchTerm.VOUCHER_CODE),
+            ('payment_method', OrderSearchTerm.PAYMENT_METHOD),
+        ]
+        for form_field, term_field in search_fields:
+            if data[form_field]:
+                queryset = queryset.filter(id__in=OrderSearchTerm.get_order_ids(
+                    term_field, data[form_field]))
 
         if data['date_from'] and data['date_to']:
             date_to = datetime_combine(data['date_to'], datetime.time.max)
@@ -198,14 +209,6 @@ class OrderListView(BulkEditMixin, ListView):
             date_to = datetime_combine(data['date_to'], datetime.time.max)
             queryset = queryset.filter(date_placed__lt=date_to)
 
-        if data['voucher']:
-            queryset = queryset.filter(
-                discounts__voucher_code=data['voucher']).distinct()
-
-        if data['payment_method']:
-            queryset = queryset.filter(
-                sources__source_type__code=data['payment_method']).distinct()
-
         if data['status']:
             queryset = queryset.filter(status=data['status'])
 
@@ -245,6 +248,13 @@ class OrderListView(BulkEditMixin, ListView):
                 )
             )
 
+        if data.get('email'):
+            descriptions.append(
+                _('Customer email starts with "{email}"').format(
+                    email=data['email']
+                )
+            )
+
         if data.get('product_title'):
             descriptions.append(
                 _('Product name matches "{product_name}"').format(
@@ -356,11 +366,32 @@ class OrderListView(BulkEditMixin, ListView):
     def get_download_filename(self, request):
         return 'orders.csv'
 
+    def get_download_queryset(self, orders):
+        """
+        Prepare the orders queryset for the CSV download. The orders are read
+        in chunks, so instead of prefetching their lines, the number of items
+        is annotated.
+        """
+        num_items = Line.objects.filter(order=OuterRef('pk')).order_by() \
+            .values('order').annotate(num_items=Sum('quantity')) \
+            .values('num_items')
+        return orders.prefetch_related(None).annotate(
+            csv_num_items=Subquery(num_items, output_field=fields.IntegerField()))
+
     def download_selected_orders(self, request, orders):
-        response = HttpResponse(content_type='text/csv')
+        if isinstance(orders, QuerySet):
+            orders = queryset_iterator(
+                self.get_download_queryset(orders),
+                chunk_size=self.download_chunk_size)
+        response = StreamingHttpResponse(
+            self.generate_csv(orders), content_type='text/csv')
         response['Content-Disposition'] = 'attachment; filename=%s' \
             % self.get_download_filename(request)
-        writer = UnicodeCSVWriter(open_file=response)
+        return response
+
+    def generate_csv(self, orders):
+        buffer = StreamingCSVBuffer()
+        writer = UnicodeCSVWriter(open_file=buffer)
 
         meta_data = (('number', _('Order number')),
                      ('value', _('Order value')),
@@ -376,12 +407,16 @@ class OrderListView(BulkEditMixin, ListView):
             columns[k] = v
 
         writer.writerow(columns.values())
+        yield buffer.read()
         for order in orders:
             row = columns.copy()
             row['number'] = order.number
             row['value'] = order.total_incl_tax
             row['date'] = format_datetime(order.date_placed, 'DATETIME_FORMAT')
-            row['num_items'] = order.num_items
+            if hasattr(order, 'csv_num_items'):
+                row['num_items'] = order.csv_num_items or 0
+            else:
+                row['num_items'] = order.num_items
             row['status'] = order.status
             row['customer'] = order.email
             if order.shipping_address:
@@ -393,7 +428,7 @@ class OrderListView(BulkEditMixin, ListView):
             else:
                 row['billing_address_name'] = ''
             writer.writerow(row.values())
-        return response
+            yield buffer.read()
 
     def change_order_statuses(self, request, orders):
         for order in orders:
@@ -176,7 +176,14 @@ class RangeProductListView(BulkEditMixin, ListView):
         if 'file_upload' not in request.FILES:
             return
         upload = self.create_upload_object(request, range)
-        products = upload.process()
+        background_size = settings.OSCAR_RANGE_UPLOAD_BACKGROUND_SIZE
+        if background_size is not None and upload.size > background_size:
+            messages.info(
+                request,
+                _("File %s will be processed in the background") %
+                upload.filename)
+            return
+        stats = upload.process()
         if not upload.was_processing_successful():
             messages.error(request, upload.error_message)
         else:
@@ -185,8 +192,8 @@ class RangeProductListView(BulkEditMixin, ListView):
                 {'range': range,
                  'upload': upload})
             messages.success(request, msg, extra_tags='safe noicon block')
+            self.warn_about_sku_duplicates(request, stats.duplicate_skus)
         upload.delete_file()
-        self.check_imported_products_sku_duplicates(request, products)
 
     def create_upload_object(self, request, range):
         f = request.FILES['file_upload']
@@ -206,12 +213,15 @@ class RangeProductListView(BulkEditMixin, ListView):
         dupe_sku_products = queryset.values('stockrecords__partner_sku')\
                                     .annotate(total=Count('stockrecords__partner_sku'))\
                                     .filter(total__gt=1).order_by('stockrecords__partner_sku')
-        if dupe_sku_products:
-            dupe_skus = [p['stockrecords__partner_sku'] for p in dupe_sku_products]
+        self.warn_about_sku_duplicates(
+            request, [p['stockrecords__partner_sku'] for p in dupe_sku_products])
+
+    def warn_about_sku_duplicates(self, request, dupe_skus):
+        if dupe_skus:
             messages.warning(
                 request,
                 _("There are more than one product with SKU %s") %
-                ", ".join(dupe_skus)
+                ", ".join(sorted(dupe_skus))
             )
 
 
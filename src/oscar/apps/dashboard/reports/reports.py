@@ -1,11 +1,13 @@
 from datetime import datetime, time
 
-from django.http import HttpResponse
+from django.db.models import QuerySet
+from django.http import HttpResponse, StreamingHttpResponse
 from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
 
 from oscar.core import utils
-from oscar.core.compat import UnicodeCSVWriter
+from oscar.core.compat import (
+    StreamingCSVBuffer, UnicodeCSVWriter, queryset_iterator)
 
 
 class ReportGenerator(object):
@@ -99,15 +101,56 @@ class ReportFormatter(object):
 
 
 class ReportCSVFormatter(ReportFormatter):
+    """
+    Writes a report as CSV file.
+
+    Subclasses either implement ``get_header_row`` and ``get_row``, or
+    override ``generate_csv``. Formatters of the former kind can set
+    ``streaming`` to send the file with a ``StreamingHttpResponse``, which
+    writes the rows as they are read from the database instead of building the
+    whole file in memory. Querysets are then read in chunks of
+    ``chunk_size`` rows, so any related data should be fetched with
+    ``select_related`` or annotations rather than ``prefetch_related``.
+    """
+    streaming = False
+    chunk_size = 2000
 
     def get_csv_writer(self, file_handle, **kwargs):
         return UnicodeCSVWriter(open_file=file_handle, **kwargs)
 
+    def get_header_row(self):
+        raise NotImplementedError
+
+    def get_row(self, obj):
+        raise NotImplementedError
+
+    def get_rows(self, objects):
+        yield self.get_header_row()
+        if isinstance(objects, QuerySet):
+            objects = queryset_iterator(objects, chunk_size=self.chunk_size)
+        for obj in objects:
+            yield self.get_row(obj)
+
+    def generate_csv(self, response, objects):
+        writer = self.get_csv_writer(response)
+        writer.writerows(self.get_rows(objects))
+
+    def stream_csv(self, objects):
+        buffer = StreamingCSVBuffer()
+        writer = self.get_csv_writer(buffer)
+        for row in self.get_rows(objects):
+            writer.writerow(row)
+            yield buffer.read()
+
     def generate_response(self, objects, **kwargs):
-        response = HttpResponse(content_type='text/csv')
+        if self.streaming:
+            response = StreamingHttpResponse(
+                self.stream_csv(objects), content_type='text/csv')
+        else:
+            response = HttpResponse(content_type='text/csv')
+            self.generate_csv(response, objects)
         response['Content-Disposition'] = 'attachment; filename=%s' \
             % self.filename(**kwargs)
-        self.generate_csv(response, objects)
         return response
 
 
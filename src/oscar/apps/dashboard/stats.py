@@ -0,0 +1,216 @@
+from datetime import timedelta
+from decimal import Decimal as D
+from decimal import ROUND_UP
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Avg, Case, Count, Q, Sum, When
+from django.db.models.functions import TruncHour
+from django.utils import timezone
+
+from oscar.apps.promotions.models import AbstractPromotion
+from oscar.core.compat import get_user_model
+from oscar.core.loading import get_model
+
+ConditionalOffer = get_model('offer', 'ConditionalOffer')
+Voucher = get_model('voucher', 'Voucher')
+Basket = get_model('basket', 'Basket')
+StockAlert = get_model('partner', 'StockAlert')
+Product = get_model('catalogue', 'Product')
+Order = get_model('order', 'Order')
+Line = get_model('order', 'Line')
+User = get_user_model()
+
+
+class DashboardStats(object):
+    """
+    Computes the statistics displayed on the dashboard's index page.
+
+    Related counts and sums are computed with one conditional aggregate query
+    per table, and the hourly revenue report with a single query grouping the
+    orders by hour. The result is cached for OSCAR_DASHBOARD_STATS_CACHE_TIMEOUT
+    seconds; the ``oscar_refresh_dashboard_stats`` management command can be
+    used to refresh it periodically, so page views don't need to query the
+    database at all.
+    """
+    cache_key = 'oscar-dashboard-stats'
+
+    def get_stats(self):
+        """
+        Return the cached statistics, computing them if necessary.
+        """
+        stats = cache.get(self.cache_key)
+        if stats is None:
+            stats = self.refresh()
+        return stats
+
+    def refresh(self):
+        """
+        Compute the statistics and store them in the cache.
+        """
+        stats = self.compute()
+        cache.set(self.cache_key, stats,
+                  settings.OSCAR_DASHBOARD_STATS_CACHE_TIMEOUT)
+        return stats
+
+    def compute(self):
+        datetime_24hrs_ago = timezone.now() - timedelta(hours=24)
+        last_day = Q(date_placed__gt=datetime_24hrs_ago)
+
+        order_stats = Order.objects.aggregate(
+            total_orders=Count('id'),
+            total_revenue=Sum('total_incl_tax'),
+            total_orders_last_day=Count(self.only(last_day, 'id')),
+            total_revenue_last_day=Sum(
+                self.only(last_day, 'total_incl_tax')),
+            average_order_costs=Avg(self.only(last_day, 'total_incl_tax')))
+        line_stats = Line.objects.aggregate(
+            total_lines=Count('id'),
+            total_lines_last_day=Count(self.only(
+                Q(order__date_placed__gt=datetime_24hrs_ago), 'id')))
+        customer_stats = User.objects.aggregate(
+            total_customers=Count('pk'),
+            total_customers_last_day=Count(self.only(
+                Q(date_joined__gt=datetime_24hrs_ago), 'pk')))
+        basket_stats = self.get_open_baskets().aggregate(
+            total_open_baskets=Count('id'),
+            total_open_baskets_last_day=Count(self.only(
+                Q(date_created__gt=datetime_24hrs_ago), 'id')))
+        alert_stats = StockAlert.objects.aggregate(
+            total_open_stock_alerts=Count(
+                self.only(Q(status=StockAlert.OPEN), 'id')),
+            total_closed_stock_alerts=Count(
+                self.only(Q(status=StockAlert.CLOSED), 'id')))
+
+        stats = {
+            'hourly_report_dict': self.get_hourly_report(hours=24),
+            'total_products': Product.objects.count(),
+            'total_site_offers': self.get_active_site_offers().count(),
+            'total_vouchers': self.get_active_vouchers().count(),
+            'total_promotions': self.get_number_of_promotions(),
+            'order_status_breakdown': list(
+                Order.objects.order_by('status').values('status')
+                .annotate(freq=Count('id'))),
+        }
+        for aggregates in (order_stats, line_stats, customer_stats,
+                           basket_stats, alert_stats):
+            stats.update(aggregates)
+        for key in ('total_revenue', 'total_revenue_last_day',
+                    'average_order_costs'):
+            stats[key] = stats[key] or D('0.00')
+        return stats
+
+    def only(self, condition, field):
+        """
+        Return an expression that is *field* for rows matching *condition*
+        and NULL otherwise, so aggregates over it only take the matching rows
+        into account.
+
+        This is equivalent to passing ``filter=condition`` to the aggregate,
+        which Django 1.11 doesn't support.
+        """
+        return Case(When(condition, then=field))
+
+    def get_active_site_offers(self):
+        """
+        Return active conditional offers of type "site offer". The returned
+        ``Queryset`` of site offers is filtered by end date greater then
+        the current date.
+        """
+        return ConditionalOffer.objects.filter(
+            end_datetime__gt=timezone.now(), offer_type=ConditionalOffer.SITE)
+
+    def get_active_vouchers(self):
+        """
+        Get all active vouchers. The returned ``Queryset`` of vouchers
+        is filtered by end date greater then the current date.
+        """
+        return Voucher.objects.filter(end_datetime__gt=timezone.now())
+
+    def get_number_of_promotions(self, abstract_base=AbstractPromotion):
+        """
+        Get the number of promotions for all promotions derived from
+        *abstract_base*. All subclasses of *abstract_base* are queried
+        and if another abstract base class is found this method is executed
+        recursively.
+        """
+        total = 0
+        for cls in abstract_base.__subclasses__():
+            if cls._meta.abstract:
+                total += self.get_number_of_promotions(cls)
+            else:
+                total += cls.objects.count()
+        return total
+
+    def get_open_baskets(self, filters=None):
+        """
+        Get all open baskets. If *filters* dictionary is provided they will
+        be applied on all open baskets and return only filtered results.
+        """
+        if filters is None:
+            filters = {}
+        filters['status'] = Basket.OPEN
+        return Basket.objects.filter(**filters)
+
+    def get_hourly_report(self, hours=24, segments=10):
+        """
+        Get report of order revenue split up in hourly chunks. A report is
+        generated for the last *hours* (default=24) from the current time.
+        The report provides ``max_revenue`` of the hourly order revenue sum,
+        ``y-range`` as the labeling for the y-axis in a template and
+        ``order_total_hourly``, a list of properties for hourly chunks.
+        *segments* defines the number of labeling segments used for the y-axis
+        when generating the y-axis labels (default=10).
+        """
+        time_now = timezone.now().replace(minute=0, second=0, microsecond=0)
+        start_time = time_now - timedelta(hours=hours - 1)
+
+        # Sum the revenue per hour in the database, using UTC so that the
+        # hours line up with start_time in every time zone.
+        tzinfo = timezone.utc if settings.USE_TZ else None
+        hourly_totals = (
+            Order.objects.filter(date_placed__gt=start_time)
+            .annotate(hour=TruncHour('date_placed', tzinfo=tzinfo))
+            .order_by().values('hour')
+            .annotate(total=Sum('total_incl_tax'))
+            .values_list('hour', 'total'))
+
+        # The report is split up in chunks of two hours
+        num_chunks = (hours + 1) // 2
+        totals = [D('0.0')] * num_chunks
+        for hour, total in hourly_totals:
+            index = int((hour - start_time).total_seconds() // 7200)
+            if 0 <= index < num_chunks and total:
+                totals[index] += total
+
+        order_total_hourly = [
+            {'end_time': start_time + timedelta(hours=2 * (index + 1)),
+             'total_incl_tax': total}
+            for index, total in enumerate(totals)]
+
+        max_value = max([x['total_incl_tax'] for x in order_total_hourly])
+        divisor = 1
+        while divisor < max_value / 50:
+            divisor *= 10
+        max_value = (max_value / divisor).quantize(D('1'), rounding=ROUND_UP)
+        max_value *= divisor
+        if max_value:
+            segment_size = (max_value) / D('100.0')
+            for item in order_total_hourly:
+                item['percentage'] = int(item['total_incl_tax'] / segment_size)
+
+            y_range = []
+            y_axis_steps = max_value / D(str(segments))
+            for idx in reversed(range(segments + 1)):
+                y_range.append(idx * y_axis_steps)
+        else:
+            y_range = []
+            for item in order_total_hourly:
+                item['percentage'] = 0
+
+        ctx = {
+            'order_total_hourly': order_total_hourly,
+            'max_revenue': max_value,
+            'y_range': y_range,
+        }
+        return ctx
@@ -1,12 +1,13 @@
+import functools
 import itertools
 import operator
 import os
-import re
 from decimal import Decimal as D
 from decimal import ROUND_DOWN
 
 from django.conf import settings
 from django.core import exceptions
+from django.core.cache import cache
 from django.db import models
 from django.db.models.query import Q
 from django.template.defaultfilters import date as date_filter
@@ -23,7 +24,11 @@ from oscar.templatetags.currency_filters import currency
 ActiveOfferManager, BrowsableRangeManager \
     = get_classes('offer.managers', ['ActiveOfferManager', 'BrowsableRangeManager'])
 ZERO_DISCOUNT = get_class('offer.results', 'ZERO_DISCOUNT')
-load_proxy, unit_price = get_classes('offer.utils', ['load_proxy', 'unit_price'])
+load_proxy, unit_price, RangeIndex, get_range_index_cache_key = get_classes(
+    'offer.utils',
+    ['load_proxy', 'unit_price', 'RangeIndex', 'get_range_index_cache_key'])
+
+EMPTY_RANGE_INDEX = RangeIndex(*[frozenset()] * len(RangeIndex._fields))
 
 
 class BaseOfferMixin(models.Model):
@@ -220,6 +225,10 @@ class AbstractConditionalOffer(models.Model):
         verbose_name = _("Conditional offer")
         verbose_name_plural = _("Conditional offers")
 
+    #: The fields that record_usage() saves
+    usage_fields = ['num_applications', 'total_discount', 'num_orders',
+                    'status']
+
     def save(self, *args, **kwargs):
         # Check to see if consumption thresholds have been broken
         if not self.is_suspended:
@@ -343,7 +352,8 @@ class AbstractConditionalOffer(models.Model):
         self.num_applications += discount['freq']
         self.total_discount += discount['discount']
         self.num_orders += 1
-        self.save()
+        # save() updates the status when a limit has been reached
+        self.save(update_fields=self.usage_fields)
     record_usage.alters_data = True
 
     def availability_description(self):
@@ -651,24 +661,40 @@ class AbstractBenefit(BaseOfferMixin, models.Model):
         """
         if range is None:
             range = self.range
-        line_tuples = []
-        for line in basket.all_lines():
-            product = line.product
-
-            if (not range.contains(product) or
-                    not self.can_apply_benefit(line)):
-                continue
-
-            price = unit_price(offer, line)
-            if not price:
-                # Avoid zero price products
-                continue
-            if line.quantity_without_offer_discount(offer) == 0:
-                continue
-            line_tuples.append((price, line))
 
-        # We sort lines to be cheapest first to ensure consistent applications
-        return sorted(line_tuples, key=operator.itemgetter(0))
+        def get_candidate_lines():
+            line_tuples = []
+            for line in basket.all_lines():
+                product = line.product
+
+                if (not range.contains(product) or
+                        not self.can_apply_benefit(line)):
+                    continue
+
+                price = unit_price(offer, line)
+                if not price:
+                    # Avoid zero price products
+                    continue
+                line_tuples.append((price, line))
+
+            # We sort lines to be cheapest first to ensure consistent
+            # applications
+            return sorted(line_tuples, key=operator.itemgetter(0))
+
+        # Only the quantities available for discount change between
+        # applications of an offer, so the candidate lines are computed once
+        # per evaluation of the basket.
+        context = basket.offer_evaluation_context
+        if context is None:
+            line_tuples = get_candidate_lines()
+        else:
+            # Proxies load a new range instance on each application, so
+            # saved ranges are identified by their primary key.
+            range_key = range.pk or id(range)
+            line_tuples = context.get_or_compute(
+                ('benefit', id(offer), range_key), get_candidate_lines)
+        return [(price, line) for price, line in line_tuples
+                if line.quantity_without_offer_discount(offer) > 0]
 
     def shipping_discount(self, charge):
         return D('0.00')
@@ -750,23 +776,42 @@ class AbstractCondition(BaseOfferMixin, models.Model):
         return (self.range.contains_product(product)
                 and product.get_is_discountable())
 
+    def get_matching_lines(self, offer, basket):
+        """
+        Return the basket lines that this condition can be applied to
+        """
+        def get_lines():
+            return [line for line in basket.all_lines()
+                    if self.can_apply_condition(line)]
+
+        # Which lines match doesn't change between applications of an offer,
+        # so they are only determined once per evaluation of the basket.
+        context = basket.offer_evaluation_context
+        if context is None:
+            return get_lines()
+        return context.get_or_compute(('condition', id(offer)), get_lines)
+
     def get_applicable_lines(self, offer, basket, most_expensive_first=True):
         """
         Return line data for the lines that can be consumed by this condition
         """
-        line_tuples = []
-        for line in basket.all_lines():
-            if not self.can_apply_condition(line):
-                continue
-
-            price = unit_price(offer, line)
-            if not price:
-                continue
-            line_tuples.append((price, line))
-        key = operator.itemgetter(0)
-        if most_expensive_first:
-            return sorted(line_tuples, reverse=True, key=key)
-        return sorted(line_tuples, key=key)
+        def get_line_tuples():
+            line_tuples = []
+            for line in self.get_matching_lines(offer, basket):
+                price = unit_price(offer, line)
+                if not price:
+                    continue
+                line_tuples.append((price, line))
+            key = operator.itemgetter(0)
+            if most_expensive_first:
+                return sorted(line_tuples, reverse=True, key=key)
+            return sorted(line_tuples, key=key)
+
+        context = basket.offer_evaluation_context
+        if context is None:
+            return get_line_tuples()
+        return list(context.get_or_compute(
+            ('condition', id(offer), most_expensive_first), get_line_tuples))
 
 
 class AbstractRange(models.Model):
@@ -809,10 +854,8 @@ class AbstractRange(models.Model):
 
     date_created = models.DateTimeField(_("Date Created"), auto_now_add=True)
 
-    __included_product_ids = None
-    __excluded_product_ids = None
-    __class_ids = None
-    __category_ids = None
+    __index = None
+    __product_category_ids = None
 
     objects = models.Manager()
     browsable = BrowsableRangeManager()
@@ -860,7 +903,7 @@ class AbstractRange(models.Model):
         # re-added again, thus it returns back to the range product list.
         if product.id in self._excluded_product_ids():
             self.excluded_products.remove(product)
-            self.invalidate_cached_ids()
+        self.invalidate_cached_ids()
 
     def remove_product(self, product):
         """
@@ -876,36 +919,55 @@ class AbstractRange(models.Model):
         # Invalidating cached property value with list of IDs of already excluded products.
         self.invalidate_cached_ids()
 
-    def contains_product(self, product):  # noqa (too complex (12))
+    def contains_product(self, product):
         """
         Check whether the passed product is part of this range.
+
+        The check is done against the range's compiled index, so it doesn't
+        hit the database for the range's data. Only if the range includes
+        categories, the product's categories are looked up once per range
+        instance.
         """
 
         # Delegate to a proxy class if one is provided
         if self.proxy:
             return self.proxy.contains_product(product)
 
-        excluded_product_ids = self._excluded_product_ids()
-        if product.id in excluded_product_ids:
+        index = self.get_index()
+        if product.id in index.excluded_product_ids:
             return False
         if self.includes_all_products:
             return True
-        if product.get_product_class().id in self._class_ids():
+        if product.get_product_class().id in index.class_ids:
             return True
-        included_product_ids = self._included_product_ids()
         # If the product's parent is in the range, the child is automatically included as well
-        if product.is_child and product.parent.id in included_product_ids:
+        if product.is_child and product.parent_id in index.included_product_ids:
             return True
-        if product.id in included_product_ids:
+        if product.id in index.included_product_ids:
             return True
-        test_categories = self.included_categories.all()
-        if test_categories:
-            for category in product.get_categories().all():
-                for test_category in test_categories:
-                    if category == test_category \
-                            or category.is_descendant_of(test_category):
-                        return True
-        return False
+        if not index.category_ids:
+            return False
+        return not index.category_ids.isdisjoint(
+            self.get_product_category_ids(product))
+
+    def get_product_category_ids(self, product):
+        """
+        Return the IDs of the categories of a product, or of its parent for
+        child products
+        """
+        # Child products inherit their parent's categories
+        if product.is_child:
+            product = product.parent
+        if self.__product_category_ids is None:
+            self.__product_category_ids = {}
+        if product.id not in self.__product_category_ids:
+            if 'categories' in getattr(
+                    product, '_prefetched_objects_cache', {}):
+                category_ids = [c.pk for c in product.categories.all()]
+            else:
+                category_ids = product.categories.values_list('pk', flat=True)
+            self.__product_category_ids[product.id] = frozenset(category_ids)
+        return self.__product_category_ids[product.id]
 
     # Shorter alias
     contains = contains_product
@@ -924,44 +986,69 @@ class AbstractRange(models.Model):
         # Ensure uniqueness and remove None; {4, 5, 10, 11}
         return set(flat_iterable) - {None}
 
-    def _included_product_ids(self):
+    def __get_descendant_category_ids(self):
+        """
+        Gets the primary keys of the included categories and all their
+        descendants with a single query.
+        """
+        Category = get_model('catalogue', 'Category')
+        paths = self.included_categories.values_list('path', flat=True)
+        if not paths:
+            return set()
+        descendants = functools.reduce(
+            operator.or_, [Q(path__startswith=path) for path in paths])
+        return set(Category.objects.filter(descendants).values_list(
+            'pk', flat=True))
+
+    def build_index(self):
+        """
+        Compile the membership data of this range into a RangeIndex.
+
+        This runs a handful of queries and should only be called on a cache
+        miss; use get_index() instead.
+        """
+        return RangeIndex(
+            included_product_ids=frozenset(
+                self.__get_pks_and_child_pks(self.included_products)),
+            excluded_product_ids=frozenset(
+                self.__get_pks_and_child_pks(self.excluded_products)),
+            class_ids=frozenset(self.classes.values_list('pk', flat=True)),
+            category_ids=frozenset(self.__get_descendant_category_ids()))
+
+    def get_index(self):
+        """
+        Return the compiled membership index of this range.
+
+        The index is shared across requests through the Django cache and is
+        invalidated by the receivers in oscar.apps.offer.signals whenever the
+        range or the catalogue data it depends on changes.
+        """
         if not self.id:
-            return []
-        if self.__included_product_ids is None:
-            self.__included_product_ids = self.__get_pks_and_child_pks(
-                self.included_products)
-        return self.__included_product_ids
+            return EMPTY_RANGE_INDEX
+        if self.__index is None:
+            cache_key = get_range_index_cache_key(self.id)
+            index = cache.get(cache_key)
+            if index is None:
+                index = self.build_index()
+                cache.set(cache_key, index)
+            self.__index = index
+        return self.__index
+
+    def _included_product_ids(self):
+        return self.get_index().included_product_ids
 
     def _excluded_product_ids(self):
-        if not self.id:
-            return []
-        if self.__excluded_product_ids is None:
-            self.__excluded_product_ids = self.__get_pks_and_child_pks(
-                self.excluded_products)
-        return self.__excluded_product_ids
+        return self.get_index().excluded_product_ids
 
     def _class_ids(self):
-        if self.__class_ids is None:
-            self.__class_ids = self.classes.values_list('pk', flat=True)
-        return self.__class_ids
+        return self.get_index().class_ids
 
     def _category_ids(self):
-        if self.__category_ids is None:
-            category_ids_list = list(
-                self.included_categories.values_list('pk', flat=True))
-            for category in self.included_categories.all():
-                children_ids = category.get_descendants().values_list(
-                    'pk', flat=True)
-                category_ids_list.extend(list(children_ids))
-
-            self.__category_ids = category_ids_list
-
-        return self.__category_ids
+        return self.get_index().category_ids
 
     def invalidate_cached_ids(self):
-        self.__category_ids = None
-        self.__included_product_ids = None
-        self.__excluded_product_ids = None
+        self.__index = None
+        self.__product_category_ids = None
 
     def num_products(self):
         # Delegate to a proxy class if one is provided
@@ -1085,48 +1172,34 @@ class AbstractRangeProductFileUpload(models.Model):
     def was_processing_successful(self):
         return self.status == self.PROCESSED
 
-    def process(self):
+    def process(self, chunk_size=1000, progress=None):
         """
         Process the file upload and add products to the range
-        """
-        all_ids = set(self.extract_ids())
-        products = self.range.all_products()
-        existing_skus = products.values_list(
-            'stockrecords__partner_sku', flat=True)
-        existing_skus = set(filter(bool, existing_skus))
-        existing_upcs = products.values_list('upc', flat=True)
-        existing_upcs = set(filter(bool, existing_upcs))
-        existing_ids = existing_skus.union(existing_upcs)
-        new_ids = all_ids - existing_ids
 
-        Product = get_model('catalogue', 'Product')
-        products = Product._default_manager.filter(
-            models.Q(stockrecords__partner_sku__in=new_ids) |
-            models.Q(upc__in=new_ids))
-        for product in products:
-            self.range.add_product(product)
-
-        # Processing stats
-        found_skus = products.values_list(
-            'stockrecords__partner_sku', flat=True)
-        found_skus = set(filter(bool, found_skus))
-        found_upcs = set(filter(bool, products.values_list('upc', flat=True)))
-        found_ids = found_skus.union(found_upcs)
-        missing_ids = new_ids - found_ids
-        dupes = set(all_ids).intersection(existing_ids)
-
-        self.mark_as_processed(products.count(), len(missing_ids), len(dupes))
-        return products
+        The file is streamed and its SKUs and UPCs are resolved in chunks
+        (see ``RangeProductImporter``). *progress* is called with the
+        ``RangeImportStats`` after every chunk. Returns the final
+        ``RangeImportStats``.
+        """
+        RangeProductImporter = get_class(
+            'offer.importers', 'RangeProductImporter')
+        importer = RangeProductImporter(self.range, chunk_size=chunk_size)
+        try:
+            stats = importer.run(self.extract_ids(), progress=progress)
+        except (OSError, UnicodeDecodeError) as e:
+            self.mark_as_failed(str(e)[:255])
+            return None
+        self.mark_as_processed(
+            stats.num_new, stats.num_unknown, stats.num_duplicate)
+        return stats
 
     def extract_ids(self):
         """
         Extract all SKU- or UPC-like strings from the file
         """
+        extract_ids = get_class('offer.importers', 'extract_ids')
         with open(self.filepath, 'r') as fh:
-            for line in fh:
-                for id in re.split('[^\w:\.-]', line):
-                    if id:
-                        yield id
+            yield from extract_ids(fh)
 
     def delete_file(self):
         os.unlink(self.filepath)
@@ -1,16 +1,46 @@
 import logging
 from itertools import chain
 
-from oscar.core.loading import get_class, get_model
+from oscar.core.loading import get_class
 
 logger = logging.getLogger('oscar.offers')
 OfferApplications = get_class('offer.results', 'OfferApplications')
+SiteOfferCache = get_class('offer.cache', 'SiteOfferCache')
+
+#: Shared by all applicators of this process
+site_offer_cache = SiteOfferCache()
 
 
 class OfferApplicationError(Exception):
     pass
 
 
+class OfferEvaluationContext(object):
+    """
+    Per-basket cache of the work done while evaluating offers.
+
+    Which basket lines an offer's condition or benefit can use, and at what
+    price, doesn't change while offers are applied; only the quantities
+    consumed by earlier applications do. Conditions and benefits store that
+    static data here so that repeated applications of an offer don't re-check
+    every line against the offer's ranges and re-sort them.
+
+    The context is only valid for the duration of a single
+    Applicator.apply_offers() call.
+    """
+
+    def __init__(self, basket):
+        self.basket = basket
+        self._cache = {}
+
+    def get_or_compute(self, key, func):
+        try:
+            return self._cache[key]
+        except KeyError:
+            value = self._cache[key] = func()
+            return value
+
+
 class Applicator(object):
 
     def apply(self, basket, user=None, request=None):
@@ -25,19 +55,24 @@ class Applicator(object):
 
     def apply_offers(self, basket, offers):
         applications = OfferApplications()
-        for offer in offers:
-            num_applications = 0
-            # Keep applying the offer until either
-            # (a) We reach the max number of applications for the offer.
-            # (b) The benefit can't be applied successfully.
-            while num_applications < offer.get_max_applications(basket.owner):
-                result = offer.apply_benefit(basket)
-                num_applications += 1
-                if not result.is_successful:
-                    break
-                applications.add(offer, result)
-                if result.is_final:
-                    break
+        basket.offer_evaluation_context = OfferEvaluationContext(basket)
+        try:
+            for offer in offers:
+                num_applications = 0
+                max_applications = offer.get_max_applications(basket.owner)
+                # Keep applying the offer until either
+                # (a) We reach the max number of applications for the offer.
+                # (b) The benefit can't be applied successfully.
+                while num_applications < max_applications:
+                    result = offer.apply_benefit(basket)
+                    num_applications += 1
+                    if not result.is_successful:
+                        break
+                    applications.add(offer, result)
+                    if result.is_final:
+                        break
+        finally:
+            basket.offer_evaluation_context = None
 
         # Store this list of discounts with the basket so it can be
         # rendered in templates
@@ -63,13 +98,11 @@ class Applicator(object):
     def get_site_offers(self):
         """
         Return site offers that are available to all users
+
+        The offers are served from a process-wide cache, so this usually
+        doesn't hit the database.
         """
-        ConditionalOffer = get_model('offer', 'ConditionalOffer')
-        qs = ConditionalOffer.active.filter(offer_type=ConditionalOffer.SITE)
-        # Using select_related with the condition/benefit ranges doesn't seem
-        # to work.  I think this is because both the related objects have the
-        # FK to range with the same name.
-        return qs.select_related('condition', 'benefit')
+        return site_offer_cache.get_offers()
 
     def get_basket_offers(self, basket, user):
         """
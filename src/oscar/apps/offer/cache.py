@@ -0,0 +1,105 @@
+import threading
+from datetime import timedelta
+
+from django.db import models
+from django.utils.timezone import now
+
+from oscar.core.cache import bump_version, get_version
+from oscar.core.loading import get_model
+from oscar.core.utils import clone_instance
+
+
+class SiteOfferCache(object):
+    """
+    A process-wide cache of the active site offers.
+
+    The offers are loaded together with their conditions, benefits and ranges
+    and kept in memory until either the offers version stored in the Django
+    cache changes (see invalidate()) or the next start or end date of a site
+    offer is reached.
+
+    Callers are handed copies of the cached instances so no per-request state
+    (like the memoised range indexes) leaks between requests or threads.
+    """
+    version_key = 'oscar-site-offers-version'
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._version = None
+        self._expires = None
+        self._offers = []
+        self._ranges = {}
+
+    @classmethod
+    def get_version(cls):
+        return get_version(cls.version_key)
+
+    @classmethod
+    def invalidate(cls):
+        """
+        Force all processes to reload the site offers.
+        """
+        bump_version(cls.version_key)
+
+    def is_stale(self, version):
+        if version != self._version:
+            return True
+        return self._expires is not None and now() >= self._expires
+
+    def get_offers(self):
+        """
+        Return the active site offers, ordered as per the model's default
+        ordering.
+        """
+        version = self.get_version()
+        with self._lock:
+            if self.is_stale(version):
+                self.load(version)
+            offers, ranges = self._offers, self._ranges
+        return self.hydrate(offers, ranges)
+
+    def load(self, version):
+        ConditionalOffer = get_model('offer', 'ConditionalOffer')
+        Range = get_model('offer', 'Range')
+
+        cutoff = now()
+        offers = list(
+            ConditionalOffer.active.filter(offer_type=ConditionalOffer.SITE)
+            .select_related('condition', 'benefit'))
+
+        range_ids = set()
+        for offer in offers:
+            range_ids.update([offer.condition.range_id, offer.benefit.range_id])
+        range_ids.discard(None)
+        ranges = Range.objects.in_bulk(range_ids) if range_ids else {}
+
+        # Offers become unavailable right after their end date, and upcoming
+        # offers become available at their start date.
+        boundaries = [offer.end_datetime + timedelta(microseconds=1)
+                      for offer in offers if offer.end_datetime]
+        next_start = ConditionalOffer.objects.filter(
+            offer_type=ConditionalOffer.SITE, status=ConditionalOffer.OPEN,
+            start_datetime__gt=cutoff,
+        ).aggregate(next_start=models.Min('start_datetime'))['next_start']
+        if next_start:
+            boundaries.append(next_start)
+
+        self._offers = offers
+        self._ranges = ranges
+        self._expires = min(boundaries) if boundaries else None
+        self._version = version
+
+    def hydrate(self, offers, ranges):
+        ranges = {pk: clone_instance(range) for pk, range in ranges.items()}
+        hydrated = []
+        for offer in offers:
+            condition = offer.condition.proxy()
+            condition.range = ranges.get(condition.range_id)
+            benefit = offer.benefit.proxy()
+            benefit.range = ranges.get(benefit.range_id)
+
+            offer = clone_instance(offer)
+            offer.condition = condition
+            offer.benefit = benefit
+            hydrated.append(offer)
+        return hydrated
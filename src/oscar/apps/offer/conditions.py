@@ -45,10 +45,8 @@ class CountCondition(Condition):
         Determines whether a given basket meets this condition
         """
         num_matches = 0
-        for line in basket.all_lines():
-            if (self.can_apply_condition(line)
-                    and line.quantity_without_offer_discount(offer) > 0):
-                num_matches += line.quantity_without_offer_discount(offer)
+        for line in self.get_matching_lines(offer, basket):
+            num_matches += line.quantity_without_offer_discount(offer)
             if num_matches >= self.value:
                 return True
         return False
@@ -57,10 +55,8 @@ class CountCondition(Condition):
         if hasattr(self, '_num_matches'):
             return getattr(self, '_num_matches')
         num_matches = 0
-        for line in basket.all_lines():
-            if (self.can_apply_condition(line)
-                    and line.quantity_without_offer_discount(offer) > 0):
-                num_matches += line.quantity_without_offer_discount(offer)
+        for line in self.get_matching_lines(offer, basket):
+            num_matches += line.quantity_without_offer_discount(offer)
         self._num_matches = num_matches
         return num_matches
 
@@ -134,27 +130,20 @@ class CoverageCondition(Condition):
         """
         Determines whether a given basket meets this condition
         """
-        covered_ids = []
-        for line in basket.all_lines():
+        covered_ids = set()
+        for line in self.get_matching_lines(offer, basket):
             if not line.is_available_for_offer_discount(offer):
                 continue
-            product = line.product
-            if (self.can_apply_condition(line) and product.id not in
-                    covered_ids):
-                covered_ids.append(product.id)
+            covered_ids.add(line.product.id)
             if len(covered_ids) >= self.value:
                 return True
         return False
 
     def _get_num_covered_products(self, basket, offer):
-        covered_ids = []
-        for line in basket.all_lines():
-            if not line.is_available_for_offer_discount(offer):
-                continue
-            product = line.product
-            if (self.can_apply_condition(line) and product.id not in
-                    covered_ids):
-                covered_ids.append(product.id)
+        covered_ids = set()
+        for line in self.get_matching_lines(offer, basket):
+            if line.is_available_for_offer_discount(offer):
+                covered_ids.add(line.product.id)
         return len(covered_ids)
 
     def get_upsell_message(self, offer, basket):
@@ -181,10 +170,8 @@ class CoverageCondition(Condition):
         if to_consume == 0:
             return
 
-        for line in basket.all_lines():
+        for line in self.get_matching_lines(offer, basket):
             product = line.product
-            if not self.can_apply_condition(line):
-                continue
             if product in consumed_products:
                 continue
             if not line.is_available_for_offer_discount(offer):
@@ -197,12 +184,11 @@ class CoverageCondition(Condition):
                 break
 
     def get_value_of_satisfying_items(self, offer, basket):
-        covered_ids = []
+        covered_ids = set()
         value = D('0.00')
-        for line in basket.all_lines():
-            if (self.can_apply_condition(line) and line.product.id not in
-                    covered_ids):
-                covered_ids.append(line.product.id)
+        for line in self.get_matching_lines(offer, basket):
+            if line.product.id not in covered_ids:
+                covered_ids.add(line.product.id)
                 value += unit_price(offer, line)
             if len(covered_ids) >= self.value:
                 return value
@@ -239,13 +225,9 @@ class ValueCondition(Condition):
         Determine whether a given basket meets this condition
         """
         value_of_matches = D('0.00')
-        for line in basket.all_lines():
-            if (self.can_apply_condition(line) and
-                    line.quantity_without_offer_discount(offer) > 0):
-                price = unit_price(offer, line)
-                value_of_matches += price * int(
-                    line.quantity_without_offer_discount(offer)
-                )
+        for price, line in self.get_applicable_lines(offer, basket):
+            quantity = line.quantity_without_offer_discount(offer)
+            value_of_matches += price * int(quantity)
             if value_of_matches >= self.value:
                 return True
         return False
@@ -254,13 +236,9 @@ class ValueCondition(Condition):
         if hasattr(self, '_value_of_matches'):
             return getattr(self, '_value_of_matches')
         value_of_matches = D('0.00')
-        for line in basket.all_lines():
-            if (self.can_apply_condition(line) and
-                    line.quantity_without_offer_discount(offer) > 0):
-                price = unit_price(offer, line)
-                value_of_matches += price * int(
-                    line.quantity_without_offer_discount(offer)
-                )
+        for price, line in self.get_applicable_lines(offer, basket):
+            quantity = line.quantity_without_offer_discount(offer)
+            value_of_matches += price * int(quantity)
         self._value_of_matches = value_of_matches
         return value_of_matches
 
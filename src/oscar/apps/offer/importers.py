@@ -0,0 +1,166 @@
+import logging
+import re
+from collections import defaultdict
+
+from django.db import connection, transaction
+
+from oscar.core.loading import get_class, get_model
+
+invalidate_range_index = get_class('offer.utils', 'invalidate_range_index')
+BasketSnapshotCache = get_class('basket.snapshots', 'BasketSnapshotCache')
+
+logger = logging.getLogger('oscar.offers')
+
+ID_SEPARATOR = re.compile(r'[^\w:\.-]')
+
+
+def extract_ids(lines):
+    """
+    Yield all SKU- or UPC-like strings from an iterable of lines
+    """
+    for line in lines:
+        for id in ID_SEPARATOR.split(line):
+            if id:
+                yield id
+
+
+class RangeImportStats(object):
+    """
+    Progress and results of a run of the ``RangeProductImporter``
+    """
+
+    def __init__(self):
+        self.num_processed = 0
+        self.num_new = 0
+        self.num_unknown = 0
+        self.num_duplicate = 0
+        self.duplicate_skus = set()
+
+    def __str__(self):
+        return ("Processed %d SKUs or UPCs: %d products added, %d already in "
+                "the range, %d unknown") % (
+                    self.num_processed, self.num_new, self.num_duplicate,
+                    self.num_unknown)
+
+
+class RangeProductImporter(object):
+    """
+    Adds the products matching a stream of SKUs and UPCs to a range.
+
+    The identifiers are read lazily and resolved in chunks of *chunk_size*,
+    with a fixed number of queries per chunk: the matching products are
+    looked up by SKU and UPC, checked against the range's compiled index,
+    and added with a bulk insert. Products that were excluded from the range
+    earlier are taken out of its exclusions with a single statement.
+    """
+
+    def __init__(self, range, chunk_size=1000):
+        max_query_params = connection.features.max_query_params
+        if max_query_params:
+            chunk_size = min(chunk_size, max_query_params)
+        self.range = range
+        self.chunk_size = chunk_size
+
+    def get_chunks(self, ids):
+        """
+        Yield the distinct identifiers in *ids* in chunks
+        """
+        seen, chunk = set(), []
+        for id in ids:
+            if id in seen:
+                continue
+            seen.add(id)
+            chunk.append(id)
+            if len(chunk) >= self.chunk_size:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
+
+    def get_product_ids(self, ids):
+        """
+        Return a mapping of the identifiers in *ids* that match products to
+        the IDs of those products, and the SKUs that match several products.
+        """
+        Product = get_model('catalogue', 'Product')
+        StockRecord = get_model('partner', 'StockRecord')
+        product_ids, sku_product_ids = defaultdict(set), defaultdict(set)
+        for sku, product_id in StockRecord.objects.filter(
+                partner_sku__in=ids).values_list('partner_sku', 'product_id'):
+            product_ids[sku].add(product_id)
+            sku_product_ids[sku].add(product_id)
+        for upc, product_id in Product.objects.filter(
+                upc__in=ids).values_list('upc', 'pk'):
+            product_ids[upc].add(product_id)
+        duplicate_skus = {sku for sku, sku_ids in sku_product_ids.items()
+                          if len(sku_ids) > 1}
+        return product_ids, duplicate_skus
+
+    def import_chunk(self, ids, stats, added_ids):
+        Product = get_model('catalogue', 'Product')
+        product_ids, duplicate_skus = self.get_product_ids(ids)
+        products = Product.objects.select_related(
+            'product_class', 'parent__product_class').in_bulk(
+            set().union(*product_ids.values()))
+
+        new_ids = set()
+        for id in ids:
+            matches = [products[pk] for pk in product_ids.get(id, ())
+                       if pk in products]
+            if not matches:
+                stats.num_unknown += 1
+            elif any(product.pk in added_ids
+                     or self.range.contains_product(product)
+                     for product in matches):
+                stats.num_duplicate += 1
+            else:
+                new_ids.update(product.pk for product in matches)
+                if id in duplicate_skus:
+                    stats.duplicate_skus.add(id)
+
+        if new_ids:
+            self.add_products(new_ids)
+            added_ids.update(new_ids)
+        stats.num_processed += len(ids)
+        stats.num_new += len(new_ids)
+
+    def add_products(self, product_ids):
+        """
+        Add the products with the given IDs to the range, and remove them
+        from its excluded products.
+        """
+        RangeProduct = get_model('offer', 'RangeProduct')
+        ExcludedProduct = self.range.excluded_products.through
+        with transaction.atomic():
+            existing_ids = set(RangeProduct.objects.filter(
+                range=self.range, product_id__in=product_ids).values_list(
+                    'product_id', flat=True))
+            RangeProduct.objects.bulk_create([
+                RangeProduct(range=self.range, product_id=product_id,
+                             display_order=0)
+                for product_id in sorted(product_ids - existing_ids)])
+            ExcludedProduct.objects.filter(
+                range=self.range, product_id__in=product_ids).delete()
+
+    def run(self, ids, progress=None):
+        """
+        Add the products matching the identifiers in *ids* to the range.
+        *progress* is called with the ``RangeImportStats`` after every chunk.
+        Returns the final ``RangeImportStats``.
+        """
+        stats = RangeImportStats()
+        added_ids = set()
+        try:
+            for chunk in self.get_chunks(ids):
+                self.import_chunk(chunk, stats, added_ids)
+                if progress is not None:
+                    progress(stats)
+        finally:
+            if added_ids:
+                # Bulk queries don't send the signals the range index and
+                # basket snapshot invalidation rely on.
+                self.range.invalidate_cached_ids()
+                invalidate_range_index(self.range.pk)
+                BasketSnapshotCache.invalidate()
+        logger.info("Range %s: %s", self.range.pk, stats)
+        return stats
@@ -1,6 +1,7 @@
 import datetime
 from decimal import Decimal as D
 
+from django.db.models import Sum
 from django.utils.translation import gettext_lazy as _
 
 from oscar.core.loading import get_class, get_model
@@ -16,17 +17,15 @@ OrderDiscount = get_model('order', 'OrderDiscount')
 
 class OfferReportCSVFormatter(ReportCSVFormatter):
     filename_template = 'conditional-offer-performance.csv'
+    streaming = True
 
-    def generate_csv(self, response, offers):
-        writer = self.get_csv_writer(response)
-        header_row = [_('Offer'),
-                      _('Total discount')
-                      ]
-        writer.writerow(header_row)
+    def get_header_row(self):
+        return [_('Offer'),
+                _('Total discount')
+                ]
 
-        for offer in offers:
-            row = [offer, offer['total_discount']]
-            writer.writerow(row)
+    def get_row(self, offer):
+        return [offer['offer'], offer['total_discount']]
 
 
 class OfferReportHTMLFormatter(ReportHTMLFormatter):
@@ -49,19 +48,14 @@ class OfferReportGenerator(ReportGenerator):
         if self.end_date:
             qs = qs.filter(order__date_placed__lt=self.end_date + datetime.timedelta(days=1))
 
-        offer_discounts = {}
-        for discount in qs:
-            if discount.offer_id not in offer_discounts:
-                try:
-                    all_offers = ConditionalOffer._default_manager
-                    offer = all_offers.get(id=discount.offer_id)
-                except ConditionalOffer.DoesNotExist:
-                    continue
-                offer_discounts[discount.offer_id] = {
-                    'offer': offer,
-                    'total_discount': D('0.00')
-                }
-            offer_discounts[discount.offer_id]['total_discount'] \
-                += discount.amount
-
-        return self.formatter.generate_response(list(offer_discounts.values()))
+        # Sum up the discounts per offer in the database
+        totals = qs.order_by().values('offer_id').annotate(
+            total_discount=Sum('amount'))
+        totals = {row['offer_id']: row['total_discount'] for row in totals}
+        offers = ConditionalOffer._default_manager.in_bulk(list(totals))
+
+        offer_discounts = [
+            {'offer': offer, 'total_discount': totals[offer_id] or D('0.00')}
+            for offer_id, offer in offers.items()]
+
+        return self.formatter.generate_response(offer_discounts)
@@ -1,11 +1,20 @@
-from django.db.models.signals import post_delete
+from django.db.models.signals import m2m_changed, post_delete, post_save
 from django.dispatch import receiver
 
-from oscar.core.loading import get_model
+from oscar.core.loading import get_class, get_classes, get_model
 
 ConditionalOffer = get_model('offer', 'ConditionalOffer')
 Condition = get_model('offer', 'Condition')
 Benefit = get_model('offer', 'Benefit')
+Range = get_model('offer', 'Range')
+RangeProduct = get_model('offer', 'RangeProduct')
+Category = get_model('catalogue', 'Category')
+Product = get_model('catalogue', 'Product')
+ProductCategory = get_model('catalogue', 'ProductCategory')
+
+invalidate_range_index, invalidate_range_indexes = get_classes(
+    'offer.utils', ['invalidate_range_index', 'invalidate_range_indexes'])
+SiteOfferCache = get_class('offer.cache', 'SiteOfferCache')
 
 
 @receiver(post_delete, sender=ConditionalOffer)
@@ -25,3 +34,82 @@ def delete_unused_related_conditions_and_benefits(instance, **kwargs):
     benefit_is_not_custom = benefit.proxy_class == ''
     if benefit_is_not_custom and benefit_is_unique:
         benefit.delete()
+
+
+@receiver(post_delete, sender=ConditionalOffer)
+@receiver(post_save, sender=Condition)
+@receiver(post_delete, sender=Condition)
+@receiver(post_save, sender=Benefit)
+@receiver(post_delete, sender=Benefit)
+@receiver(post_save, sender=Range)
+@receiver(post_delete, sender=Range)
+def invalidate_site_offers(sender, **kwargs):
+    SiteOfferCache.invalidate()
+
+
+@receiver(post_save, sender=ConditionalOffer)
+def invalidate_site_offers_for_offer(sender, instance, update_fields=None,
+                                     **kwargs):
+    # Usage is recorded for every order that uses an offer. The counters only
+    # affect which offers apply if the offer's total applications or
+    # discount are limited.
+    only_usage = (update_fields is not None
+                  and set(update_fields) <= set(instance.usage_fields))
+    if only_usage and not (instance.max_global_applications
+                           or instance.max_discount):
+        return
+    SiteOfferCache.invalidate()
+
+
+# Range index invalidation
+
+
+@receiver(post_save, sender=Range)
+@receiver(post_delete, sender=Range)
+def invalidate_range(sender, instance, **kwargs):
+    instance.invalidate_cached_ids()
+    invalidate_range_index(instance.pk)
+
+
+@receiver(post_save, sender=RangeProduct)
+@receiver(post_delete, sender=RangeProduct)
+def invalidate_range_for_range_product(sender, instance, **kwargs):
+    invalidate_range_index(instance.range_id)
+
+
+def invalidate_ranges_for_m2m_change(sender, instance, action, reverse,
+                                     pk_set, **kwargs):
+    if not action.startswith('post_'):
+        return
+    if not reverse:
+        instance.invalidate_cached_ids()
+        invalidate_range_index(instance.pk)
+    elif pk_set:
+        for range_id in pk_set:
+            invalidate_range_index(range_id)
+    else:
+        # A reverse clear() doesn't tell us which ranges were affected
+        invalidate_range_indexes()
+
+
+for m2m_field in ('excluded_products', 'classes', 'included_categories'):
+    m2m_changed.connect(
+        invalidate_ranges_for_m2m_change,
+        sender=getattr(Range, m2m_field).through)
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+@receiver(post_save, sender=ProductCategory)
+@receiver(post_delete, sender=ProductCategory)
+def invalidate_ranges_for_category_change(sender, **kwargs):
+    invalidate_range_indexes()
+
+
+@receiver(post_save, sender=Product)
+def invalidate_ranges_for_new_child_product(sender, instance, created,
+                                            **kwargs):
+    # Ranges store the IDs of the children of included and excluded
+    # products, so new child products need to be picked up.
+    if created and instance.is_child:
+        invalidate_range_indexes()
@@ -1,9 +1,12 @@
+from collections import namedtuple
 from importlib import import_module
 
 from django.core import exceptions
+from django.core.cache import cache
 from django.urls import reverse
 
 from oscar.apps.offer.applicator import Applicator  # backwards-compat  # noqa
+from oscar.core.cache import bump_version, get_version
 
 
 def range_anchor(range):
@@ -33,3 +36,38 @@ def load_proxy(proxy_class):
     except AttributeError:
         raise exceptions.ImproperlyConfigured(
             "Module %s does not define a %s" % (module, classname))
+
+
+#: The compiled membership data of a range. All attributes are frozensets of
+#: primary keys, so checking whether a product is in a range is a set lookup.
+#: ``category_ids`` includes the descendants of the included categories.
+RangeIndex = namedtuple('RangeIndex', [
+    'included_product_ids', 'excluded_product_ids', 'class_ids',
+    'category_ids'])
+
+RANGE_INDEX_VERSION_KEY = 'oscar-range-index-version'
+
+
+def get_range_index_version():
+    return get_version(RANGE_INDEX_VERSION_KEY)
+
+
+def get_range_index_cache_key(range_id):
+    return 'oscar-range-index-%s-%s' % (get_range_index_version(), range_id)
+
+
+def invalidate_range_index(range_id):
+    """
+    Drop the cached index of a single range
+    """
+    cache.delete(get_range_index_cache_key(range_id))
+
+
+def invalidate_range_indexes():
+    """
+    Drop the cached indexes of all ranges.
+
+    This is needed when catalogue data that any range might depend on changes,
+    e.g. the category tree or the categories of a product.
+    """
+    bump_version(RANGE_INDEX_VERSION_KEY)
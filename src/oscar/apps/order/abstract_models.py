@@ -374,6 +374,35 @@ class AbstractOrder(models.Model):
         if self.date_placed is None:
             self.date_placed = now()
 
+    def get_search_terms(self):
+        """
+        Return the ``(field, value)`` pairs the dashboard can find this order
+        by (see ``AbstractOrderSearchTerm``)
+        """
+        SearchTerm = get_model('order', 'OrderSearchTerm')
+        terms = []
+        if self.user is not None:
+            terms.extend(SearchTerm.get_user_terms(self.user))
+        elif self.guest_email:
+            terms.append((SearchTerm.EMAIL, self.guest_email))
+        for address in (self.billing_address, self.shipping_address):
+            if address is not None:
+                terms.append((SearchTerm.ADDRESS_FIRST_NAME, address.first_name))
+                terms.append((SearchTerm.ADDRESS_LAST_NAME, address.last_name))
+        for line in self.lines.all():
+            terms.extend(SearchTerm.get_line_terms(line))
+        for discount in self.discounts.all():
+            terms.extend(SearchTerm.get_discount_terms(discount))
+        for source in self.sources.all():
+            terms.extend(SearchTerm.get_source_terms(source))
+        return terms
+
+    def update_search_terms(self):
+        """
+        Rebuild the search terms of this order
+        """
+        self.search_terms.model.update_for_orders([self])
+
     def save(self, *args, **kwargs):
         # Ensure the date_placed field works as it auto_now_add was set. But
         # this gives us the ability to set the date_placed explicitly (which is
@@ -1169,3 +1198,152 @@ class AbstractOrderDiscount(models.Model):
         if self.voucher_code:
             return self.voucher_code
         return self.offer_name or ""
+
+
+class AbstractOrderSearchTerm(models.Model):
+    """
+    A value an order can be found by in the dashboard, e.g. a customer name or
+    the UPC of one of its lines.
+
+    The values are copied from the order's user, addresses, lines, discounts
+    and payment sources, so the dashboard can filter orders with a lookup on
+    one indexed table instead of joining all of them. Names, emails and
+    product titles are matched by prefix and stored in lower case; the other
+    fields are matched exactly.
+    """
+    FIRST_NAME, LAST_NAME, EMAIL = 'first_name', 'last_name', 'email'
+    ADDRESS_FIRST_NAME = 'address_first_name'
+    ADDRESS_LAST_NAME = 'address_last_name'
+    PRODUCT_TITLE, UPC, PARTNER_SKU = 'product_title', 'upc', 'partner_sku'
+    VOUCHER_CODE, PAYMENT_METHOD = 'voucher_code', 'payment_method'
+    FIELD_CHOICES = (
+        (FIRST_NAME, _("First name")),
+        (LAST_NAME, _("Last name")),
+        (EMAIL, _("Email")),
+        (ADDRESS_FIRST_NAME, _("Address first name")),
+        (ADDRESS_LAST_NAME, _("Address last name")),
+        (PRODUCT_TITLE, _("Product title")),
+        (UPC, _("UPC")),
+        (PARTNER_SKU, _("Partner SKU")),
+        (VOUCHER_CODE, _("Voucher code")),
+        (PAYMENT_METHOD, _("Payment method")),
+    )
+    USER_FIELDS = (FIRST_NAME, LAST_NAME, EMAIL)
+    PREFIX_FIELDS = (FIRST_NAME, LAST_NAME, EMAIL, ADDRESS_FIRST_NAME,
+                     ADDRESS_LAST_NAME, PRODUCT_TITLE)
+
+    order = models.ForeignKey(
+        'order.Order',
+        on_delete=models.CASCADE,
+        related_name='search_terms',
+        verbose_name=_("Order"))
+    field = models.CharField(
+        _("Field"), max_length=32, choices=FIELD_CHOICES)
+    value = models.CharField(_("Value"), max_length=255, db_index=True)
+
+    class Meta:
+        abstract = True
+        app_label = 'order'
+        verbose_name = _("Order search term")
+        verbose_name_plural = _("Order search terms")
+
+    def __str__(self):
+        return "%s: %s" % (self.get_field_display(), self.value)
+
+    @classmethod
+    def normalise(cls, field, value):
+        value = value[:cls._meta.get_field('value').max_length]
+        if field in cls.PREFIX_FIELDS:
+            return value.lower()
+        return value
+
+    @classmethod
+    def get_user_terms(cls, user):
+        # Custom user models don't necessarily have these fields
+        return [(cls.FIRST_NAME, getattr(user, 'first_name', '')),
+                (cls.LAST_NAME, getattr(user, 'last_name', '')),
+                (cls.EMAIL, getattr(user, 'email', ''))]
+
+    @classmethod
+    def get_line_terms(cls, line):
+        return [(cls.PRODUCT_TITLE, line.title),
+                (cls.UPC, line.upc),
+                (cls.PARTNER_SKU, line.partner_sku)]
+
+    @classmethod
+    def get_discount_terms(cls, discount):
+        return [(cls.VOUCHER_CODE, discount.voucher_code)]
+
+    @classmethod
+    def get_source_terms(cls, source):
+        return [(cls.PAYMENT_METHOD, source.source_type.code)]
+
+    @classmethod
+    def has_terms(cls, order_id, terms):
+        """
+        Return whether all the passed ``(field, value)`` pairs are stored for
+        an order, with a single query
+        """
+        terms = {(field, cls.normalise(field, value))
+                 for field, value in terms if value}
+        if not terms:
+            return True
+        stored = set(cls._default_manager.filter(
+            order_id=order_id, field__in={field for field, __ in terms},
+        ).values_list('field', 'value'))
+        return terms <= stored
+
+    @classmethod
+    def get_order_ids(cls, fields, value):
+        """
+        Return the IDs of the orders with a term for any of *fields* that
+        matches *value*, as a subquery
+        """
+        if isinstance(fields, str):
+            fields = [fields]
+        lookup = 'value'
+        if all(field in cls.PREFIX_FIELDS for field in fields):
+            lookup = 'value__startswith'
+        return cls._default_manager.filter(**{
+            'field__in': fields,
+            lookup: cls.normalise(fields[0], value),
+        }).values('order_id')
+
+    @classmethod
+    def update_for_orders(cls, orders):
+        """
+        Rebuild the search terms of the passed orders with one delete and one
+        insert
+        """
+        cls._default_manager.filter(order__in=orders).delete()
+        cls._default_manager.bulk_create([
+            cls(order=order, field=field, value=cls.normalise(field, value))
+            for order in orders
+            for field, value in set(order.get_search_terms()) if value])
+
+    @classmethod
+    def update_for_queryset(cls, queryset):
+        """
+        Rebuild the search terms of the orders in an order queryset, with a
+        fixed number of queries
+        """
+        orders = list(queryset.select_related(
+            'user', 'billing_address', 'shipping_address').prefetch_related(
+                'lines', 'discounts', 'sources__source_type'))
+        if orders:
+            cls.update_for_orders(orders)
+        return orders
+
+    @classmethod
+    def update_for_user(cls, user):
+        """
+        Rebuild the terms copied from the passed user for all their orders
+        """
+        order_ids = list(user.orders.values_list('id', flat=True))
+        cls._default_manager.filter(
+            order_id__in=order_ids, field__in=cls.USER_FIELDS).delete()
+        cls._default_manager.bulk_create([
+            cls(order_id=order_id, field=field,
+                value=cls.normalise(field, value))
+            for order_id in order_ids
+            for field, value in cls.get_user_terms(user) if value])
@@ -0,0 +1,28 @@
+# Generated by Django 2.0.13 on 2026-10-18 07:46
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('order', '0005_update_email_length'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OrderSearchTerm',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('field', models.CharField(choices=[('first_name', 'First name'), ('last_name', 'Last name'), ('email', 'Email'), ('address_first_name', 'Address first name'), ('address_last_name', 'Address last name'), ('product_title', 'Product title'), ('upc', 'UPC'), ('partner_sku', 'Partner SKU'), ('voucher_code', 'Voucher code'), ('payment_method', 'Payment method')], max_length=32, verbose_name='Field')),
+                ('value', models.CharField(db_index=True, max_length=255, verbose_name='Value')),
+                ('order', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='search_terms', to='order.Order', verbose_name='Order')),
+            ],
+            options={
+                'verbose_name': 'Order search term',
+                'verbose_name_plural': 'Order search terms',
+                'abstract': False,
+            },
+        ),
+    ]
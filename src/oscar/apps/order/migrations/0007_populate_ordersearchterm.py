@@ -0,0 +1,75 @@
+from django.conf import settings
+from django.db import migrations
+
+# Copied from AbstractOrderSearchTerm, as migrations can't rely on the
+# current model code
+PREFIX_FIELDS = ('first_name', 'last_name', 'email', 'address_first_name',
+                 'address_last_name', 'product_title')
+BATCH_SIZE = 500
+
+
+def get_search_terms(order):
+    terms = []
+    if order.user is not None:
+        for field in ('first_name', 'last_name', 'email'):
+            terms.append((field, getattr(order.user, field, '')))
+    elif order.guest_email:
+        terms.append(('email', order.guest_email))
+    for address in (order.billing_address, order.shipping_address):
+        if address is not None:
+            terms.append(('address_first_name', address.first_name))
+            terms.append(('address_last_name', address.last_name))
+    for line in order.lines.all():
+        terms.append(('product_title', line.title))
+        terms.append(('upc', line.upc))
+        terms.append(('partner_sku', line.partner_sku))
+    for discount in order.discounts.all():
+        terms.append(('voucher_code', discount.voucher_code))
+    for source in order.sources.all():
+        terms.append(('payment_method', source.source_type.code))
+    return terms
+
+
+def normalise(field, value):
+    value = value[:255]
+    if field in PREFIX_FIELDS:
+        return value.lower()
+    return value
+
+
+def populate_search_terms(apps, schema_editor):
+    Order = apps.get_model('order', 'Order')
+    OrderSearchTerm = apps.get_model('order', 'OrderSearchTerm')
+    last_id = 0
+    while True:
+        orders = list(
+            Order.objects.filter(pk__gt=last_id).order_by('pk')
+            .select_related('user', 'billing_address', 'shipping_address')
+            .prefetch_related('lines', 'discounts', 'sources__source_type')
+            [:BATCH_SIZE])
+        if not orders:
+            break
+        last_id = orders[-1].pk
+        OrderSearchTerm.objects.bulk_create([
+            OrderSearchTerm(order=order, field=field,
+                            value=normalise(field, value))
+            for order in orders
+            for field, value in set(get_search_terms(order)) if value])
+
+
+def delete_search_terms(apps, schema_editor):
+    OrderSearchTerm = apps.get_model('order', 'OrderSearchTerm')
+    OrderSearchTerm.objects.all().delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('order', '0006_ordersearchterm'),
+        ('payment', '0003_auto_20160323_1520'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RunPython(populate_search_terms, delete_search_terms),
+    ]
@@ -95,3 +95,10 @@ if not is_model_registered('order', 'OrderDiscount'):
         pass
 
     __all__.append('OrderDiscount')
+
+
+if not is_model_registered('order', 'OrderSearchTerm'):
+    class OrderSearchTerm(AbstractOrderSearchTerm):
+        pass
+
+    __all__.append('OrderSearchTerm')
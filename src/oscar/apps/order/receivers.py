@@ -0,0 +1,68 @@
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+
+from oscar.core.compat import get_user_model
+from oscar.core.loading import get_model
+
+Order = get_model('order', 'Order')
+Line = get_model('order', 'Line')
+OrderDiscount = get_model('order', 'OrderDiscount')
+ShippingAddress = get_model('order', 'ShippingAddress')
+BillingAddress = get_model('order', 'BillingAddress')
+OrderSearchTerm = get_model('order', 'OrderSearchTerm')
+Source = get_model('payment', 'Source')
+User = get_user_model()
+
+
+@receiver(post_save, sender=Line)
+@receiver(post_save, sender=OrderDiscount)
+@receiver(post_save, sender=Source)
+def update_order_search_terms(sender, instance, raw=False, created=False,
+                              **kwargs):
+    """
+    Rebuild the search terms of the order of a changed line, discount or
+    payment source.
+
+    Lines and discounts are created while the order is placed, which indexes
+    the order once they all exist. Lines are saved for every status change,
+    so the order is only rebuilt when one of the values of the saved row
+    isn't indexed yet. Terms of deleted rows and replaced values are left in
+    place until the order is indexed again; they can only cause additional
+    matches.
+    """
+    if raw or (created and sender is not Source):
+        return
+    if sender is Line:
+        terms = OrderSearchTerm.get_line_terms(instance)
+    elif sender is OrderDiscount:
+        terms = OrderSearchTerm.get_discount_terms(instance)
+    else:
+        terms = OrderSearchTerm.get_source_terms(instance)
+    if not OrderSearchTerm.has_terms(instance.order_id, terms):
+        OrderSearchTerm.update_for_queryset(
+            Order._default_manager.filter(pk=instance.order_id))
+
+
+@receiver(post_save, sender=ShippingAddress)
+@receiver(post_save, sender=BillingAddress)
+def update_address_search_terms(sender, instance, raw=False, created=False,
+                                **kwargs):
+    if raw or created:
+        return
+    if sender is ShippingAddress:
+        orders = Order._default_manager.filter(shipping_address=instance)
+    else:
+        orders = Order._default_manager.filter(billing_address=instance)
+    OrderSearchTerm.update_for_queryset(orders)
+
+
+@receiver(post_save, sender=User)
+def update_user_search_terms(sender, instance, raw=False, created=False,
+                             update_fields=None, **kwargs):
+    if raw or created:
+        return
+    # Logging in only updates the last_login field
+    if update_fields is not None and not set(update_fields) & set(
+            OrderSearchTerm.USER_FIELDS):
+        return
+    OrderSearchTerm.update_for_user(instance)
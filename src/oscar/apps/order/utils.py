@@ -1,18 +1,60 @@
+from collections import defaultdict
 from decimal import Decimal as D
 
 from django.conf import settings
 from django.contrib.sites.models import Site
-from django.db import transaction
+from django.db import IntegrityError, router, transaction
+from django.db.models import (
+    Case, F, IntegerField, Value, When, prefetch_related_objects, signals)
+from django.db.models.functions import Coalesce
 from django.utils.translation import gettext_lazy as _
 
 from oscar.apps.order.signals import order_placed
+from oscar.apps.partner.abstract_models import AbstractStockRecord
 from oscar.core.loading import get_model
 
 from . import exceptions
 
 Order = get_model('order', 'Order')
 Line = get_model('order', 'Line')
+LinePrice = get_model('order', 'LinePrice')
+LineAttribute = get_model('order', 'LineAttribute')
 OrderDiscount = get_model('order', 'OrderDiscount')
+StockRecord = get_model('partner', 'StockRecord')
+
+
+def bulk_create_with_signals(model, instances, queryset):
+    """
+    Save new model instances with bulk inserts, sending the pre_save and
+    post_save signals for each of them as their save() method would.
+
+    Databases that can't return the primary keys of bulk inserted rows need a
+    *queryset* that returns exactly the new instances; it's used to set their
+    primary keys (which, being auto-incremented, follow the insertion order).
+    """
+    if not instances:
+        return instances
+    using = router.db_for_write(model)
+    for instance in instances:
+        signals.pre_save.send(sender=model, instance=instance, raw=False,
+                              using=using, update_fields=None)
+    model._default_manager.db_manager(using).bulk_create(instances)
+
+    if instances[0].pk is None:
+        pks = list(queryset.using(using).order_by('pk')
+                   .values_list('pk', flat=True))
+        if len(pks) != len(instances):
+            raise IntegrityError(
+                "Unable to determine the primary keys of the new %s objects"
+                % model._meta.model_name)
+        for instance, pk in zip(instances, pks):
+            instance.pk = pk
+    for instance in instances:
+        instance._state.adding = False
+        instance._state.db = using
+        signals.post_save.send(sender=model, instance=instance, created=True,
+                               update_fields=None, raw=False, using=using)
+    return instances
 
 
 class OrderNumberGenerator(object):
@@ -34,6 +76,11 @@ class OrderCreator(object):
     """
     Places the order by writing out the various models
     """
+    #: The methods that place_order used to call for every line. If a
+    #: subclass overrides any of them, lines are still created and stock
+    #: allocated one line at a time through them, instead of in bulk.
+    line_hooks = ('create_line_models', 'create_line_price_models',
+                  'create_line_attributes', 'update_stock_records')
 
     def place_order(self, basket, total,  # noqa (too complex (12))
                     shipping_method, shipping_charge, user=None,
@@ -61,9 +108,17 @@ class OrderCreator(object):
             order = self.create_order_model(
                 user, basket, shipping_address, shipping_method, shipping_charge,
                 billing_address, total, order_number, status, request, **kwargs)
-            for line in basket.all_lines():
-                self.create_line_models(order, line)
-                self.update_stock_records(line)
+            lines = list(basket.all_lines())
+            prefetch_related_objects(
+                lines, 'stockrecord__partner', 'product__product_class',
+                'product__parent__product_class')
+            if self.overrides_line_hooks():
+                for line in lines:
+                    self.create_line_models(order, line)
+                    self.update_stock_records(line)
+            else:
+                self.create_lines_models(order, lines)
+                self.allocate_stock(lines)
 
             for voucher in basket.vouchers.select_for_update():
                 available_to_user, msg = voucher.is_available_to_user(user=user)
@@ -93,11 +148,17 @@ class OrderCreator(object):
             for voucher in basket.vouchers.all():
                 self.record_voucher_usage(order, voucher, user)
 
+            order.update_search_terms()
+
         # Send signal for analytics to pick up
         order_placed.send(sender=self, order=order, user=user)
 
         return order
 
+    def overrides_line_hooks(self):
+        return any(getattr(type(self), name) is not getattr(OrderCreator, name)
+                   for name in self.line_hooks)
+
     def create_order_model(self, user, basket, shipping_address,
                            shipping_method, shipping_charge, billing_address,
                            total, order_number, status, request=None, **extra_order_fields):
@@ -127,10 +188,55 @@ class OrderCreator(object):
         order.save()
         return order
 
+    def create_lines_models(self, order, basket_lines):
+        """
+        Create the order lines, and their prices and attributes, for all the
+        lines of the basket.
+
+        Each model is written with a single bulk insert; the pre_save and
+        post_save signals are still sent for every instance.
+        """
+        order_lines = [self.get_line_model(order, basket_line)
+                       for basket_line in basket_lines]
+        bulk_create_with_signals(
+            Line, order_lines, Line._default_manager.filter(order=order))
+
+        prices, attributes = [], []
+        for order_line, basket_line in zip(order_lines, basket_lines):
+            prices.extend(self.get_line_price_models(
+                order, order_line, basket_line))
+            attributes.extend(self.get_line_attribute_models(
+                order, order_line, basket_line))
+        bulk_create_with_signals(
+            LinePrice, prices,
+            LinePrice._default_manager.filter(order=order))
+        bulk_create_with_signals(
+            LineAttribute, attributes,
+            LineAttribute._default_manager.filter(line__order=order))
+
+        for order_line, basket_line in zip(order_lines, basket_lines):
+            self.create_additional_line_models(order, order_line, basket_line)
+        return order_lines
+
     def create_line_models(self, order, basket_line, extra_line_fields=None):
         """
         Create the batch line model.
 
+        You can set extra fields by passing a dictionary as the
+        extra_line_fields value
+        """
+        order_line = self.get_line_model(order, basket_line, extra_line_fields)
+        order_line.save()
+        self.create_line_price_models(order, order_line, basket_line)
+        self.create_line_attributes(order, order_line, basket_line)
+        self.create_additional_line_models(order, order_line, basket_line)
+
+        return order_line
+
+    def get_line_model(self, order, basket_line, extra_line_fields=None):
+        """
+        Return an unsaved order line for the basket line.
+
         You can set extra fields by passing a dictionary as the
         extra_line_fields value
         """
@@ -178,12 +284,7 @@ class OrderCreator(object):
         if extra_line_fields:
             line_data.update(extra_line_fields)
 
-        order_line = Line._default_manager.create(**line_data)
-        self.create_line_price_models(order, order_line, basket_line)
-        self.create_line_attributes(order, order_line, basket_line)
-        self.create_additional_line_models(order, order_line, basket_line)
-
-        return order_line
+        return Line(**line_data)
 
     def update_stock_records(self, line):
         """
@@ -192,6 +293,52 @@ class OrderCreator(object):
         if line.product.get_product_class().track_stock:
             line.stockrecord.allocate(line.quantity)
 
+    def allocate_stock(self, lines):
+        """
+        Allocate stock for the basket lines with a single query.
+
+        Like StockRecord.allocate, this sends the pre_save and post_save
+        signals for the stock record of each line. If the StockRecord model
+        overrides allocate(), it is called for each line instead.
+        """
+        lines = [line for line in lines
+                 if line.product.get_product_class().track_stock]
+        if not lines:
+            return
+        if StockRecord.allocate is not AbstractStockRecord.allocate:
+            for line in lines:
+                line.stockrecord.allocate(line.quantity)
+            return
+        quantities = defaultdict(int)
+        for line in lines:
+            quantities[line.stockrecord.pk] += line.quantity
+
+        using = router.db_for_write(StockRecord)
+        update_fields = frozenset(['num_allocated'])
+        for line in lines:
+            signals.pre_save.send(
+                sender=StockRecord, instance=line.stockrecord, created=False,
+                raw=False, using=using, update_fields=update_fields)
+
+        increments = Case(
+            *[When(pk=pk, then=Value(quantity))
+              for pk, quantity in quantities.items()],
+            output_field=IntegerField())
+        StockRecord._default_manager.db_manager(using).filter(
+            pk__in=quantities,
+        ).update(num_allocated=(
+            Coalesce(F('num_allocated'), Value(0)) + increments))
+
+        for line in lines:
+            # Make sure the line's stock record is up-to-date
+            stockrecord = line.stockrecord
+            if stockrecord.num_allocated is None:
+                stockrecord.num_allocated = 0
+            stockrecord.num_allocated += line.quantity
+            signals.post_save.send(
+                sender=StockRecord, instance=stockrecord, created=False,
+                raw=False, using=using, update_fields=update_fields)
+
     def create_additional_line_models(self, order, order_line, basket_line):
         """
         Empty method designed to be overridden.
@@ -206,23 +353,43 @@ class OrderCreator(object):
         """
         Creates the batch line price models
         """
+        for line_price in self.get_line_price_models(
+                order, order_line, basket_line):
+            line_price.save()
+
+    def get_line_price_models(self, order, order_line, basket_line):
+        """
+        Return the unsaved line price models for an order line
+        """
         breakdown = basket_line.get_price_breakdown()
-        for price_incl_tax, price_excl_tax, quantity in breakdown:
-            order_line.prices.create(
+        return [
+            LinePrice(
                 order=order,
+                line=order_line,
                 quantity=quantity,
                 price_incl_tax=price_incl_tax,
                 price_excl_tax=price_excl_tax)
+            for price_incl_tax, price_excl_tax, quantity in breakdown]
 
     def create_line_attributes(self, order, order_line, basket_line):
         """
         Creates the batch line attributes.
         """
-        for attr in basket_line.attributes.all():
-            order_line.attributes.create(
+        for attribute in self.get_line_attribute_models(
+                order, order_line, basket_line):
+            attribute.save()
+
+    def get_line_attribute_models(self, order, order_line, basket_line):
+        """
+        Return the unsaved line attribute models for an order line
+        """
+        return [
+            LineAttribute(
+                line=order_line,
                 option=attr.option,
                 type=attr.option.code,
                 value=attr.value)
+            for attr in basket_line.attributes.all()]
 
     def create_discount_model(self, order, discount):
 
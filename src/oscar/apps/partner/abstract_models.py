@@ -202,7 +202,8 @@ class AbstractStockRecord(models.Model):
             instance=self,
             created=False,
             raw=False,
-            using=router.db_for_write(self.__class__, instance=self))
+            using=router.db_for_write(self.__class__, instance=self),
+            update_fields=frozenset(['num_allocated']))
 
         # Atomic update
         (self.__class__.objects
@@ -221,7 +222,8 @@ class AbstractStockRecord(models.Model):
             instance=self,
             created=False,
             raw=False,
-            using=router.db_for_write(self.__class__, instance=self))
+            using=router.db_for_write(self.__class__, instance=self),
+            update_fields=frozenset(['num_allocated']))
 
     allocate.alters_data = True
 
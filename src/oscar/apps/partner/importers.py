@@ -1,11 +1,15 @@
+import itertools
 import os
+import time
 from decimal import Decimal as D
 
 from django.db.transaction import atomic
+from django.utils.timezone import now
 from django.utils.translation import gettext_lazy as _
 
-from oscar.core.compat import UnicodeCSVReader
+from oscar.core.compat import UnicodeCSVReader, bulk_update
 from oscar.core.loading import get_class, get_classes
+from oscar.core.utils import slugify
 
 ImportingError = get_class('partner.exceptions', 'ImportingError')
 Partner, StockRecord = get_classes('partner.models', ['Partner',
@@ -13,7 +17,8 @@ Partner, StockRecord = get_classes('partner.models', ['Partner',
 ProductClass, Product, Category, ProductCategory = get_classes(
     'catalogue.models', ('ProductClass', 'Product', 'Category',
                          'ProductCategory'))
-create_from_breadcrumbs = get_class('catalogue.categories', 'create_from_breadcrumbs')
+create_from_breadcrumbs, create_from_sequence = get_classes(
+    'catalogue.categories', ['create_from_breadcrumbs', 'create_from_sequence'])
 
 
 class CatalogueImporter(object):
@@ -117,6 +122,208 @@ class CatalogueImporter(object):
         stock.save()
 
 
+class BulkCatalogueImporter(CatalogueImporter):
+    """
+    Set-based version of the CatalogueImporter for large files.
+
+    It reads the same file format, but streams the file in chunks of
+    ``batch_size`` rows. For each chunk, existing products and stock records
+    are looked up with a single query each and written with bulk_create() and
+    bulk_update(); each chunk is committed in its own transaction. Product
+    classes, partners and categories are loaded once up front.
+
+    As with QuerySet.bulk_create(), Product.save() and StockRecord.save() are
+    not called and no model signals are sent for the imported products and
+    stock records.
+    """
+
+    def __init__(self, logger, delimiter=",", flush=False, batch_size=1000):
+        super().__init__(logger, delimiter=delimiter, flush=flush)
+        self.batch_size = batch_size
+
+    def _import(self, file_path):
+        """Imports given file"""
+        self.stats = {'rows': 0, 'new_items': 0, 'updated_items': 0,
+                      'skipped_rows': 0}
+        self._load_lookups()
+        start_time = time.time()
+        with UnicodeCSVReader(
+                file_path, delimiter=self._delimiter,
+                quotechar='"', escapechar='\\') as reader:
+            rows = enumerate(reader, start=1)
+            while True:
+                chunk = list(itertools.islice(rows, self.batch_size))
+                if not chunk:
+                    break
+                with atomic():
+                    self._import_chunk(chunk)
+                self._log_progress(start_time)
+        self.logger.info(
+            "New items: %d, updated items: %d"
+            % (self.stats['new_items'], self.stats['updated_items']))
+
+    def _log_progress(self, start_time):
+        elapsed = time.time() - start_time
+        self.stats['elapsed'] = elapsed
+        self.stats['rows_per_second'] = (
+            self.stats['rows'] / elapsed if elapsed else 0)
+        self.logger.info(
+            " - %(rows)d rows processed (%(new_items)d new, %(updated_items)d "
+            "updated, %(skipped_rows)d skipped) in %(elapsed).1fs, "
+            "%(rows_per_second).0f rows/s" % self.stats)
+
+    def _load_lookups(self):
+        self.product_classes = {
+            product_class.name: product_class
+            for product_class in ProductClass.objects.all()}
+        self.partners = {
+            partner.name: partner for partner in Partner.objects.all()}
+
+        # Map each category's sequence of names (as used in the breadcrumbs)
+        # to its primary key. Categories are ordered by path, so parents are
+        # always seen before their children.
+        self.categories = {}
+        names_by_path = {}
+        for pk, path, name in Category.objects.order_by('path').values_list(
+                'pk', 'path', 'name'):
+            parent_names = names_by_path.get(path[:-Category.steplen], ())
+            names = parent_names + (name,)
+            names_by_path[path] = names
+            self.categories.setdefault(names, pk)
+
+    def _get_product_class(self, name):
+        if name not in self.product_classes:
+            self.product_classes[name], __ = \
+                ProductClass.objects.get_or_create(name=name)
+        return self.product_classes[name]
+
+    def _get_partner(self, name):
+        if name not in self.partners:
+            self.partners[name], __ = Partner.objects.get_or_create(name=name)
+        return self.partners[name]
+
+    def _get_category_id(self, category_str, separator='>'):
+        names = tuple(x.strip() for x in category_str.split(separator))
+        if names not in self.categories:
+            categories = create_from_sequence(list(names))
+            for depth, category in enumerate(categories, start=1):
+                self.categories.setdefault(names[:depth], category.pk)
+        return self.categories[names]
+
+    def _parse_chunk(self, chunk):
+        """
+        Return the product and stock data of the valid rows of a chunk, keyed
+        by UPC and (partner ID, partner SKU) respectively. Later rows win.
+        """
+        items, stock = {}, {}
+        for row_number, row in chunk:
+            self.stats['rows'] += 1
+            if len(row) != 5 and len(row) != 9:
+                self.logger.error(
+                    "Row number %d has an invalid number of fields"
+                    " (%d), skipping..." % (row_number, len(row)))
+                self.stats['skipped_rows'] += 1
+                continue
+            product_class, category_str, upc, title, description = row[:5]
+            if not upc:
+                # Products without a UPC can't be matched on later imports
+                self.logger.error(
+                    "Row number %d has no UPC, skipping..." % row_number)
+                self.stats['skipped_rows'] += 1
+                continue
+            items[upc] = {
+                'product_class': self._get_product_class(product_class),
+                'category_id': self._get_category_id(category_str),
+                'title': title,
+                # Ignore any entries that are NULL
+                'description': '' if description == 'NULL' else description,
+            }
+            if len(row) == 9:
+                partner_name, partner_sku, price_excl_tax, num_in_stock \
+                    = row[5:9]
+                partner = self._get_partner(partner_name)
+                stock[partner.pk, partner_sku] = {
+                    'upc': upc,
+                    'price_excl_tax': D(price_excl_tax),
+                    'num_in_stock': int(num_in_stock),
+                }
+        return items, stock
+
+    def _import_chunk(self, chunk):
+        items, stock = self._parse_chunk(chunk)
+        product_ids = self._save_products(items)
+        self._save_product_categories(items, product_ids)
+        self._save_stockrecords(stock, product_ids)
+
+    def _save_products(self, items):
+        """
+        Create or update the products of a chunk, and return a mapping of UPC
+        to product ID.
+        """
+        existing = {
+            product.upc: product
+            for product in Product.objects.filter(upc__in=list(items))}
+        timestamp = now()
+        new_products = []
+        for upc, data in items.items():
+            product = existing.get(upc)
+            if product is None:
+                product = Product(upc=upc)
+                new_products.append(product)
+            product.title = data['title']
+            product.description = data['description']
+            product.product_class = data['product_class']
+            product.date_updated = timestamp
+            if not product.slug:
+                product.slug = slugify(product.get_title())
+
+        Product.objects.bulk_create(new_products)
+        bulk_update(Product, list(existing.values()),
+                    ['title', 'description', 'product_class', 'date_updated'])
+        self.stats['new_items'] += len(new_products)
+        self.stats['updated_items'] += len(existing)
+
+        return dict(Product.objects.filter(upc__in=list(items))
+                    .order_by().values_list('upc', 'pk'))
+
+    def _save_product_categories(self, items, product_ids):
+        existing = set(ProductCategory.objects.filter(
+            product_id__in=product_ids.values(),
+        ).order_by().values_list('product_id', 'category_id'))
+        ProductCategory.objects.bulk_create([
+            ProductCategory(product_id=product_ids[upc],
+                            category_id=data['category_id'])
+            for upc, data in items.items()
+            if (product_ids[upc], data['category_id']) not in existing])
+
+    def _save_stockrecords(self, stock, product_ids):
+        # Stock records are identified by partner and SKU, as per the unique
+        # constraint on the model
+        existing = {
+            (record.partner_id, record.partner_sku): record
+            for record in StockRecord.objects.filter(
+                partner_sku__in=[sku for __, sku in stock])}
+        timestamp = now()
+        new_records, updated_records = [], []
+        for (partner_id, partner_sku), data in stock.items():
+            record = existing.get((partner_id, partner_sku))
+            if record is None:
+                record = StockRecord(partner_id=partner_id,
+                                     partner_sku=partner_sku)
+                new_records.append(record)
+            else:
+                updated_records.append(record)
+            record.product_id = product_ids[data['upc']]
+            record.price_excl_tax = data['price_excl_tax']
+            record.num_in_stock = data['num_in_stock']
+            record.date_updated = timestamp
+
+        StockRecord.objects.bulk_create(new_records)
+        bulk_update(StockRecord, updated_records,
+                    ['product', 'price_excl_tax', 'num_in_stock',
+                     'date_updated'])
+
+
 class Validator(object):
 
     def validate(self, file_path):
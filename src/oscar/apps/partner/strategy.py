@@ -1,6 +1,8 @@
 from collections import namedtuple
 from decimal import Decimal as D
 
+from django.db.models import prefetch_related_objects
+
 from oscar.core.loading import get_class
 
 Unavailable = get_class('partner.availability', 'Unavailable')
@@ -90,6 +92,60 @@ class Base(object):
             "information."
         )
 
+    def fetch_for_products(self, products):
+        """
+        Given a list of products, return a dictionary mapping their IDs to
+        their ``PurchaseInfo`` instances (as returned by
+        ``fetch_for_parent`` for parent products, and by
+        ``fetch_for_product`` for all others).
+
+        The data needed for all products is loaded upfront (see
+        ``prefetch_for_products``), and the results are memoised on the
+        strategy, so ``get_purchase_info`` won't query the database again for
+        these products. Use this for lists of products, like the pages of the
+        product listings.
+        """
+        purchase_infos = self._get_purchase_info_cache()
+        missing = [product for product in products
+                   if product.pk not in purchase_infos]
+        if missing:
+            self.prefetch_for_products(missing)
+            for product in missing:
+                purchase_infos[product.pk] = self._fetch_for_any(product)
+        return {product.pk: purchase_infos[product.pk]
+                for product in products}
+
+    def get_purchase_info(self, product):
+        """
+        Return the ``PurchaseInfo`` instance of any product. It is memoised
+        like the results of ``fetch_for_products``.
+        """
+        purchase_infos = self._get_purchase_info_cache()
+        if product.pk not in purchase_infos:
+            purchase_infos[product.pk] = self._fetch_for_any(product)
+        return purchase_infos[product.pk]
+
+    #: Related objects to prefetch for product lists
+    prefetch_lookups = ()
+
+    def prefetch_for_products(self, products):
+        """
+        Load the data needed to determine the purchase info of all products
+        with as few queries as possible. Empty method designed to be
+        overridden.
+        """
+
+    def _fetch_for_any(self, product):
+        if product.is_parent:
+            return self.fetch_for_parent(product)
+        return self.fetch_for_product(product)
+
+    def _get_purchase_info_cache(self):
+        # Initialised lazily, as subclasses might not call __init__
+        if not hasattr(self, '_purchase_infos'):
+            self._purchase_infos = {}
+        return self._purchase_infos
+
     def fetch_for_line(self, line, stockrecord=None):
         """
         Given a basket line instance, fetch a ``PurchaseInfo`` instance.
@@ -137,6 +193,17 @@ class Structured(Base):
                 product, children_stock),
             stockrecord=None)
 
+    #: The related objects the mixins below rely on
+    prefetch_lookups = ('product_class', 'parent__product_class',
+                        'stockrecords', 'children__stockrecords')
+
+    def prefetch_for_products(self, products):
+        """
+        Prefetch the stockrecords of the products and their children, and the
+        product classes.
+        """
+        prefetch_related_objects(products, *self.prefetch_lookups)
+
     def select_stockrecord(self, product):
         """
         Select the appropriate stockrecord
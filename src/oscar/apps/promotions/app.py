@@ -17,10 +17,13 @@ class PromotionsApplication(Application):
     def get_urls(self):
         urls = [
             url(r'page-redirect/(?P<page_promotion_id>\d+)/$',
-                self.record_click_view.as_view(model=PagePromotion),
+                self.record_click_view.as_view(
+                    model=PagePromotion, pk_url_kwarg='page_promotion_id'),
                 name='page-click'),
             url(r'keyword-redirect/(?P<keyword_promotion_id>\d+)/$',
-                self.record_click_view.as_view(model=KeywordPromotion),
+                self.record_click_view.as_view(
+                    model=KeywordPromotion,
+                    pk_url_kwarg='keyword_promotion_id'),
                 name='keyword-click'),
             url(r'^$', self.home_view.as_view(), name='home'),
         ]
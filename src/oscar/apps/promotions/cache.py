@@ -0,0 +1,88 @@
+import hashlib
+
+from django.conf import settings
+from django.core.cache import cache
+
+from oscar.core.cache import bump_version, get_version
+from oscar.core.loading import get_model
+
+
+def get_linked_promotions(path, keyword=None):
+    """
+    Return the page promotions of a path, followed by the keyword promotions
+    of a search query if one is passed
+    """
+    PagePromotion = get_model('promotions', 'PagePromotion')
+    KeywordPromotion = get_model('promotions', 'KeywordPromotion')
+    promotions = list(
+        PagePromotion._default_manager.prefetch_related('content_object')
+        .filter(page_url=path).order_by('display_order'))
+    if keyword is not None:
+        promotions.extend(
+            KeywordPromotion._default_manager
+            .prefetch_related('content_object').filter(keyword=keyword))
+    return promotions
+
+
+def split_by_position(linked_promotions, context):
+    """
+    Split the list of promotions into separate lists, grouping
+    by position, and write these lists to the context dict.
+    """
+    for linked_promotion in linked_promotions:
+        promotion = linked_promotion.content_object
+        if not promotion:
+            continue
+        key = 'promotions_%s' % linked_promotion.position.lower()
+        if key not in context:
+            context[key] = []
+        context[key].append(promotion)
+
+
+class PromotionCache(object):
+    """
+    Caches the promotions of a page, grouped by position, per path and
+    search keyword.
+
+    All entries are dropped when a promotion changes (see invalidate()), and
+    expire after OSCAR_PROMOTIONS_CACHE_TIMEOUT seconds otherwise.
+    """
+    version_key = 'oscar-promotions-version'
+
+    @classmethod
+    def get_version(cls):
+        return get_version(cls.version_key)
+
+    @classmethod
+    def invalidate(cls):
+        """
+        Drop the cached promotions of all pages.
+        """
+        bump_version(cls.version_key)
+
+    def get_cache_key(self, path, keyword=None):
+        # Paths and search queries can contain characters that aren't valid
+        # in memcached keys
+        digest = hashlib.md5(
+            repr((path, keyword)).encode('utf8')).hexdigest()
+        return 'oscar-promotions-%s-%s' % (self.get_version(), digest)
+
+    def get_promotions(self, path, keyword=None):
+        """
+        Return a dict of the promotions for a page, with one list per
+        position keyed by ``promotions_<position>``
+        """
+        timeout = settings.OSCAR_PROMOTIONS_CACHE_TIMEOUT
+        if not timeout:
+            return self.load(path, keyword)
+        key = self.get_cache_key(path, keyword)
+        promotions = cache.get(key)
+        if promotions is None:
+            promotions = self.load(path, keyword)
+            cache.set(key, promotions, timeout)
+        return promotions
+
+    def load(self, path, keyword=None):
+        promotions = {}
+        split_by_position(get_linked_promotions(path, keyword), promotions)
+        return promotions
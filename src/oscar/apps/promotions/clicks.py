@@ -0,0 +1,44 @@
+from collections import Counter, defaultdict
+
+from django.db import transaction
+from django.db.models import F
+
+from oscar.core.buffers import WriteBuffer
+
+
+class ClickBuffer(WriteBuffer):
+    """
+    Collects clicks on linked promotions in memory and adds them to the
+    promotions' click counts in batches.
+
+    The counts are incremented with ``UPDATE ... SET clicks = clicks + n``
+    queries, so concurrent processes don't overwrite each other's clicks,
+    and promotions with the same number of clicks are updated together.
+    """
+    size_setting = 'OSCAR_PROMOTIONS_CLICKS_BUFFER_SIZE'
+    interval_setting = 'OSCAR_PROMOTIONS_CLICKS_FLUSH_INTERVAL'
+
+    def _reset(self):
+        self.clicks = defaultdict(Counter)
+
+    def record_click(self, linked_promotion):
+        def record():
+            self.clicks[type(linked_promotion)][linked_promotion.pk] += 1
+        self.add(record)
+
+    def get_contents(self):
+        return self.clicks
+
+    def merge(self, clicks):
+        for model, counts in clicks.items():
+            self.clicks[model].update(counts)
+
+    def write(self, clicks):
+        with transaction.atomic():
+            for model, counts in clicks.items():
+                groups = defaultdict(list)
+                for pk, count in counts.items():
+                    groups[count].append(pk)
+                for count, pks in groups.items():
+                    model._default_manager.filter(pk__in=pks).update(
+                        clicks=F('clicks') + count)
@@ -6,3 +6,6 @@ class PromotionsConfig(AppConfig):
     label = 'promotions'
     name = 'oscar.apps.promotions'
     verbose_name = _('Promotions')
+
+    def ready(self):
+        from . import receivers  # noqa
@@ -6,7 +6,7 @@ from django.urls import reverse
 from django.utils.translation import gettext_lazy as _
 from django.utils.translation import pgettext_lazy
 
-from oscar.core.loading import get_model
+from oscar.core.loading import get_class, get_model
 from oscar.models.fields import ExtendedURLField
 
 # Linking models - these link promotions to content (eg pages, or keywords)
@@ -33,8 +33,16 @@ class LinkedPromotion(models.Model):
         verbose_name_plural = _("Linked Promotions")
 
     def record_click(self):
+        """
+        Count a click on this promotion.
+
+        The click is buffered and added to the stored count later (see
+        ``promotions.clicks.ClickBuffer``), so only this instance's count is
+        up to date right away.
+        """
+        click_buffer = get_class('promotions.receivers', 'click_buffer')
+        click_buffer.record_click(self)
         self.clicks += 1
-        self.save()
     record_click.alters_data = True
 
 
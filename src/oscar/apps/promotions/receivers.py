@@ -0,0 +1,24 @@
+from django.apps import apps
+from django.db.models.signals import post_delete, post_save
+
+from oscar.core.loading import get_class
+
+ClickBuffer = get_class('promotions.clicks', 'ClickBuffer')
+PromotionCache = get_class('promotions.cache', 'PromotionCache')
+
+#: Buffers the promotion clicks of this process. Call its flush() method to
+#: write pending clicks to the database immediately.
+click_buffer = ClickBuffer()
+click_buffer.connect()
+
+
+def invalidate_promotions(sender, **kwargs):
+    PromotionCache.invalidate()
+
+
+# Any change to a promotion or to what it is linked to may change the
+# promotions of a page. Click counts are written with update queries, which
+# don't send these signals.
+for promotion_model in apps.get_app_config('promotions').get_models():
+    post_save.connect(invalidate_promotions, sender=promotion_model)
+    post_delete.connect(invalidate_promotions, sender=promotion_model)
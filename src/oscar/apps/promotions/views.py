@@ -15,14 +15,16 @@ class RecordClickView(RedirectView):
     """
     permanent = False
     model = None
+    pk_url_kwarg = 'pk'
 
     def get_redirect_url(self, **kwargs):
         try:
-            prom = self.model.objects.get(pk=kwargs['pk'])
+            prom = self.model.objects.get(pk=kwargs[self.pk_url_kwarg])
         except self.model.DoesNotExist:
             return reverse('promotions:home')
 
-        if prom.promotion.has_link:
+        link_url = getattr(prom.content_object, 'link_url', None)
+        if link_url:
             prom.record_click()
-            return prom.link_url
+            return link_url
         return reverse('promotions:home')
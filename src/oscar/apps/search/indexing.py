@@ -0,0 +1,170 @@
+import logging
+import time
+from multiprocessing import Pool
+
+from django import db
+from haystack import connections
+
+from oscar.core.loading import get_model
+
+Product = get_model('catalogue', 'Product')
+
+logger = logging.getLogger('oscar.search')
+
+
+class IndexingStats(object):
+    """
+    Progress and throughput of a run of the ``ProductIndexer``
+    """
+
+    def __init__(self, total):
+        self.total = total
+        self.num_indexed = 0
+        self.num_batches = 0
+        self.started = time.monotonic()
+
+    def __str__(self):
+        return "Indexed %d of %d products (%d%%) in %.1fs, %.1f products/s" % (
+            self.num_indexed, self.total, self.progress * 100, self.elapsed,
+            self.rate)
+
+    def add_batch(self, num_indexed):
+        self.num_indexed += num_indexed
+        self.num_batches += 1
+
+    @property
+    def elapsed(self):
+        return time.monotonic() - self.started
+
+    @property
+    def rate(self):
+        elapsed = self.elapsed
+        return self.num_indexed / elapsed if elapsed else 0.0
+
+    @property
+    def progress(self):
+        return self.num_indexed / self.total if self.total else 1.0
+
+
+class ProductIndexer(object):
+    """
+    Updates the product search index in batches.
+
+    The IDs of the products to index are read in batches of *batch_size*,
+    using keyset pagination so large catalogues don't need ever slower
+    offset queries. Each batch is loaded with the relations the
+    ``ProductIndex`` needs prefetched, the purchase infos of all its products
+    are resolved at once, and the prepared documents are posted to the search
+    backend in one request. With *workers* set, batches are prepared and
+    posted by a pool of that many processes.
+    """
+
+    def __init__(self, using='default', batch_size=500, workers=0,
+                 commit=True):
+        self.using = using
+        self.batch_size = batch_size
+        self.workers = workers
+        self.commit = commit
+
+    def get_index(self):
+        return connections[self.using].get_unified_index().get_index(Product)
+
+    def get_queryset(self, start_date=None, end_date=None):
+        """
+        Return the products to index; only those updated between
+        *start_date* and *end_date*, if given.
+        """
+        return self.get_index().build_queryset(
+            using=self.using, start_date=start_date, end_date=end_date)
+
+    def get_batches(self, queryset):
+        """
+        Yield the IDs of the products in *queryset* in batches
+        """
+        ids = queryset.prefetch_related(None).order_by('pk').values_list(
+            'pk', flat=True)
+        last_id = None
+        while True:
+            batch_ids = ids if last_id is None else ids.filter(pk__gt=last_id)
+            batch = list(batch_ids[:self.batch_size])
+            if not batch:
+                return
+            yield batch
+            last_id = batch[-1]
+
+    def load_batch(self, ids):
+        """
+        Return the indexable products among the given IDs
+        """
+        return list(self.get_index().build_queryset(using=self.using).filter(
+            pk__in=ids))
+
+    def index_products(self, products):
+        """
+        Prepare and post the documents of a batch of products
+        """
+        if not products:
+            return
+        index = self.get_index()
+        index.start_batch(products)
+        try:
+            backend = connections[self.using].get_backend()
+            backend.update(index, products, commit=self.commit)
+        finally:
+            index.end_batch()
+
+    def remove_products(self, ids):
+        """
+        Remove the documents of products from the index
+        """
+        backend = connections[self.using].get_backend()
+        for pk in ids:
+            backend.remove('%s.%s' % (Product._meta.label_lower, pk),
+                           commit=self.commit)
+
+    def index_batch(self, ids):
+        """
+        Prepare and post the documents of a batch of products, and return
+        the number of indexed products.
+        """
+        products = self.load_batch(ids)
+        self.index_products(products)
+        return len(products)
+
+    def run(self, start_date=None, end_date=None, progress=None):
+        """
+        Index all products, or those updated between *start_date* and
+        *end_date*. *progress* is called with the ``IndexingStats`` after
+        every batch. Returns the final ``IndexingStats``.
+        """
+        queryset = self.get_queryset(start_date, end_date)
+        stats = IndexingStats(queryset.count())
+        batches = self.get_batches(queryset)
+
+        if self.workers:
+            # Make the worker processes open their own database connections
+            db.connections.close_all()
+            pool = Pool(self.workers)
+            try:
+                args = ((self, ids) for ids in batches)
+                for num_indexed in pool.imap_unordered(_index_batch, args):
+                    self._add_batch(stats, num_indexed, progress)
+            finally:
+                pool.close()
+                pool.join()
+        else:
+            for ids in batches:
+                self._add_batch(stats, self.index_batch(ids), progress)
+
+        logger.info(str(stats))
+        return stats
+
+    def _add_batch(self, stats, num_indexed, progress):
+        stats.add_batch(num_indexed)
+        if progress is not None:
+            progress(stats)
+
+
+def _index_batch(args):
+    indexer, ids = args
+    return indexer.index_batch(ids)
@@ -31,13 +31,16 @@ class ProductIndex(indexes.SearchIndex, indexes.Indexable):
     date_updated = indexes.DateTimeField(model_attr='date_updated')
 
     _strategy = None
+    _batch_ids = frozenset()
 
     def get_model(self):
         return get_model('catalogue', 'Product')
 
     def index_queryset(self, using=None):
         # Only index browsable products (not each individual child product)
-        return self.get_model().browsable.order_by('-date_updated')
+        return self.get_model().browsable.order_by('-date_updated') \
+            .prefetch_related(
+                'categories', *self.get_strategy().prefetch_lookups)
 
     def read_queryset(self, using=None):
         return self.get_model().browsable.base_queryset()
@@ -63,29 +66,42 @@ class ProductIndex(indexes.SearchIndex, indexes.Indexable):
             self._strategy = Selector().strategy()
         return self._strategy
 
-    def prepare_price(self, obj):
-        strategy = self.get_strategy()
-        result = None
-        if obj.is_parent:
-            result = strategy.fetch_for_parent(obj)
-        elif obj.has_stockrecords:
-            result = strategy.fetch_for_product(obj)
+    def get_purchase_info(self, obj):
+        return self.get_strategy().get_purchase_info(obj)
 
-        if result:
-            if result.price.is_tax_known:
-                return result.price.incl_tax
-            return result.price.excl_tax
+    def prepare_price(self, obj):
+        result = self.get_purchase_info(obj)
+        if result.price.is_tax_known:
+            return result.price.incl_tax
+        return result.price.excl_tax
 
     def prepare_num_in_stock(self, obj):
-        strategy = self.get_strategy()
         if obj.is_parent:
             # Don't return a stock level for parent products
             return None
-        elif obj.has_stockrecords:
-            result = strategy.fetch_for_product(obj)
+        result = self.get_purchase_info(obj)
+        if result.stockrecord:
             return result.stockrecord.net_stock_level
 
+    def start_batch(self, objs):
+        """
+        Resolve the purchase info of a batch of products at once, before
+        their documents are prepared.
+        """
+        self._strategy = None
+        self._batch_ids = frozenset(obj.pk for obj in objs)
+        self.get_strategy().fetch_for_products(objs)
+
+    def end_batch(self):
+        self._strategy = None
+        self._batch_ids = frozenset()
+
     def prepare(self, obj):
+        # The strategy memoises purchase infos, so start afresh for every
+        # product that isn't part of the current batch to not index stale
+        # prices.
+        if obj.pk not in self._batch_ids:
+            self.end_batch()
         prepared_data = super().prepare(obj)
 
         # We use Haystack's dynamic fields to ensure that the title field used
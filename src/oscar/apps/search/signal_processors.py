@@ -0,0 +1,152 @@
+import atexit
+import logging
+import threading
+import time
+
+from django.conf import settings
+from django.core.signals import request_finished
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from haystack.signals import BaseSignalProcessor
+
+from oscar.core.loading import get_class, get_model
+
+ProductIndexer = get_class('search.indexing', 'ProductIndexer')
+
+logger = logging.getLogger('oscar.search')
+
+
+class IndexUpdateQueue(object):
+    """
+    Collects the IDs of products whose search documents are out of date, and
+    updates them in batches.
+
+    Duplicate IDs are collapsed, and child products are indexed through
+    their parents. Flushing happens at the end of a request once
+    OSCAR_SEARCH_INDEX_FLUSH_INTERVAL seconds have passed since the last
+    flush or the queue is full, and when the process exits. It never
+    happens while adding to the queue, so requests don't wait for the index.
+    """
+
+    def __init__(self, using=('default',)):
+        self.using = using
+        self._lock = threading.Lock()
+        self._last_flush = time.monotonic()
+        self.product_ids = set()
+
+    def add(self, product_ids):
+        with self._lock:
+            self.product_ids.update(product_ids)
+
+    def clear(self):
+        """
+        Discard all queued updates
+        """
+        with self._lock:
+            self.product_ids = set()
+
+    def flush_if_due(self):
+        interval = settings.OSCAR_SEARCH_INDEX_FLUSH_INTERVAL
+        with self._lock:
+            is_full = (len(self.product_ids)
+                       >= settings.OSCAR_SEARCH_INDEX_BUFFER_SIZE)
+        if is_full or time.monotonic() - self._last_flush >= interval:
+            self.flush()
+
+    def flush(self):
+        """
+        Update the search documents of all queued products
+        """
+        with self._lock:
+            product_ids = self.product_ids
+            self.product_ids = set()
+            self._last_flush = time.monotonic()
+        if not product_ids:
+            return
+
+        Product = get_model('catalogue', 'Product')
+        # Child products aren't indexed, but their parents' documents include
+        # their prices and stock levels.
+        parent_ids = dict(Product.objects.filter(pk__in=product_ids)
+                          .values_list('pk', 'parent_id'))
+        deleted_ids = product_ids - set(parent_ids)
+        product_ids = {parent_id or pk for pk, parent_id in parent_ids.items()}
+        product_ids |= deleted_ids
+
+        for using in self.using:
+            try:
+                self.update(using, sorted(product_ids))
+            except Exception:
+                logger.exception(
+                    "Failed to update the search index for %d products",
+                    len(product_ids))
+
+    def update(self, using, product_ids):
+        indexer = ProductIndexer(using=using)
+        for start in range(0, len(product_ids), indexer.batch_size):
+            batch = product_ids[start:start + indexer.batch_size]
+            products = indexer.load_batch(batch)
+            indexer.index_products(products)
+            # Products that were deleted or aren't browsable any more
+            indexer.remove_products(
+                set(batch) - {product.pk for product in products})
+
+
+class QueuedSignalProcessor(BaseSignalProcessor):
+    """
+    A Haystack signal processor that keeps the product search index up to
+    date without indexing synchronously on every save.
+
+    Changes to products, their stock records, categories and attribute
+    values queue the product's ID once the transaction has been committed;
+    the queue is flushed in batches (see ``IndexUpdateQueue``). To use it,
+    set::
+
+        HAYSTACK_SIGNAL_PROCESSOR = \\
+            'oscar.apps.search.signal_processors.QueuedSignalProcessor'
+    """
+
+    def setup(self):
+        self.queue = IndexUpdateQueue(self.connection_router.for_write())
+        for model in self.get_models():
+            post_save.connect(self.handle_change, sender=model)
+            post_delete.connect(self.handle_change, sender=model)
+        request_finished.connect(self.handle_request_finished)
+        atexit.register(self.queue.flush)
+
+    def teardown(self):
+        for model in self.get_models():
+            post_save.disconnect(self.handle_change, sender=model)
+            post_delete.disconnect(self.handle_change, sender=model)
+        request_finished.disconnect(self.handle_request_finished)
+        atexit.unregister(self.queue.flush)
+
+    def get_models(self):
+        return [get_model('catalogue', 'Product'),
+                get_model('partner', 'StockRecord'),
+                get_model('catalogue', 'ProductCategory'),
+                get_model('catalogue', 'ProductAttributeValue')]
+
+    def get_product_ids(self, instance, deleted=False):
+        if not isinstance(instance, get_model('catalogue', 'Product')):
+            return [instance.product_id]
+        # The queue can't look up the parent of a deleted child product, but
+        # the parent's document includes the child's prices and stock
+        if deleted and instance.parent_id is not None:
+            return [instance.pk, instance.parent_id]
+        return [instance.pk]
+
+    def handle_change(self, sender, instance, signal, **kwargs):
+        if kwargs.get('raw', False):
+            return
+        product_ids = [
+            product_id for product_id in self.get_product_ids(
+                instance, deleted=signal is post_delete)
+            if product_id is not None]
+        if product_ids:
+            transaction.on_commit(lambda: self.queue.add(product_ids))
+
+    def handle_request_finished(self, sender, **kwargs):
+        # The response has been sent at this point, so updating the index
+        # doesn't add to the request's latency.
+        self.queue.flush_if_due()
@@ -62,6 +62,14 @@ class FacetedSearchView(views.FacetedSearchView):
 
         return extra
 
+    def build_page(self):
+        paginator, page = super().build_page()
+        # Resolve prices and availability for the whole page at once
+        products = [result.object for result in page.object_list
+                    if result is not None and result.object is not None]
+        self.request.strategy.fetch_for_products(products)
+        return paginator, page
+
     def get_results(self):
         # We're only interested in products (there might be other content types
         # in the Solr index).
@@ -1,6 +1,9 @@
 from decimal import Decimal as D
 
-from django.core.exceptions import ObjectDoesNotExist
+from oscar.core.loading import get_class
+
+prefetch_product_attributes = get_class(
+    'catalogue.product_attributes', 'prefetch_product_attributes')
 
 
 class Scale(object):
@@ -12,17 +15,9 @@ class Scale(object):
         self.default_weight = default_weight
 
     def weigh_product(self, product):
-        weight = None
-        try:
-            weight = product.attribute_values.get(
-                attribute__code=self.attribute).value
-        except ObjectDoesNotExist:
-            if product.parent:
-                try:
-                    weight = product.parent.attribute_values.get(
-                        attribute__code=self.attribute).value
-                except ObjectDoesNotExist:
-                    pass
+        weight = getattr(product.attr, self.attribute, None)
+        if weight is None and product.parent:
+            weight = getattr(product.parent.attr, self.attribute, None)
 
         if weight is None:
             if self.default_weight is None:
@@ -35,6 +30,9 @@ class Scale(object):
 
     def weigh_basket(self, basket):
         weight = D('0.0')
-        for line in basket.lines.all():
+        lines = basket.all_lines()
+        # Load the attributes of all products (and their parents) at once
+        prefetch_product_attributes([line.product for line in lines])
+        for line in lines:
             weight += self.weigh_product(line.product) * line.quantity
         return weight
@@ -1,15 +1,18 @@
+import logging
 from decimal import Decimal
 
 from django.core import exceptions
-from django.db import models, transaction
+from django.db import IntegrityError, connection, models, transaction
 from django.db.models import Sum
 from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
 
-from oscar.apps.voucher.utils import get_unused_code
+from oscar.apps.voucher.utils import get_unused_code, get_unused_codes
 from oscar.core.compat import AUTH_USER_MODEL
 from oscar.core.loading import get_model
 
+logger = logging.getLogger('oscar.vouchers')
+
 
 class AbstractVoucherSet(models.Model):
     """A collection of vouchers (potentially auto-generated)
@@ -53,11 +56,64 @@ class AbstractVoucherSet(models.Model):
     def __str__(self):
         return self.name
 
-    def generate_vouchers(self):
-        """Generate vouchers for this set"""
-        current_count = self.vouchers.count()
-        for i in range(current_count, self.count):
-            self.add_new()
+    def generate_vouchers(self, batch_size=1000, progress=None,
+                          max_retries=3):
+        """Generate vouchers for this set
+
+        The vouchers are generated in batches of *batch_size*: the codes of
+        a batch are checked against the existing codes with a single query,
+        and the vouchers are created with bulk queries. *progress* is called
+        with the number of generated vouchers and the total number of
+        vouchers to generate after every batch. A batch whose codes were
+        taken in the meantime is generated again, up to *max_retries* times
+        before the IntegrityError is raised.
+        """
+        Voucher = get_model('voucher', 'Voucher')
+        max_query_params = connection.features.max_query_params
+        if max_query_params:
+            batch_size = min(batch_size, max_query_params)
+        num_missing = self.count - self.vouchers.count()
+        num_generated = 0
+        num_retries = 0
+        while num_generated < num_missing:
+            num_vouchers = min(num_missing - num_generated, batch_size)
+            codes = [code.upper() for code in get_unused_codes(
+                num_vouchers, length=self.code_length, batch_size=batch_size)]
+            vouchers = [
+                Voucher(name=self.name, code=code, voucher_set=self,
+                        usage=Voucher.SINGLE_USE,
+                        start_datetime=self.start_datetime,
+                        end_datetime=self.end_datetime)
+                for code in codes]
+            try:
+                with transaction.atomic():
+                    Voucher.objects.bulk_create(vouchers)
+                    if self.offer:
+                        self._add_offer_to_vouchers(codes)
+            except IntegrityError:
+                # Another process used some of the codes in the meantime;
+                # generate this batch again.
+                if num_retries >= max_retries:
+                    raise
+                num_retries += 1
+                continue
+            num_retries = 0
+            num_generated += num_vouchers
+            logger.info("Generated %d of %d vouchers for voucher set %s",
+                        num_generated, num_missing, self.pk)
+            if progress is not None:
+                progress(num_generated, num_missing)
+
+    def _add_offer_to_vouchers(self, codes):
+        Voucher = get_model('voucher', 'Voucher')
+        field = Voucher._meta.get_field('offers')
+        VoucherOffers = field.remote_field.through
+        voucher_ids = Voucher.objects.filter(code__in=codes).values_list(
+            'pk', flat=True)
+        VoucherOffers.objects.bulk_create([
+            VoucherOffers(**{field.m2m_column_name(): voucher_id,
+                             field.m2m_reverse_name(): self.offer_id})
+            for voucher_id in voucher_ids])
 
     def add_new(self):
         """Add a new voucher to this set"""
@@ -12,21 +12,19 @@ Voucher = get_model('voucher', 'Voucher')
 
 class VoucherReportCSVFormatter(ReportCSVFormatter):
     filename_template = 'voucher-performance.csv'
-
-    def generate_csv(self, response, vouchers):
-        writer = self.get_csv_writer(response)
-        header_row = [_('Voucher code'),
-                      _('Added to a basket'),
-                      _('Used in an order'),
-                      _('Total discount')]
-        writer.writerow(header_row)
-
-        for voucher in vouchers:
-            row = [voucher.code,
-                   voucher.num_basket_additions,
-                   voucher.num_orders,
-                   voucher.total_discount]
-            writer.writerow(row)
+    streaming = True
+
+    def get_header_row(self):
+        return [_('Voucher code'),
+                _('Added to a basket'),
+                _('Used in an order'),
+                _('Total discount')]
+
+    def get_row(self, voucher):
+        return [voucher.code,
+                voucher.num_basket_additions,
+                voucher.num_orders,
+                voucher.total_discount]
 
 
 class VoucherReportHTMLFormatter(ReportHTMLFormatter):
@@ -33,3 +33,39 @@ def get_unused_code(length=12, group_length=4, separator='-'):
             "SELECT 1 FROM voucher_voucher WHERE code=%s", [code])
         if not cursor.fetchall():
             return code
+
+
+def get_unused_codes(count, length=12, group_length=4, separator='-',
+                     batch_size=1000):
+    """Generate *count* distinct codes that don't exist in the db yet.
+
+    Candidate codes are generated in batches, and each batch is checked
+    against the existing codes with a single query.
+
+    :param int count: the number of codes to generate
+    :param int length: the number of characters in each code
+    :param int group_length: length of character groups separated by dash '-'
+    :param int batch_size: the maximum number of codes to check per query
+    :return: voucher codes
+    :rtype: list
+
+    """
+    max_query_params = connection.features.max_query_params
+    if max_query_params:
+        batch_size = min(batch_size, max_query_params)
+    codes = set()
+    while len(codes) < count:
+        num_candidates = min(count - len(codes), batch_size)
+        candidates = set()
+        while len(candidates) < num_candidates:
+            code = generate_code(length, group_length=group_length,
+                                 separator=separator)
+            if code not in codes:
+                candidates.add(code)
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT code FROM voucher_voucher WHERE code IN (%s)"
+                % ', '.join(['%s'] * len(candidates)), list(candidates))
+            existing = {row[0] for row in cursor.fetchall()}
+        codes.update(candidates - existing)
+    return list(codes)
@@ -0,0 +1,130 @@
+import atexit
+import logging
+import threading
+import time
+
+from django.conf import settings
+from django.core.signals import request_finished
+
+logger = logging.getLogger('oscar.buffers')
+
+
+class WriteBuffer(object):
+    """
+    Base class for collecting data in memory and writing it to the database
+    in batches.
+
+    Flushing happens when the buffer holds as many items as the setting
+    named by ``size_setting``, at the end of a request once as many seconds
+    as the setting named by ``interval_setting`` have passed since the last
+    flush (see connect()), and when the process exits. If writing fails, the
+    data is put back into the buffer and written with the next flush, which
+    then only happens at the end of a request or when the process exits.
+    After ``max_retries`` failed flushes in a row, the data is dropped, so
+    data that can't be written (e.g. for deleted objects) doesn't block the
+    buffer forever.
+
+    Subclasses keep their data in attributes set by ``_reset()``, return it
+    from ``get_contents()``, put it back with ``merge()`` and write it with
+    ``write()``. All three are called with the buffer's lock held, except
+    ``write()``.
+    """
+    size_setting = None
+    interval_setting = None
+    max_retries = 3
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._last_flush = time.monotonic()
+        self._num_failures = 0
+        self.num_items = 0
+        self._reset()
+
+    def connect(self):
+        """
+        Flush the buffer at the end of requests and when the process exits
+        """
+        request_finished.connect(self.handle_request_finished)
+        # Make sure no data gets lost when the process shuts down
+        atexit.register(self.flush)
+
+    def disconnect(self):
+        request_finished.disconnect(self.handle_request_finished)
+        atexit.unregister(self.flush)
+
+    def handle_request_finished(self, sender, **kwargs):
+        # The response has been sent at this point, so writing the buffer
+        # doesn't add to the request's latency.
+        self.flush_if_due()
+
+    def clear(self):
+        """
+        Discard all buffered data
+        """
+        with self._lock:
+            self.num_items = 0
+            self._num_failures = 0
+            self._reset()
+
+    def add(self, func):
+        """
+        Call *func* to add an item to the buffer, and flush the buffer if it
+        is full. After a failed flush, the buffer isn't flushed here again, so
+        requests don't keep waiting for writes that are likely to fail.
+        """
+        with self._lock:
+            func()
+            self.num_items += 1
+            is_full = (not self._num_failures and self.num_items
+                       >= getattr(settings, self.size_setting))
+        if is_full:
+            self.flush()
+
+    def flush_if_due(self):
+        interval = getattr(settings, self.interval_setting)
+        if time.monotonic() - self._last_flush >= interval:
+            self.flush()
+
+    def flush(self):
+        """
+        Write all buffered data to the database
+        """
+        with self._lock:
+            if not self.num_items:
+                return
+            contents, num_items = self.get_contents(), self.num_items
+            self.num_items = 0
+            self._reset()
+            self._last_flush = time.monotonic()
+
+        try:
+            self.write(contents)
+        except Exception:
+            with self._lock:
+                self._num_failures += 1
+                if self._num_failures > self.max_retries:
+                    self._num_failures = 0
+                    logger.exception(
+                        "Failed to write %d items of %s %d times, dropping "
+                        "them", num_items, type(self).__name__,
+                        self.max_retries + 1)
+                    return
+                logger.exception(
+                    "Failed to write %d items of %s, keeping them for the "
+                    "next flush", num_items, type(self).__name__)
+                self.merge(contents)
+                self.num_items += num_items
+        else:
+            self._num_failures = 0
+
+    def _reset(self):
+        raise NotImplementedError
+
+    def get_contents(self):
+        raise NotImplementedError
+
+    def merge(self, contents):
+        raise NotImplementedError
+
+    def write(self, contents):
+        raise NotImplementedError
@@ -0,0 +1,59 @@
+"""
+Helpers for versioned cache entries.
+
+Cached data that is derived from the database is stored under keys that
+include a version, which is kept in the cache itself. Changing the version
+makes all entries that were built with the old one unreachable, without
+having to know their keys.
+
+Invalidation happens twice: right away, and again once the current
+transaction has been committed. Otherwise another process could read the
+old data before the commit and cache it under the new version.
+"""
+from uuid import uuid4
+
+from django.core.cache import cache
+from django.db import transaction
+
+
+def get_version(key):
+    """
+    Return the version stored under *key*, setting a new one if there is
+    none
+    """
+    return get_versions([key])[key]
+
+
+def get_versions(keys):
+    """
+    Return a dict with the versions stored under *keys*, setting new ones
+    for the missing keys
+    """
+    versions = cache.get_many(keys)
+    missing = {key: uuid4().hex for key in keys if key not in versions}
+    if missing:
+        cache.set_many(missing, None)
+        versions.update(missing)
+    return versions
+
+
+def bump_version(key):
+    """
+    Replace the version stored under *key*, now and once the current
+    transaction has been committed
+    """
+    def set_version():
+        cache.set(key, uuid4().hex, None)
+    set_version()
+    transaction.on_commit(set_version)
+
+
+def delete_on_commit(keys):
+    """
+    Delete cache entries, now and once the current transaction has been
+    committed
+    """
+    def delete():
+        cache.delete_many(keys)
+    delete()
+    transaction.on_commit(delete)
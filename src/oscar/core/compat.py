@@ -1,8 +1,11 @@
 import csv
 
+import django
 from django.conf import settings
 from django.contrib.auth.models import User
 from django.core.exceptions import ImproperlyConfigured
+from django.db import connection
+from django.db.models import Case, Value, When
 
 from oscar.core.loading import get_model
 
@@ -162,3 +165,73 @@ class UnicodeCSVWriter:
     def writerows(self, rows):
         for row in rows:
             self.writerow(row)
+
+
+class StreamingCSVBuffer:
+    """
+    A file-like object for use with UnicodeCSVWriter that holds on to the
+    written data until it is read. This allows writing CSV files row by row
+    into a StreamingHttpResponse:
+
+      buffer = StreamingCSVBuffer()
+      writer = UnicodeCSVWriter(open_file=buffer)
+      for row in rows:
+          writer.writerow(row)
+          yield buffer.read()
+    """
+    def __init__(self):
+        self.chunks = []
+
+    def write(self, value):
+        self.chunks.append(value)
+
+    def read(self):
+        value = ''.join(self.chunks)
+        self.chunks = []
+        return value
+
+
+def bulk_update(model, objs, fields):
+    """
+    Update the given fields of several model instances using as few queries
+    as possible.
+
+    A stand-in for QuerySet.bulk_update(), which is only available as of
+    Django 2.2. Each field is set with a CASE statement over the primary keys
+    of the instances. Like QuerySet.update(), this doesn't call save() or send
+    any signals.
+    """
+    if not objs:
+        return
+    fields = [model._meta.get_field(name) for name in fields]
+    # Each instance needs a parameter for its primary key in the WHERE clause,
+    # and two per field in the CASE statements: one for its primary key and
+    # one for the value.
+    batch_size = len(objs)
+    max_query_params = connection.features.max_query_params
+    if max_query_params:
+        batch_size = max(max_query_params // (1 + 2 * len(fields)), 1)
+    for start in range(0, len(objs), batch_size):
+        batch = objs[start:start + batch_size]
+        updates = {}
+        for field in fields:
+            whens = [
+                When(pk=obj.pk, then=Value(
+                    getattr(obj, field.attname), output_field=field))
+                for obj in batch]
+            updates[field.attname] = Case(*whens, output_field=field)
+        model._default_manager.filter(
+            pk__in=[obj.pk for obj in batch]).update(**updates)
+
+
+def queryset_iterator(queryset, chunk_size=2000):
+    """
+    Iterate over a queryset without caching its results, fetching
+    *chunk_size* rows at a time where the database backend allows it.
+
+    QuerySet.iterator() only accepts the chunk_size argument as of
+    Django 2.0; older versions use the backend's default.
+    """
+    if django.VERSION < (2, 0):
+        return queryset.iterator()
+    return queryset.iterator(chunk_size=chunk_size)
@@ -7,6 +7,8 @@ from django.apps import apps
 from django.apps.config import MODELS_MODULE_NAME
 from django.conf import settings
 from django.core.exceptions import AppRegistryNotReady
+from django.core.signals import setting_changed
+from django.dispatch import receiver
 from django.utils.lru_cache import lru_cache
 from django.utils.module_loading import import_string
 
@@ -65,8 +67,66 @@ def get_class_loader():
 
 
 def get_classes(module_label, classnames, module_prefix='oscar.apps'):
-    class_loader = get_class_loader()
-    return class_loader(module_label, classnames, module_prefix)
+    return class_registry.get_classes(module_label, classnames, module_prefix)
+
+
+class ClassRegistry(object):
+    """
+    Memoizes the classes resolved by the dynamic class loader.
+
+    Resolving a class walks ``INSTALLED_APPS`` and attempts several imports,
+    so once the app registry is ready, each ``(module_label, classname)``
+    pair is only resolved once. Lookups made while apps are still loading
+    aren't memoized, as modules can be partially imported at that point.
+    Classes that moved to another module aren't memoized either, so their
+    deprecation warning is raised for every lookup.
+
+    The registry is cleared when ``INSTALLED_APPS`` or
+    ``OSCAR_DYNAMIC_CLASS_LOADER`` change.
+    """
+
+    def __init__(self):
+        self._classes = {}
+
+    def get_classes(self, module_label, classnames, module_prefix):
+        keys = [(module_label, classname, module_prefix)
+                for classname in classnames]
+        try:
+            return [self._classes[key] for key in keys]
+        except KeyError:
+            pass
+        class_loader = get_class_loader()
+        classes = class_loader(module_label, classnames, module_prefix)
+        if apps.ready and not _has_moved(
+                module_label, classnames, module_prefix):
+            self._classes.update(zip(keys, classes))
+        return classes
+
+    def items(self):
+        """
+        Return the memoized ``((module_label, classname, module_prefix),
+        class)`` pairs
+        """
+        return sorted(self._classes.items(), key=lambda item: item[0])
+
+    def clear(self):
+        self._classes.clear()
+
+
+class_registry = ClassRegistry()
+
+
+@receiver(setting_changed)
+def reset_class_registry(setting, **kwargs):
+    if setting in ('INSTALLED_APPS', 'OSCAR_DYNAMIC_CLASS_LOADER'):
+        get_class_loader.cache_clear()
+        class_registry.clear()
+
+
+def _has_moved(module_label, classnames, module_prefix):
+    moved_item = MOVED_ITEMS.get('%s.%s' % (module_prefix, module_label))
+    return moved_item is not None and bool(
+        set(moved_item[1]).intersection(classnames))
 
 
 def default_class_loader(module_label, classnames, module_prefix):
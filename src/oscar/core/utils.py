@@ -108,3 +108,16 @@ def get_default_currency():
     OSCAR_DEFAULT_CURRENCY as something it needs to generate a migration for.
     """
     return settings.OSCAR_DEFAULT_CURRENCY
+
+
+def clone_instance(instance):
+    """
+    Return a copy of a model instance that doesn't share any state (e.g. the
+    related object caches) with the original.
+    """
+    model = instance.__class__
+    fields = model._meta.concrete_fields
+    return model.from_db(
+        instance._state.db,
+        [field.attname for field in fields],
+        [getattr(instance, field.attname) for field in fields])
@@ -15,6 +15,8 @@ OSCAR_BASKET_COOKIE_LIFETIME = 7 * 24 * 60 * 60
 OSCAR_BASKET_COOKIE_OPEN = 'oscar_open_basket'
 OSCAR_BASKET_COOKIE_SECURE = False
 OSCAR_MAX_BASKET_QUANTITY_THRESHOLD = 10000
+OSCAR_BASKET_SNAPSHOT_TIMEOUT = 0
+OSCAR_BASKET_SUMMARY_TIMEOUT = 0
 
 # Recently-viewed products
 OSCAR_RECENTLY_VIEWED_COOKIE_LIFETIME = 7 * 24 * 60 * 60
@@ -34,6 +36,7 @@ OSCAR_DELETE_IMAGE_FILES = True
 # It needs to be there so Sorl can resize it.
 OSCAR_MISSING_IMAGE_URL = 'image_not_found.jpg'
 OSCAR_UPLOAD_ROOT = '/tmp'
+OSCAR_RANGE_UPLOAD_BACKGROUND_SIZE = None
 
 # Address settings
 OSCAR_REQUIRED_ADDRESS_FIELDS = ('first_name', 'last_name', 'line1',
@@ -50,6 +53,7 @@ OSCAR_ORDERS_PER_PAGE = 20
 OSCAR_ADDRESSES_PER_PAGE = 20
 OSCAR_STOCK_ALERTS_PER_PAGE = 20
 OSCAR_DASHBOARD_ITEMS_PER_PAGE = 20
+OSCAR_DASHBOARD_STATS_CACHE_TIMEOUT = 60
 
 # Checkout
 OSCAR_ALLOW_ANON_CHECKOUT = False
@@ -74,6 +78,14 @@ OSCAR_ACCOUNTS_REDIRECT_URL = 'customer:profile-view'
 # disabled.
 OSCAR_EAGER_ALERTS = True
 
+# Analytics
+# Analytics events are buffered in memory and written to the database in
+# batches. The buffer is flushed at the end of a request once the interval (in
+# seconds) has passed since the last flush, or when it holds the given number
+# of events.
+OSCAR_ANALYTICS_FLUSH_INTERVAL = 0
+OSCAR_ANALYTICS_BUFFER_SIZE = 1000
+
 # Registration
 OSCAR_SEND_REGISTRATION_EMAIL = True
 OSCAR_FROM_EMAIL = 'oscar@example.com'
@@ -215,6 +227,7 @@ OSCAR_DASHBOARD_NAVIGATION = [
     },
 ]
 OSCAR_DASHBOARD_DEFAULT_ACCESS_FUNCTION = 'oscar.apps.dashboard.nav.default_access_fn'  # noqa
+OSCAR_DASHBOARD_PRODUCT_SEARCH_BACKEND = None
 
 # Search facets
 OSCAR_SEARCH_FACETS = {
@@ -252,4 +265,9 @@ OSCAR_SEARCH_FACETS = {
 
 
 OSCAR_PROMOTIONS_ENABLED = True
+OSCAR_PROMOTIONS_CACHE_TIMEOUT = 300
+OSCAR_PROMOTIONS_CLICKS_FLUSH_INTERVAL = 0
+OSCAR_PROMOTIONS_CLICKS_BUFFER_SIZE = 1000
 OSCAR_PRODUCT_SEARCH_HANDLER = None
+OSCAR_SEARCH_INDEX_FLUSH_INTERVAL = 0
+OSCAR_SEARCH_INDEX_BUFFER_SIZE = 1000
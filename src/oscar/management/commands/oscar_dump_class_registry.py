@@ -0,0 +1,63 @@
+import sys
+import time
+
+from django.core.management.base import BaseCommand
+from django.urls import get_resolver
+
+from oscar.core.loading import class_registry, get_class_loader
+
+
+class Command(BaseCommand):
+    """
+    Command to show which classes the dynamic class loader resolves to
+    """
+    help = ("Show the classes that are loaded from forked apps instead of "
+            "Oscar, and optionally time resolving them with and without the "
+            "class registry")
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--all', action='store_true', dest='all',
+            help="Show all resolved classes, not only overridden ones")
+        parser.add_argument(
+            '--benchmark', action='store_true', dest='benchmark',
+            help="Time resolving all classes with and without the registry")
+
+    def handle(self, *args, **options):
+        # Importing the URL configuration loads the views of all apps, and
+        # with them most of the classes that are loaded dynamically.
+        get_resolver().url_patterns
+
+        items = class_registry.items()
+        for (module_label, classname, module_prefix), klass in items:
+            oscar_module = sys.modules.get('%s.%s' % (module_prefix, module_label))
+            is_overridden = getattr(oscar_module, classname, None) is not klass
+            if is_overridden or options['all']:
+                self.stdout.write("%s%s.%s -> %s" % (
+                    '* ' if is_overridden else '  ', module_label, classname,
+                    self.describe(klass)))
+
+        if options['benchmark']:
+            self.benchmark([key for key, klass in items])
+
+    def describe(self, klass):
+        if hasattr(klass, '__qualname__'):
+            return '%s.%s' % (klass.__module__, klass.__qualname__)
+        return repr(klass)
+
+    def benchmark(self, keys):
+        class_loader = get_class_loader()
+        start = time.perf_counter()
+        for module_label, classname, module_prefix in keys:
+            class_loader(module_label, [classname], module_prefix)
+        uncached = time.perf_counter() - start
+
+        start = time.perf_counter()
+        for module_label, classname, module_prefix in keys:
+            class_registry.get_classes(module_label, [classname], module_prefix)
+        cached = time.perf_counter() - start
+
+        self.stdout.write(
+            "Resolved %d classes in %.1fms with the class loader and in "
+            "%.1fms with the class registry" % (
+                len(keys), uncached * 1000, cached * 1000))
@@ -2,9 +2,10 @@ import logging
 
 from django.core.management.base import BaseCommand, CommandError
 
-from oscar.core.loading import get_class
+from oscar.core.loading import get_class, get_classes
 
-CatalogueImporter = get_class('partner.importers', 'CatalogueImporter')
+CatalogueImporter, BulkCatalogueImporter = get_classes(
+    'partner.importers', ['CatalogueImporter', 'BulkCatalogueImporter'])
 ImportingError = get_class('partner.exceptions', 'ImportingError')
 
 logger = logging.getLogger('oscar.catalogue.import')
@@ -28,12 +29,30 @@ class Command(BaseCommand):
             dest='delimiter',
             default=",",
             help='Delimiter used within CSV file(s)')
+        parser.add_argument(
+            '--bulk',
+            action='store_true',
+            dest='bulk',
+            default=False,
+            help='Use the set-based importer, which is faster for large files')
+        parser.add_argument(
+            '--batch-size',
+            dest='batch_size',
+            type=int,
+            default=1000,
+            help='Number of rows imported per transaction with --bulk')
 
     def handle(self, *args, **options):
         logger.info("Starting catalogue import")
-        importer = CatalogueImporter(
-            logger, delimiter=options.get('delimiter'),
-            flush=options.get('flush'))
+        if options.get('bulk'):
+            importer = BulkCatalogueImporter(
+                logger, delimiter=options.get('delimiter'),
+                flush=options.get('flush'),
+                batch_size=options.get('batch_size'))
+        else:
+            importer = CatalogueImporter(
+                logger, delimiter=options.get('delimiter'),
+                flush=options.get('flush'))
         for file_path in options['filename']:
             logger.info(" - Importing records from '%s'" % file_path)
             try:
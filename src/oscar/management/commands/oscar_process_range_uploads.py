@@ -0,0 +1,36 @@
+from django.core.management.base import BaseCommand
+
+from oscar.core.loading import get_model
+
+RangeProductFileUpload = get_model('offer', 'RangeProductFileUpload')
+
+
+class Command(BaseCommand):
+    """
+    Command to process range product files that were uploaded in the
+    dashboard but left pending because of their size
+    """
+    help = "Add the products in pending range product files to their ranges"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--chunk-size', type=int, default=1000,
+            help="Number of SKUs or UPCs to resolve at once")
+
+    def handle(self, *args, **options):
+        uploads = RangeProductFileUpload.objects.filter(
+            status=RangeProductFileUpload.PENDING).select_related('range')
+
+        def report_progress(stats):
+            self.stdout.write(str(stats))
+        progress = report_progress if options['verbosity'] >= 2 else None
+        for upload in uploads.order_by('date_uploaded'):
+            stats = upload.process(
+                chunk_size=options['chunk_size'], progress=progress)
+            if not upload.was_processing_successful():
+                self.stderr.write("Processing %s failed: %s" % (
+                    upload.filename, upload.error_message))
+                continue
+            upload.delete_file()
+            if options['verbosity'] >= 1:
+                self.stdout.write("%s: %s" % (upload.filename, stats))
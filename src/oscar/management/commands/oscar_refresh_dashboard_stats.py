@@ -0,0 +1,21 @@
+import logging
+
+from django.core.management.base import BaseCommand
+
+from oscar.core.loading import get_class
+
+DashboardStats = get_class('dashboard.stats', 'DashboardStats')
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    """
+    Command to recompute the cached dashboard statistics
+    """
+    help = ("Recompute the statistics shown on the dashboard's index page "
+            "and store them in the cache")
+
+    def handle(self, *args, **options):
+        DashboardStats().refresh()
+        logger.info("Refreshed the dashboard statistics")
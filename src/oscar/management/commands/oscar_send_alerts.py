@@ -16,10 +16,15 @@ class Command(BaseCommand):
     help = _("Check for products that are back in "
              "stock and send out alerts")
 
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--chunk-size', type=int, default=None,
+            help=_("Number of alerts to process at once"))
+
     def handle(self, **options):
         """
         Check all products with active product alerts for
         availability and send out email alerts when a product is
         available to buy.
         """
-        utils.send_alerts()
+        utils.send_alerts(chunk_size=options['chunk_size'])
@@ -0,0 +1,39 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from oscar.core.loading import get_model
+
+Order = get_model('order', 'Order')
+OrderSearchTerm = get_model('order', 'OrderSearchTerm')
+
+
+class Command(BaseCommand):
+    """
+    Command to rebuild the search terms of existing orders in batches
+    """
+    help = ("Rebuild the terms the dashboard searches orders by, e.g. after "
+            "upgrading or after changing order data with bulk queries")
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=500,
+            help="Number of orders to update per batch")
+
+    def handle(self, *args, **options):
+        last_id, num_orders = 0, 0
+        while True:
+            # Batches are selected by primary key rather than with an offset,
+            # so every batch is an index range scan.
+            batch = Order._default_manager.filter(
+                pk__gt=last_id).order_by('pk')[:options['batch_size']]
+            with transaction.atomic():
+                orders = OrderSearchTerm.update_for_queryset(batch)
+            if not orders:
+                break
+            last_id = orders[-1].pk
+            num_orders += len(orders)
+            if options['verbosity'] >= 2:
+                self.stdout.write("Updated %d orders" % num_orders)
+        if options['verbosity'] >= 1:
+            self.stdout.write(
+                "Updated the search terms of %d orders" % num_orders)
@@ -0,0 +1,46 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils.timezone import now
+
+from oscar.core.loading import get_class
+
+ProductIndexer = get_class('search.indexing', 'ProductIndexer')
+
+
+class Command(BaseCommand):
+    """
+    Command to update the product search index in batches
+    """
+    help = ("Update the product search index in batches, optionally only "
+            "for products updated in the last AGE hours")
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--age', type=int, default=None,
+            help="Only index products updated in the last AGE hours")
+        parser.add_argument(
+            '--batch-size', type=int, default=500,
+            help="Number of products to index per batch")
+        parser.add_argument(
+            '--workers', type=int, default=0,
+            help="Number of processes to index batches with")
+        parser.add_argument(
+            '--using', default='default',
+            help="The Haystack connection to update")
+
+    def handle(self, *args, **options):
+        start_date = None
+        if options['age'] is not None:
+            start_date = now() - timedelta(hours=options['age'])
+
+        indexer = ProductIndexer(
+            using=options['using'], batch_size=options['batch_size'],
+            workers=options['workers'])
+
+        def report_progress(stats):
+            self.stdout.write(str(stats))
+        progress = report_progress if options['verbosity'] >= 2 else None
+        stats = indexer.run(start_date=start_date, progress=progress)
+        if options['verbosity'] >= 1:
+            self.stdout.write(str(stats))
@@ -1,9 +1,11 @@
 from django import template
 
-from oscar.core.loading import get_model
+from oscar.core.loading import get_class
 
 register = template.Library()
-Category = get_model('catalogue', 'category')
+CategoryTree = get_class('catalogue.categories', 'CategoryTree')
+
+category_tree = CategoryTree()
 
 
 @register.simple_tag(name="category_tree")
@@ -11,7 +13,8 @@ def get_annotated_list(depth=None, parent=None):
     """
     Gets an annotated list from a tree branch.
 
-    Borrows heavily from treebeard's get_annotated_list
+    Borrows heavily from treebeard's get_annotated_list. The categories are
+    taken from the cached category tree, so no queries are needed.
     """
     # 'depth' is the backwards-compatible name for the template tag,
     # 'max_depth' is the better variable name.
@@ -21,15 +24,15 @@ def get_annotated_list(depth=None, parent=None):
 
     start_depth, prev_depth = (None, None)
     if parent:
-        categories = parent.get_descendants()
+        nodes = category_tree.get_descendants(parent)
         if max_depth is not None:
             max_depth += parent.get_depth()
     else:
-        categories = Category.get_tree()
+        nodes = category_tree.get_nodes()
 
     info = {}
-    for node in categories:
-        node_depth = node.get_depth()
+    for node in nodes:
+        node_depth = node.depth
         if start_depth is None:
             start_depth = node_depth
         if max_depth is not None and node_depth > max_depth:
@@ -42,7 +45,7 @@ def get_annotated_list(depth=None, parent=None):
 
         info = {'num_to_close': [],
                 'level': node_depth - start_depth}
-        annotated_categories.append((node, info,))
+        annotated_categories.append((category_tree.get_category(node), info,))
         prev_depth = node_depth
 
     if prev_depth is not None:
@@ -2,6 +2,8 @@ import os
 import warnings
 
 import django
+import pytest
+from django.core.cache import cache
 
 
 def pytest_addoption(parser):
@@ -31,3 +33,27 @@ def pytest_configure(config):
         os.environ['DATABASE_NAME'] = ':memory:'
 
     django.setup()
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    # Cached data (e.g. range indexes and site offers) would otherwise
+    # outlive the test database transaction it was built from.
+    cache.clear()
+
+
+@pytest.fixture(autouse=True)
+def clear_analytics_events():
+    # Buffered events may refer to objects of previous tests
+    from oscar.apps.analytics.receivers import event_buffer
+    event_buffer.clear()
+    yield
+    event_buffer.clear()
+
+
+@pytest.fixture(autouse=True)
+def clear_promotion_clicks():
+    from oscar.apps.promotions.receivers import click_buffer
+    click_buffer.clear()
+    yield
+    click_buffer.clear()
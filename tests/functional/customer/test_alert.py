@@ -86,19 +86,19 @@ class TestAUserWithAnActiveStockAlert(WebTest):
         self.stockrecord.save()
         self.assertEqual(0, len(mail.outbox))
 
-    @mock.patch('oscar.apps.customer.alerts.utils.services.notify_user')
-    def test_site_notification_sent(self, mock_notify):
+    def test_site_notification_sent(self):
         self.stockrecord.num_in_stock = 10
         self.stockrecord.save()
-        mock_notify.assert_called_once_with(
-            self.user,
+        notification = self.user.notifications.get()
+        self.assertEqual(
             '{} is back in stock'.format(self.product.title),
-            body='<a href="{}">{}</a> is back in stock'.format(
-                self.product.get_absolute_url(), self.product.title)
-        )
+            notification.subject)
+        self.assertEqual(
+            '<a href="{}">{}</a> is back in stock'.format(
+                self.product.get_absolute_url(), self.product.title),
+            notification.body)
 
-    @mock.patch('oscar.apps.customer.alerts.utils.services.notify_user')
-    def test_product_title_truncated_in_alert_notification_subject(self, mock_notify):
+    def test_product_title_truncated_in_alert_notification_subject(self):
         self.product.title = ('Aut nihil dignissimos perspiciatis. Beatae sed consequatur odit incidunt. '
                               'Quaerat labore perferendis quasi aut sunt maxime accusamus laborum. '
                               'Ut quam repudiandae occaecati eligendi. Nihil rem vel eos.')
@@ -107,12 +107,14 @@ class TestAUserWithAnActiveStockAlert(WebTest):
         self.stockrecord.num_in_stock = 10
         self.stockrecord.save()
 
-        mock_notify.assert_called_once_with(
-            self.user,
+        notification = self.user.notifications.get()
+        self.assertEqual(
             '{} is back in stock'.format(self.product.title[:200]),
-            body='<a href="{}">{}</a> is back in stock'.format(
-                self.product.get_absolute_url(), self.product.title)
-        )
+            notification.subject)
+        self.assertEqual(
+            '<a href="{}">{}</a> is back in stock'.format(
+                self.product.get_absolute_url(), self.product.title),
+            notification.body)
 
 
 class TestAnAnonymousUser(WebTest):
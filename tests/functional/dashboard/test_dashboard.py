@@ -1,11 +1,20 @@
+from datetime import timedelta
 from decimal import Decimal as D
 
+from django.core.management import call_command
+from django.test import TestCase
 from django.urls import reverse
+from django.utils.timezone import now
 
 from oscar.core import prices
+from oscar.apps.dashboard.stats import DashboardStats
 from oscar.apps.dashboard.views import IndexView
 from oscar.test.testcases import WebTestCase
-from oscar.test.factories import create_order
+from oscar.core.loading import get_model
+from oscar.test.factories import create_order, create_stockrecord
+
+Order = get_model('order', 'Order')
+StockAlert = get_model('partner', 'StockAlert')
 
 
 class TestDashboardIndexForAnonUser(WebTestCase):
@@ -70,3 +79,78 @@ class TestDashboardIndexForStaffUser(WebTestCase):
         self.assertInContext(response, 'total_lines')
         self.assertInContext(response, 'total_revenue')
         self.assertInContext(response, 'order_status_breakdown')
+
+    def test_stats_are_cached(self):
+        self.get(reverse('dashboard:index'))
+        create_order(total=prices.Price('GBP', excl_tax=D('34.05'),
+                                        tax=D('0.00')))
+        response = self.get(reverse('dashboard:index'))
+        self.assertEqual(response.context['total_orders'], 0)
+
+        call_command('oscar_refresh_dashboard_stats')
+        response = self.get(reverse('dashboard:index'))
+        self.assertEqual(response.context['total_orders'], 1)
+
+
+class TestDashboardStats(TestCase):
+
+    def test_computes_stats(self):
+        order = create_order(total=prices.Price('GBP', excl_tax=D('34.05'),
+                                                tax=D('0.00')))
+        create_order(total=prices.Price('GBP', excl_tax=D('21.90'),
+                                        tax=D('0.00')))
+        stats = DashboardStats().compute()
+
+        self.assertEqual(stats['total_orders'], 2)
+        self.assertEqual(stats['total_orders_last_day'], 2)
+        self.assertEqual(stats['total_lines'], 2)
+        self.assertEqual(stats['total_lines_last_day'], 2)
+        self.assertEqual(stats['total_revenue'], D('55.95'))
+        self.assertEqual(stats['total_revenue_last_day'], D('55.95'))
+        self.assertAlmostEqual(stats['average_order_costs'], 27.975)
+        self.assertEqual(
+            stats['hourly_report_dict']['order_total_hourly'][-1]['total_incl_tax'],
+            D('55.95'))
+        self.assertEqual(stats['order_status_breakdown'],
+                         [{'status': order.status, 'freq': 2}])
+
+    def test_older_orders_are_only_counted_in_totals(self):
+        order = create_order(total=prices.Price('GBP', excl_tax=D('34.05'),
+                                                tax=D('0.00')))
+        order.date_placed = now() - timedelta(days=2)
+        order.save()
+        stats = DashboardStats().compute()
+
+        self.assertEqual(stats['total_orders'], 1)
+        self.assertEqual(stats['total_orders_last_day'], 0)
+        self.assertEqual(stats['total_lines_last_day'], 0)
+        self.assertEqual(stats['total_revenue_last_day'], D('0.00'))
+        self.assertEqual(stats['hourly_report_dict']['max_revenue'], 0)
+
+    def test_last_day_stats_only_include_recent_orders(self):
+        create_order(total=prices.Price('GBP', excl_tax=D('10.00'),
+                                        tax=D('0.00')))
+        old_order = create_order(total=prices.Price(
+            'GBP', excl_tax=D('90.00'), tax=D('0.00')))
+        Order.objects.filter(pk=old_order.pk).update(
+            date_placed=now() - timedelta(days=2))
+        stats = DashboardStats().compute()
+
+        self.assertEqual(stats['total_orders'], 2)
+        self.assertEqual(stats['total_orders_last_day'], 1)
+        self.assertEqual(stats['total_lines_last_day'], 1)
+        self.assertEqual(stats['total_revenue'], D('100.00'))
+        self.assertEqual(stats['total_revenue_last_day'], D('10.00'))
+        self.assertEqual(stats['average_order_costs'], D('10.00'))
+
+    def test_counts_stock_alerts_by_status(self):
+        stockrecord = create_stockrecord()
+        StockAlert.objects.create(stockrecord=stockrecord, threshold=1)
+        StockAlert.objects.create(
+            stockrecord=stockrecord, threshold=1, status=StockAlert.CLOSED)
+        StockAlert.objects.create(
+            stockrecord=stockrecord, threshold=1, status=StockAlert.CLOSED)
+        stats = DashboardStats().compute()
+
+        self.assertEqual(stats['total_open_stock_alerts'], 1)
+        self.assertEqual(stats['total_closed_stock_alerts'], 2)
@@ -1,6 +1,8 @@
 from http import client as http_client
 
 from django.conf import settings
+from django.db import connection
+from django.test.utils import CaptureQueriesContext, override_settings
 from django.urls import reverse
 
 from oscar.core.loading import get_model
@@ -9,7 +11,8 @@ from oscar.apps.order.models import (
 from oscar.test.factories import PartnerFactory, ShippingAddressFactory
 from oscar.test.factories import create_order, create_basket
 from oscar.test.testcases import WebTestCase
-from oscar.test.factories import SourceTypeFactory
+from oscar.test.factories import (
+    SourceFactory, SourceTypeFactory, UserFactory)
 
 
 Basket = get_model('basket', 'Basket')
@@ -42,6 +45,26 @@ class TestOrderListDashboard(WebTestCase):
         form['order_number'] = '+'
         form.submit()
 
+    @override_settings(OSCAR_ANALYTICS_FLUSH_INTERVAL=3600)
+    def test_streams_csv_download_with_a_fixed_number_of_queries(self):
+        url = reverse('dashboard:order-list') + '?response_format=csv'
+        order = create_order(shipping_address=ShippingAddressFactory())
+        self.get(url)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.get(url)
+        num_queries = len(queries)
+
+        rows = response.text.splitlines()
+        self.assertEqual(len(rows), 2)
+        self.assertIn(str(order.number), rows[1])
+        self.assertIn(',1,', rows[1])
+
+        for __ in range(3):
+            create_order(shipping_address=ShippingAddressFactory())
+        with self.assertNumQueries(num_queries):
+            response = self.get(url)
+        self.assertEqual(len(response.text.splitlines()), 5)
+
 
 class PermissionBasedDashboardOrderTestsBase(WebTestCase):
     permissions = ['partner.dashboard_access', ]
@@ -134,6 +157,10 @@ class TestOrderListSearch(WebTestCase):
             {'name': 'Bob Smith'},
             ['Customer name matches "Bob Smith"']
         ),
+        (
+            {'email': 'bob@example.com'},
+            ['Customer email starts with "bob@example.com"']
+        ),
         (
             {'product_title': 'The Art of War'},
             ['Product name matches "The Art of War"']
@@ -215,6 +242,38 @@ class TestOrderListSearch(WebTestCase):
             self.assertEqual(applied_filters, expected_filters)
 
 
+class TestOrderListSearchResults(WebTestCase):
+    is_staff = True
+
+    def setUp(self):
+        super().setUp()
+        self.bob = create_order(user=UserFactory(
+            first_name='Bob', last_name='Smith', email='bob@example.com'))
+        self.alice = create_order(user=UserFactory(
+            first_name='Alice', last_name='Mary Jones'))
+        SourceFactory(order=self.alice,
+                      source_type=SourceTypeFactory(name='Visa', code='visa'))
+
+    def search(self, **params):
+        params.setdefault('order_number', '')
+        response = self.get(reverse('dashboard:order-list'), params=params)
+        return list(response.context['orders'])
+
+    def test_filters_by_customer_name(self):
+        self.assertEqual([self.bob], self.search(name='bob'))
+        self.assertEqual([self.alice], self.search(name='Alice Mary'))
+
+    def test_filters_by_customer_email(self):
+        self.assertEqual([self.bob], self.search(email='BOB@'))
+
+    def test_filters_by_payment_method(self):
+        self.assertEqual([self.alice], self.search(payment_method='visa'))
+
+    def test_filters_by_product_title(self):
+        title = self.bob.lines.get().title
+        self.assertEqual(2, len(self.search(product_title=title[:4])))
+
+
 class TestOrderDetailPage(WebTestCase):
     is_staff = True
 
@@ -1,6 +1,8 @@
-from django.contrib.messages.constants import SUCCESS, WARNING
+import os
+
+from django.contrib.messages.constants import INFO, SUCCESS, WARNING
 from django.urls import reverse
-from django.test import TestCase
+from django.test import TestCase, override_settings
 
 from oscar.apps.dashboard.ranges import forms
 from oscar.apps.offer.models import Range, RangeProductFileUpload
@@ -93,6 +95,21 @@ class RangeProductViewTest(WebTestCase):
         self.assertEqual(range_product_file_upload.status, RangeProductFileUpload.PROCESSED)
         self.assertEqual(range_product_file_upload.size, 3)
 
+    @override_settings(OSCAR_RANGE_UPLOAD_BACKGROUND_SIZE=2)
+    def test_large_files_are_left_for_background_processing(self):
+        range_products_page = self.get(self.url)
+        form = range_products_page.form
+        form['file_upload'] = Upload('new_skus.txt', b'456')
+        response = form.submit().follow()
+        messages = list(response.context['messages'])
+        self.assertEqual(1, len(messages))
+        self.assertEqual(INFO, messages[0].level)
+        self.assertEqual(0, len(self.range.all_products()))
+        upload = RangeProductFileUpload.objects.get()
+        self.assertEqual(RangeProductFileUpload.PENDING, upload.status)
+        self.assertTrue(os.path.exists(upload.filepath))
+        upload.delete_file()
+
     def test_dupe_skus_warning(self):
         self.range.add_product(self.product3)
         range_products_page = self.get(self.url)
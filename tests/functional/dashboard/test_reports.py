@@ -1,5 +1,8 @@
+import csv
+
 from django.urls import reverse
 
+from oscar.test.factories import create_basket, create_order
 from oscar.test.testcases import WebTestCase
 
 
@@ -39,3 +42,30 @@ class ReportsDashboardTests(WebTestCase):
         response.form['download'] = 'true'
         response.form.submit()
         self.assertIsOk(response)
+
+    def test_order_report_download_is_streamed(self):
+        order = create_order()
+        url = reverse('dashboard:reports-index')
+        response = self.get(url)
+
+        response.form['report_type'] = 'order_report'
+        response.form['download'] = 'true'
+        response = response.form.submit()
+        self.assertIsOk(response)
+        rows = response.text.splitlines()
+        self.assertEqual(len(rows), 2)
+        self.assertTrue(rows[1].startswith(str(order.number)))
+
+    def test_basket_report_downloads(self):
+        create_basket()
+        url = reverse('dashboard:reports-index')
+        response = self.get(url)
+
+        response.form['report_type'] = 'open_baskets'
+        response.form['download'] = 'true'
+        response = response.form.submit()
+        self.assertIsOk(response)
+        rows = list(csv.reader(response.text.splitlines()))
+        self.assertEqual(len(rows), 2)
+        # Number of lines and items
+        self.assertEqual(rows[1][4:6], ['1', '1'])
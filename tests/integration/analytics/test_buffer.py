@@ -0,0 +1,141 @@
+from unittest import mock
+
+from django.db import DatabaseError
+from django.test import TestCase, override_settings
+
+from oscar.apps.analytics.buffer import EventBuffer
+from oscar.core.loading import get_model
+from oscar.test.factories import (
+    ProductFactory, UserFactory, create_order, create_product)
+
+ProductRecord = get_model('analytics', 'ProductRecord')
+UserRecord = get_model('analytics', 'UserRecord')
+UserProductView = get_model('analytics', 'UserProductView')
+UserSearch = get_model('analytics', 'UserSearch')
+
+
+class TestEventBuffer(TestCase):
+
+    def setUp(self):
+        self.buffer = EventBuffer()
+        self.product = ProductFactory()
+        self.user = UserFactory()
+
+    def test_does_not_write_events_until_flushed(self):
+        self.buffer.record_product_view(self.product, self.user)
+        self.assertFalse(ProductRecord.objects.exists())
+        self.assertFalse(UserProductView.objects.exists())
+
+        self.buffer.flush()
+        self.assertEqual(1, ProductRecord.objects.get().num_views)
+        self.assertEqual(1, UserRecord.objects.get().num_product_views)
+        self.assertEqual(1, UserProductView.objects.count())
+
+    def test_aggregates_events_for_the_same_product(self):
+        for __ in range(5):
+            self.buffer.record_product_view(self.product)
+        self.buffer.record_basket_addition(self.product)
+        self.buffer.flush()
+
+        record = ProductRecord.objects.get(product=self.product)
+        self.assertEqual(5, record.num_views)
+        self.assertEqual(1, record.num_basket_additions)
+
+    def test_increments_existing_records(self):
+        ProductRecord.objects.create(product=self.product, num_views=10)
+        other_product = ProductFactory()
+        ProductRecord.objects.create(product=other_product, num_views=3)
+
+        self.buffer.record_product_view(self.product)
+        self.buffer.record_product_view(other_product)
+        # One query to find the existing records and one to update both
+        with self.assertNumQueries(2):
+            self.buffer.update_records(
+                ProductRecord, 'product_id', self.buffer.product_counters)
+
+        self.assertEqual(
+            11, ProductRecord.objects.get(product=self.product).num_views)
+        self.assertEqual(
+            4, ProductRecord.objects.get(product=other_product).num_views)
+
+    def test_records_orders(self):
+        order = create_order(user=self.user)
+        self.buffer.record_order(order, self.user)
+        self.buffer.flush()
+
+        user_record = UserRecord.objects.get(user=self.user)
+        self.assertEqual(1, user_record.num_orders)
+        self.assertEqual(order.num_items, user_record.num_order_items)
+        self.assertEqual(order.total_incl_tax, user_record.total_spent)
+        self.assertEqual(order.date_placed, user_record.date_last_order)
+        product_record = ProductRecord.objects.get(
+            product=order.lines.get().product)
+        self.assertEqual(order.num_items, product_record.num_purchases)
+
+    def test_records_searches(self):
+        self.buffer.record_search('oscar', self.user)
+        self.buffer.flush()
+        self.assertEqual('oscar', UserSearch.objects.get().query)
+
+    @override_settings(OSCAR_ANALYTICS_BUFFER_SIZE=2)
+    def test_flushes_when_full(self):
+        self.buffer.record_product_view(self.product)
+        self.assertFalse(ProductRecord.objects.exists())
+        self.buffer.record_product_view(self.product)
+        self.assertEqual(2, ProductRecord.objects.get().num_views)
+
+    def test_keeps_events_if_writing_them_fails(self):
+        self.buffer.record_product_view(self.product, self.user)
+        self.buffer.record_search('oscar', self.user)
+        with mock.patch.object(UserSearch._default_manager, 'bulk_create',
+                               side_effect=DatabaseError):
+            self.buffer.flush()
+        self.assertFalse(ProductRecord.objects.exists())
+        self.assertEqual(2, self.buffer.num_items)
+
+        self.buffer.record_product_view(self.product)
+        self.buffer.flush()
+        self.assertEqual(2, ProductRecord.objects.get().num_views)
+        self.assertEqual(1, UserProductView.objects.count())
+        self.assertEqual(1, UserSearch.objects.count())
+
+    def test_drops_events_after_repeated_failures(self):
+        self.buffer.record_search('oscar', self.user)
+        with mock.patch.object(UserSearch._default_manager, 'bulk_create',
+                               side_effect=DatabaseError) as bulk_create:
+            for __ in range(self.buffer.max_retries + 1):
+                self.buffer.flush()
+        self.assertEqual(self.buffer.max_retries + 1, bulk_create.call_count)
+        self.assertEqual(0, self.buffer.num_items)
+
+        self.buffer.record_search('django', self.user)
+        self.buffer.flush()
+        self.assertEqual(['django'], list(
+            UserSearch.objects.values_list('query', flat=True)))
+
+    @override_settings(OSCAR_ANALYTICS_BUFFER_SIZE=2)
+    def test_is_not_flushed_when_full_after_a_failure(self):
+        self.buffer.record_search('oscar', self.user)
+        with mock.patch.object(UserSearch._default_manager, 'bulk_create',
+                               side_effect=DatabaseError):
+            self.buffer.flush()
+        with self.assertNumQueries(0):
+            self.buffer.record_search('django', self.user)
+            self.buffer.record_search('haystack', self.user)
+        self.assertEqual(3, self.buffer.num_items)
+
+        self.buffer.flush()
+        self.assertEqual(3, UserSearch.objects.count())
+        self.assertEqual(0, self.buffer.num_items)
+
+    def test_empty_flush_does_not_query(self):
+        with self.assertNumQueries(0):
+            self.buffer.flush()
+
+
+class TestEventsOfARequest(TestCase):
+
+    def test_are_written_once_the_request_has_finished(self):
+        product = create_product()
+        self.client.get(product.get_absolute_url())
+        self.assertEqual(1, ProductRecord.objects.get(product=product).num_views)
@@ -1,9 +1,14 @@
+from decimal import Decimal as D
+from unittest import mock
+
 from django.http import HttpResponse
-from django.test import TestCase
+from django.test import TestCase, override_settings
 from django.test.client import RequestFactory
 from django.contrib.auth.models import AnonymousUser
 
-from oscar.apps.basket import middleware
+from oscar.apps.basket import middleware, receivers
+from oscar.apps.basket.models import Basket, Line, LineAttribute
+from oscar.test import factories
 
 
 class TestBasketMiddleware(TestCase):
@@ -37,3 +42,195 @@ class TestBasketMiddleware(TestCase):
 
         self.assertEqual(None, cookie_basket)
         self.assertIn("oscar_open_basket", request.cookies_to_delete)
+
+
+@override_settings(OSCAR_BASKET_SNAPSHOT_TIMEOUT=300)
+class TestBasketSnapshots(TestCase):
+
+    def setUp(self):
+        self.user = factories.UserFactory()
+        self.basket = Basket.objects.create(owner=self.user)
+        self.basket.strategy = factories.Default()
+        self.product = factories.create_product(price=D('10.00'),
+                                                num_in_stock=10)
+        self.basket.add_product(self.product, quantity=2)
+        self.offer = factories.create_offer()
+
+    def get_request_basket(self):
+        request = RequestFactory().get('/')
+        request.user = self.user
+        basket_middleware = middleware.BasketMiddleware(
+            lambda request: HttpResponse())
+        basket_middleware(request)
+        return request.basket
+
+    def assert_applies_offers(self, applies=True):
+        apply = middleware.Applicator.apply
+        with mock.patch.object(middleware.Applicator, 'apply', autospec=True,
+                               side_effect=apply) as mocked_apply:
+            basket = self.get_request_basket()
+            basket.total_incl_tax
+        self.assertEqual(applies, mocked_apply.called)
+        return basket
+
+    def test_restores_unchanged_basket_without_applying_offers(self):
+        expected = self.assert_applies_offers()
+        basket = self.assert_applies_offers(False)
+
+        self.assertEqual(D('16.00'), basket.total_incl_tax)
+        self.assertEqual(expected.total_discount, basket.total_discount)
+        self.assertEqual(
+            [(a['offer'].pk, a['discount'], a['freq'])
+             for a in expected.offer_applications],
+            [(a['offer'].pk, a['discount'], a['freq'])
+             for a in basket.offer_applications])
+        line = basket.all_lines()[0]
+        self.assertEqual(2, line.quantity_with_discount)
+        self.assertFalse(line.is_available_for_offer_discount(self.offer))
+
+    def test_is_invalidated_when_lines_change(self):
+        self.assert_applies_offers()
+        self.basket.add_product(self.product)
+        basket = self.assert_applies_offers()
+        self.assertEqual(D('24.00'), basket.total_incl_tax)
+
+    def test_is_invalidated_when_offers_change(self):
+        self.assert_applies_offers()
+        self.offer.status = self.offer.SUSPENDED
+        self.offer.save()
+        basket = self.assert_applies_offers()
+        self.assertEqual(D('20.00'), basket.total_incl_tax)
+
+    def test_is_invalidated_when_stock_records_change(self):
+        self.assert_applies_offers()
+        stockrecord = self.product.stockrecords.get()
+        stockrecord.price_excl_tax = D('5.00')
+        stockrecord.save()
+        basket = self.assert_applies_offers()
+        self.assertEqual(D('8.00'), basket.total_incl_tax)
+
+    def test_is_kept_when_stock_is_allocated(self):
+        self.assert_applies_offers()
+        self.product.stockrecords.get().allocate(2)
+        self.assert_applies_offers(False)
+
+    @override_settings(OSCAR_BASKET_SNAPSHOT_TIMEOUT=0)
+    def test_can_be_disabled(self):
+        self.assert_applies_offers()
+        self.assert_applies_offers()
+
+
+@override_settings(OSCAR_BASKET_SUMMARY_TIMEOUT=300)
+class TestBasketSummary(TestCase):
+
+    def setUp(self):
+        self.user = factories.UserFactory()
+        self.product = factories.create_product(price=D('10.00'),
+                                                num_in_stock=10)
+
+    def get_request(self, user=None, cookies=None):
+        request_factory = RequestFactory()
+        for key, value in (cookies or {}).items():
+            request_factory.cookies[key] = value
+        request = request_factory.get('/')
+        request.user = user or AnonymousUser()
+        basket_middleware = middleware.BasketMiddleware(
+            lambda request: HttpResponse())
+        basket_middleware(request)
+        return request
+
+    def add_product(self, basket, quantity=1):
+        basket.strategy = factories.Default()
+        basket.add_product(self.product, quantity=quantity)
+
+    def test_is_empty_for_anonymous_users_without_a_basket(self):
+        request = self.get_request()
+        with self.assertNumQueries(0):
+            summary = request.basket_summary
+            self.assertTrue(summary.is_empty)
+            self.assertEqual(0, summary.num_items)
+
+    def test_is_cached_for_users(self):
+        basket = Basket.objects.create(owner=self.user)
+        self.add_product(basket, quantity=2)
+        self.get_request(self.user).basket.total_incl_tax
+
+        request = self.get_request(self.user)
+        with self.assertNumQueries(0):
+            summary = request.basket_summary
+            self.assertFalse(summary.is_empty)
+            self.assertEqual(basket.id, summary.basket_id)
+            self.assertEqual(1, summary.num_lines)
+            self.assertEqual(2, summary.num_items)
+            self.assertEqual(D('20.00'), summary.total_incl_tax)
+            self.assertEqual('GBP', summary.currency)
+
+    def test_is_cached_for_anonymous_baskets(self):
+        basket = Basket.objects.create()
+        self.add_product(basket)
+        cookies = {'oscar_open_basket': middleware.BasketMiddleware(
+            None).get_basket_hash(basket.id)}
+        self.get_request(cookies=cookies).basket.total_incl_tax
+
+        request = self.get_request(cookies=cookies)
+        with self.assertNumQueries(0):
+            self.assertEqual(1, request.basket_summary.num_items)
+
+    def test_is_invalidated_when_lines_change(self):
+        basket = Basket.objects.create(owner=self.user)
+        self.add_product(basket)
+        self.get_request(self.user).basket_summary.num_items
+        self.add_product(basket, quantity=2)
+
+        summary = self.get_request(self.user).basket_summary
+        self.assertEqual(3, summary.num_items)
+        self.assertEqual(D('30.00'), summary.total_incl_tax)
+
+        basket.flush()
+        self.assertTrue(self.get_request(self.user).basket_summary.is_empty)
+
+    def test_is_invalidated_when_the_basket_is_submitted(self):
+        basket = Basket.objects.create(owner=self.user)
+        self.add_product(basket)
+        self.get_request(self.user).basket_summary.num_items
+        basket.submit()
+
+        summary = self.get_request(self.user).basket_summary
+        self.assertTrue(summary.is_empty)
+        self.assertNotEqual(basket.id, summary.basket_id)
+
+    def test_is_invalidated_when_offers_change(self):
+        basket = Basket.objects.create(owner=self.user)
+        self.add_product(basket, quantity=2)
+        self.get_request(self.user).basket_summary.num_items
+        factories.create_offer()
+
+        summary = self.get_request(self.user).basket_summary
+        self.assertEqual(D('16.00'), summary.total_incl_tax)
+
+    def test_uses_the_loaded_basket(self):
+        request = self.get_request(self.user)
+        request.basket.num_items
+        self.add_product(request.basket)
+        self.assertEqual(1, request.basket_summary.num_items)
+
+    @override_settings(OSCAR_BASKET_SUMMARY_TIMEOUT=0)
+    def test_can_be_disabled(self):
+        basket = Basket.objects.create(owner=self.user)
+        self.add_product(basket)
+        self.get_request(self.user).basket_summary.num_items
+
+        request = self.get_request(self.user)
+        self.assertEqual(1, request.basket_summary.num_items)
+        self.assertTrue(request.basket._wrapped is not middleware.empty)
+
+    @override_settings(OSCAR_BASKET_SUMMARY_TIMEOUT=0)
+    def test_invalidation_does_not_load_the_basket_when_disabled(self):
+        basket = Basket.objects.create(owner=self.user)
+        self.add_product(basket)
+        line = Line.objects.get(basket=basket)
+        with self.assertNumQueries(0):
+            receivers.invalidate_basket_summaries_for_line(
+                sender=Line, instance=line)
+            receivers.invalidate_basket_summaries_for_line_attribute(
+                sender=LineAttribute, instance=LineAttribute(line_id=line.id))
@@ -88,3 +88,23 @@ class TestLineOfferConsumer(object):
         line2.consumer.consume(99, offer2)
         assert line2.is_available_for_offer_discount(offer1) is False
         assert line2.is_available_for_offer_discount(offer3) is True
+
+    def test_state_can_be_restored(self, filled_basket):
+        offer1 = ConditionalOfferFactory(name='offer1')
+        offer2 = ConditionalOfferFactory(name='offer2')
+        offer1.exclusive = False
+        offer2.exclusive = False
+
+        line1, line2 = filled_basket.all_lines()
+        line1.consumer.consume(3, offer1)
+        line1.consumer.consume(2, offer2)
+        assert line1.consumer.get_state() == (
+            5, {offer1.pk: 3, offer2.pk: 2})
+
+        affected_quantity, consumptions = line1.consumer.get_state()
+        line2.consumer.set_state(affected_quantity, {
+            offer1: consumptions[offer1.pk],
+            offer2: consumptions[offer2.pk]})
+        assert line2.consumer.consumed() == 5
+        assert line2.consumer.consumed(offer1) == 3
+        assert line2.consumer.available(offer2) == 18
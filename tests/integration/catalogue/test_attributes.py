@@ -4,6 +4,9 @@ from django.test import TestCase
 from django.core.exceptions import ValidationError
 from django.core.files.uploadedfile import SimpleUploadedFile
 
+from oscar.apps.catalogue.models import Product, ProductAttribute
+from oscar.apps.catalogue.product_attributes import (
+    prefetch_product_attributes)
 from oscar.test import factories
 
 
@@ -154,3 +157,65 @@ class TestFileAttributes(TestCase):
     def test_validate_file_values(self):
         file_field = SimpleUploadedFile('test_file.txt', b'Test')
         self.assertIsNone(self.attr.validate_value(file_field))
+
+
+class TestProductClassAttributeCache(TestCase):
+
+    def setUp(self):
+        self.product = factories.create_product(
+            attributes={'weight': '3', 'colour': 'red'})
+
+    def test_caches_attributes_of_product_class(self):
+        self.product.attr.get_all_attributes()
+        with self.assertNumQueries(0):
+            attributes = self.product.attr.get_all_attributes()
+            self.assertEqual(
+                ['colour', 'weight'], [a.code for a in attributes])
+            self.assertEqual(
+                'weight', self.product.attr.get_attribute_by_code('weight').code)
+
+    def test_raises_does_not_exist_for_unknown_code(self):
+        with self.assertRaises(ProductAttribute.DoesNotExist):
+            self.product.attr.get_attribute_by_code('size')
+
+    def test_is_invalidated_when_attributes_change(self):
+        self.product.attr.get_all_attributes()
+        factories.ProductAttributeFactory(
+            product_class=self.product.product_class, code='size')
+        codes = [a.code for a in self.product.attr.get_all_attributes()]
+        self.assertIn('size', codes)
+
+        ProductAttribute.objects.get(code='colour').delete()
+        codes = [a.code for a in self.product.attr.get_all_attributes()]
+        self.assertNotIn('colour', codes)
+
+    def test_validates_without_querying_attributes_again(self):
+        product = Product.objects.get(pk=self.product.pk)
+        product.attr.initiate_attributes()
+        product.attr.get_all_attributes()
+        product.attr.weight = '4'
+        with self.assertNumQueries(0):
+            product.attr.validate_attributes()
+            product.attr.validate_attributes()
+
+
+class TestPrefetchProductAttributes(TestCase):
+
+    def test_initialises_containers_of_products_and_parents(self):
+        parent = factories.create_product(
+            structure='parent', attributes={'weight': '5'})
+        child = factories.create_product(parent=parent)
+        products = [
+            factories.create_product(attributes={'weight': str(weight)})
+            for weight in range(1, 4)]
+        products = list(Product.objects.filter(
+            pk__in=[p.pk for p in products + [child]]).order_by('pk'))
+
+        # Parents and attribute values
+        with self.assertNumQueries(2):
+            prefetch_product_attributes(products)
+        with self.assertNumQueries(0):
+            self.assertEqual(
+                ['1', '2', '3'], [p.attr.weight for p in products[1:]])
+            self.assertEqual('5', products[0].parent.attr.weight)
+        self.assertFalse(hasattr(products[0].attr, 'weight'))
@@ -1,11 +1,15 @@
 # -*- coding: utf-8 -*-
+from unittest import mock
+
 from django.core.cache import cache
+from django.db import connection
 from django.test import TestCase
 from django.test.utils import override_settings
 
 from oscar.apps.catalogue.models import Category
 from oscar.apps.catalogue.categories import create_from_breadcrumbs
 from oscar.templatetags.category_tags import get_annotated_list
+from tests.utils import count_query_params
 
 
 class TestCategory(TestCase):
@@ -96,6 +100,63 @@ class TestMovingACategory(TestCase):
                          gothic.full_name)
 
 
+class TestCategoryAncestorData(TestCase):
+
+    def setUp(self):
+        self.teen = create_from_breadcrumbs('Books > Fiction > Horror > Teen')
+        self.books = Category.objects.get(name='Books')
+        self.fiction = Category.objects.get(name='Fiction')
+        self.horror = Category.objects.get(name='Horror')
+
+    def test_stores_ancestor_ids(self):
+        teen = Category.objects.get(pk=self.teen.pk)
+        self.assertEqual(
+            [self.books.pk, self.fiction.pk, self.horror.pk],
+            teen.get_ancestor_ids())
+        self.assertEqual([], self.books.get_ancestor_ids())
+
+    def test_reading_full_name_and_slug_does_not_query_ancestors(self):
+        teen = Category.objects.get(pk=self.teen.pk)
+        with self.assertNumQueries(0):
+            self.assertEqual('Books > Fiction > Horror > Teen', teen.full_name)
+            self.assertEqual('books/fiction/horror/teen', teen.full_slug)
+
+    def test_renaming_updates_descendants(self):
+        fiction = Category.objects.get(pk=self.fiction.pk)
+        fiction.name = 'Novels'
+        fiction.slug = 'novels'
+        fiction.save()
+
+        teen = Category.objects.get(pk=self.teen.pk)
+        self.assertEqual('Books > Novels > Horror > Teen', teen.full_name)
+        self.assertEqual('books/novels/horror/teen', teen.full_slug)
+
+    def test_updates_large_subtrees_in_batches(self):
+        horror = Category.objects.get(pk=self.horror.pk)
+        for i in range(20):
+            horror.add_child(name='Horror %d' % i)
+        fiction = Category.objects.get(pk=self.fiction.pk)
+        fiction.name = 'Novels'
+        # Each category needs 7 parameters, so 5 of them fit into a query
+        with mock.patch.object(connection.features, 'max_query_params', 35):
+            with count_query_params() as param_counts:
+                fiction.save()
+
+        self.assertLessEqual(max(param_counts), 35)
+        self.assertEqual(23, Category.objects.filter(
+            full_name__startswith='Books > Novels').count())
+
+    def test_moving_updates_ancestor_ids_of_subtree(self):
+        comics = Category.add_root(name='Comics')
+        horror = Category.objects.get(pk=self.horror.pk)
+        horror.move(comics, 'last-child')
+        self.assertEqual('Comics > Horror', horror.full_name)
+
+        teen = Category.objects.get(pk=self.teen.pk)
+        self.assertEqual([comics.pk, self.horror.pk], teen.get_ancestor_ids())
+        self.assertEqual('comics/horror/teen', teen.full_slug)
+
+
 class TestCategoryFactory(TestCase):
 
     def test_can_create_single_level_category(self):
@@ -259,3 +320,38 @@ class TestCategoryTemplateTags(TestCase):
         actual_categories = self.get_category_names(depth=1, parent=parent)
         expected_categories = {'Horror', 'Comedy'}
         self.assertEqual(expected_categories, actual_categories)
+
+    def test_does_not_query_the_database_once_cached(self):
+        get_annotated_list()
+        parent = Category.objects.get(name="Fiction")
+        with self.assertNumQueries(0):
+            annotated_list = get_annotated_list()
+            get_annotated_list(depth=1, parent=parent)
+            urls = [category.get_absolute_url()
+                    for category, __ in annotated_list]
+        self.assertIn(parent.get_absolute_url(), urls)
+
+    def test_annotations_match_treebeard(self):
+        expected = Category.get_annotated_list()
+        actual = get_annotated_list()
+        self.assertEqual(
+            [(category.pk, info['level']) for category, info in expected],
+            [(category.pk, info['level']) for category, info in actual])
+
+    def test_is_invalidated_when_categories_change(self):
+        self.assertNotIn('Thriller', self.get_category_names())
+        fiction = Category.objects.get(name="Fiction")
+        thriller = fiction.add_child(name='Thriller')
+        self.assertIn('Thriller', self.get_category_names())
+
+        thriller.name = 'Crime'
+        thriller.save()
+        self.assertIn('Crime', self.get_category_names())
+
+        non_fiction = Category.objects.get(name="Non-fiction")
+        Category.objects.get(name='Crime').move(non_fiction, 'last-child')
+        self.assertIn('Crime', self.get_category_names(parent=non_fiction))
+        self.assertNotIn('Crime', self.get_category_names(parent=fiction))
+
+        Category.objects.get(name='Crime').delete()
+        self.assertNotIn('Crime', self.get_category_names())
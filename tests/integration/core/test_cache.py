@@ -0,0 +1,44 @@
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import TestCase
+
+from oscar.core.cache import (
+    bump_version, delete_on_commit, get_version, get_versions)
+
+
+class TestVersions(TestCase):
+
+    def test_are_created_when_missing(self):
+        version = get_version('version-a')
+        self.assertEqual(cache.get('version-a'), version)
+        self.assertEqual(get_version('version-a'), version)
+
+    def test_are_fetched_together(self):
+        cache.set('version-a', 'a', None)
+        versions = get_versions(['version-a', 'version-b'])
+        self.assertEqual(versions['version-a'], 'a')
+        self.assertEqual(cache.get('version-b'), versions['version-b'])
+
+    def test_are_bumped_now_and_on_commit(self):
+        version = get_version('version-a')
+        with mock.patch('django.db.transaction.on_commit') as on_commit:
+            bump_version('version-a')
+        bumped = get_version('version-a')
+        self.assertNotEqual(bumped, version)
+
+        on_commit.call_args[0][0]()
+        self.assertNotEqual(get_version('version-a'), bumped)
+
+
+class TestDeleteOnCommit(TestCase):
+
+    def test_deletes_now_and_on_commit(self):
+        cache.set('entry', 1)
+        with mock.patch('django.db.transaction.on_commit') as on_commit:
+            delete_on_commit(['entry'])
+        self.assertIsNone(cache.get('entry'))
+
+        cache.set('entry', 1)
+        on_commit.call_args[0][0]()
+        self.assertIsNone(cache.get('entry'))
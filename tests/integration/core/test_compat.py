@@ -6,9 +6,17 @@ import os
 from tempfile import NamedTemporaryFile
 from django.utils.encoding import smart_text
 
+from unittest import mock
+
+from django.db import connection
 from django.test import TestCase, override_settings
 
-from oscar.core.compat import UnicodeCSVWriter, existing_user_fields
+from oscar.core.compat import (
+    UnicodeCSVWriter, bulk_update, existing_user_fields, queryset_iterator)
+from oscar.core.loading import get_model
+from tests.utils import count_query_params
+
+ProductClass = get_model('catalogue', 'ProductClass')
 
 
 class unicodeobj(object):
@@ -99,3 +107,46 @@ class TestUnicodeCSVWriter(TestCase):
 
         # Clean up
         os.unlink(csv_file.name)
+
+
+class TestQuerysetIterator(TestCase):
+
+    def test_passes_the_chunk_size_on_django_2(self):
+        queryset = mock.Mock()
+        with mock.patch('django.VERSION', (2, 0, 0, 'final', 0)):
+            queryset_iterator(queryset, chunk_size=10)
+        queryset.iterator.assert_called_once_with(chunk_size=10)
+
+    def test_does_not_pass_the_chunk_size_on_django_1_11(self):
+        queryset = mock.Mock()
+        with mock.patch('django.VERSION', (1, 11, 29, 'final', 0)):
+            queryset_iterator(queryset, chunk_size=10)
+        queryset.iterator.assert_called_once_with()
+
+
+class TestBulkUpdate(TestCase):
+
+    def setUp(self):
+        ProductClass.objects.bulk_create([
+            ProductClass(name='Class %d' % i, slug='class-%d' % i)
+            for i in range(10)])
+        self.product_classes = list(ProductClass.objects.all())
+
+    def test_updates_all_instances(self):
+        for product_class in self.product_classes:
+            product_class.name = product_class.name.upper()
+            product_class.track_stock = False
+        bulk_update(ProductClass, self.product_classes,
+                    ['name', 'track_stock'])
+
+        for product_class in ProductClass.objects.all():
+            self.assertTrue(product_class.name.startswith('CLASS'))
+            self.assertFalse(product_class.track_stock)
+
+    def test_stays_within_the_query_parameter_limit(self):
+        fields = ['name', 'requires_shipping', 'track_stock']
+        with mock.patch.object(connection.features, 'max_query_params', 20):
+            with count_query_params() as param_counts:
+                bulk_update(ProductClass, self.product_classes, fields)
+        # Each instance needs 7 parameters, so 2 of them fit into a query
+        self.assertEqual([14] * 5, param_counts)
@@ -1,13 +1,17 @@
+from io import StringIO
 from os.path import dirname
+from unittest import mock
 import sys
+import warnings
 
+from django.core.management import call_command
 from django.test import override_settings, TestCase
 from django.conf import settings
 
 import oscar
 from oscar.core.loading import (
     get_model, AppNotFoundError, get_classes, get_class, get_class_loader,
-    ClassNotFoundError)
+    ClassNotFoundError, default_class_loader)
 from oscar.test.factories import create_product, WishListFactory, UserFactory
 from tests import temporary_python_path
 from tests._site.loader import DummyClass
@@ -258,3 +262,47 @@ class OverriddenClassLoadingTestCase(TestCase):
 
         # Clear lru cache for the class loader again
         get_class_loader.cache_clear()
+
+
+@override_settings(OSCAR_DYNAMIC_CLASS_LOADER='oscar.core.loading.default_class_loader')
+class TestClassRegistry(TestCase):
+
+    def test_resolves_classes_once(self):
+        loader = mock.Mock(wraps=default_class_loader)
+        with mock.patch('oscar.core.loading.get_class_loader', return_value=loader):
+            Product = get_class('catalogue.models', 'Product')
+            self.assertEqual(
+                [Product], get_classes('catalogue.models', ['Product']))
+        self.assertEqual(1, loader.call_count)
+
+    def test_is_cleared_when_installed_apps_change(self):
+        self.assertEqual(
+            'oscar.apps.shipping.methods', get_class('shipping.methods', 'Free').__module__)
+        installed_apps = list(settings.INSTALLED_APPS)
+        installed_apps[installed_apps.index('oscar.apps.shipping')] = 'tests._site.shipping'
+        with override_settings(INSTALLED_APPS=installed_apps):
+            self.assertEqual(
+                'tests._site.shipping.methods', get_class('shipping.methods', 'Free').__module__)
+        self.assertEqual(
+            'oscar.apps.shipping.methods', get_class('shipping.methods', 'Free').__module__)
+
+    def test_warns_about_moved_classes_every_time(self):
+        for i in range(2):
+            with warnings.catch_warnings(record=True) as caught:
+                warnings.simplefilter('always')
+                get_class('basket.forms', 'BaseBasketLineFormSet')
+            self.assertEqual(1, len(caught))
+
+    def test_management_command_shows_overridden_classes(self):
+        get_class('catalogue.models', 'Product')
+        installed_apps = list(settings.INSTALLED_APPS)
+        installed_apps[installed_apps.index('oscar.apps.shipping')] = 'tests._site.shipping'
+        out = StringIO()
+        with override_settings(INSTALLED_APPS=installed_apps):
+            get_class('shipping.methods', 'Free')
+            call_command('oscar_dump_class_registry', '--benchmark', stdout=out)
+        output = out.getvalue()
+        self.assertIn(
+            '* shipping.methods.Free -> tests._site.shipping.methods.Free', output)
+        self.assertNotIn('catalogue.models.Product ', output)
+        self.assertIn('with the class registry', output)
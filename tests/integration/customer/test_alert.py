@@ -1,6 +1,15 @@
+from smtplib import SMTPException
+from unittest import mock
+
+from django.contrib.sites.models import Site
+from django.core import mail
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
 
-from oscar.apps.customer.models import ProductAlert
+from oscar.apps.customer.alerts.utils import AlertSender
+from oscar.apps.customer.models import Notification, ProductAlert
+from oscar.apps.customer.utils import Dispatcher
 from oscar.core.compat import get_user_model
 from oscar.test.factories import create_product
 from oscar.test.factories import UserFactory
@@ -19,3 +28,91 @@ class TestAnAlertForARegisteredUser(TestCase):
 
     def test_defaults_to_active(self):
         self.assertTrue(self.alert.is_active)
+
+
+class TestAlertSender(TestCase):
+
+    def setUp(self):
+        self.product = create_product(num_in_stock=10)
+        self.other_product = create_product(num_in_stock=10)
+        self.users = [UserFactory() for i in range(3)]
+        for user in self.users:
+            ProductAlert.objects.create(user=user, product=self.product)
+        for i in range(2):
+            self.create_anonymous_alert(
+                'anon%d@example.com' % i, self.other_product)
+
+    def create_anonymous_alert(self, email, product):
+        alert = ProductAlert.objects.create(email=email, product=product)
+        alert.confirm()
+
+    def test_sends_alerts_of_all_products_in_chunks(self):
+        AlertSender(chunk_size=2).send_all()
+
+        self.assertEqual(5, len(mail.outbox))
+        self.assertFalse(
+            ProductAlert.objects.filter(status=ProductAlert.ACTIVE).exists())
+        self.assertEqual(
+            3, Notification.objects.filter(recipient__in=self.users).count())
+        self.assertEqual(
+            5, ProductAlert.objects.filter(date_closed__isnull=False).count())
+
+    def test_number_of_queries_does_not_depend_on_the_number_of_alerts(self):
+        ProductAlert.objects.filter(user__isnull=False).delete()
+        # Make sure the current site is cached
+        Site.objects.get_current()
+        with CaptureQueriesContext(connection) as few_alerts:
+            AlertSender().send_all()
+
+        ProductAlert.objects.update(status=ProductAlert.ACTIVE)
+        for i in range(10):
+            self.create_anonymous_alert(
+                'other%d@example.com' % i, self.product)
+        with CaptureQueriesContext(connection) as many_alerts:
+            AlertSender().send_all()
+
+        self.assertEqual(12, ProductAlert.objects.filter(
+            status=ProductAlert.CLOSED).count())
+        self.assertEqual(len(few_alerts), len(many_alerts))
+
+    def test_does_not_connect_to_the_mail_server_without_alerts(self):
+        ProductAlert.objects.update(status=ProductAlert.CLOSED)
+        stockrecord = self.product.stockrecords.get()
+        with mock.patch.object(mail, 'get_connection') as get_connection:
+            stockrecord.num_in_stock = 20
+            stockrecord.save()
+            AlertSender().send_all()
+        self.assertFalse(get_connection.called)
+
+    def test_does_not_close_alerts_of_unavailable_products(self):
+        self.product.stockrecords.update(num_in_stock=0)
+        AlertSender().send_all()
+
+        self.assertEqual(2, len(mail.outbox))
+        self.assertEqual(3, ProductAlert.objects.filter(
+            product=self.product, status=ProductAlert.ACTIVE).count())
+
+    def test_resumes_after_a_failure(self):
+        dispatch = Dispatcher.dispatch_user_messages
+        calls = []
+
+        def fail_on_second_call(dispatcher, user, messages):
+            calls.append(user)
+            if len(calls) == 2:
+                raise SMTPException()
+            return dispatch(dispatcher, user, messages)
+
+        with mock.patch.object(Dispatcher, 'dispatch_user_messages',
+                               fail_on_second_call):
+            with self.assertRaises(SMTPException):
+                AlertSender().send_all()
+        self.assertEqual(1, len(mail.outbox))
+        self.assertEqual(
+            [self.users[0].pk],
+            list(ProductAlert.objects.filter(status=ProductAlert.CLOSED)
+                 .values_list('user_id', flat=True)))
+
+        AlertSender().send_all()
+        self.assertEqual(5, len(mail.outbox))
+        self.assertFalse(
+            ProductAlert.objects.filter(status=ProductAlert.ACTIVE).exists())
@@ -1,4 +1,5 @@
 from django.test import TestCase
+from django.utils import timezone
 
 from oscar.apps.customer.models import Notification
 from oscar.apps.customer.notifications import services
@@ -56,3 +57,42 @@ class NotificationServiceTestCase(TestCase):
             user_notification = Notification.objects.get(recipient=user)
             self.assertEqual(user_notification.subject, subj)
             self.assertEqual(user_notification.body, body)
+
+    def test_notify_a_queryset_of_users_in_batches(self):
+        UserFactory.create_batch(5)
+        with self.assertNumQueries(3):
+            services.notify_users(
+                User.objects.all(), "Hello everyone!", batch_size=3)
+        self.assertEqual(5, Notification.objects.count())
+
+
+class TestUnreadCount(TestCase):
+
+    def setUp(self):
+        self.user = UserFactory()
+        services.notify_users([self.user], "Hello")
+
+    def test_is_cached(self):
+        self.assertEqual(1, services.get_unread_count(self.user))
+        with self.assertNumQueries(0):
+            self.assertEqual(1, services.get_unread_count(self.user))
+
+    def test_is_updated_when_notifications_are_created(self):
+        services.get_unread_count(self.user)
+        services.notify_user(self.user, "Hello again")
+        self.assertEqual(2, services.get_unread_count(self.user))
+        services.notify_users([self.user], "Hello in bulk")
+        self.assertEqual(3, services.get_unread_count(self.user))
+
+    def test_is_updated_when_notifications_are_read_or_deleted(self):
+        services.get_unread_count(self.user)
+        notification = Notification.objects.get()
+        notification.date_read = timezone.now()
+        notification.save()
+        self.assertEqual(0, services.get_unread_count(self.user))
+
+        notification.date_read = None
+        notification.save()
+        self.assertEqual(1, services.get_unread_count(self.user))
+        notification.delete()
+        self.assertEqual(0, services.get_unread_count(self.user))
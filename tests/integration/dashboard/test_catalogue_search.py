@@ -0,0 +1,78 @@
+from unittest import skipUnless
+
+from django.conf import settings
+from django.db import connection
+from django.test import TestCase, override_settings
+
+from oscar.apps.catalogue.models import Product
+from oscar.apps.dashboard.catalogue.search import (
+    PostgresProductSearchBackend, PrefixProductSearchBackend,
+    ProductSearchBackend, get_product_search_backend)
+from oscar.test.factories import create_product
+
+
+class TestProductSearchBackend(TestCase):
+    backend_class = ProductSearchBackend
+
+    def setUp(self):
+        self.backend = self.backend_class()
+        self.parent = create_product(
+            title='Blue T-Shirt', upc='1234', structure='parent')
+        self.child = create_product(
+            title='Small', upc='12345', parent=self.parent)
+        self.standalone = create_product(title='Red Shirt', upc='5123')
+
+    def search(self, **kwargs):
+        return set(self.backend.search(Product.browsable.all(), **kwargs))
+
+    def test_returns_exact_upc_matches(self):
+        self.assertEqual({self.parent}, self.search(upc='1234'))
+
+    def test_returns_parents_of_matching_children(self):
+        self.assertEqual({self.parent}, self.search(upc='12345'))
+
+    def test_matches_upc_substrings(self):
+        self.assertEqual({self.parent, self.standalone}, self.search(upc='123'))
+
+    def test_matches_title_substrings(self):
+        self.assertEqual(
+            {self.parent, self.standalone}, self.search(title='shirt'))
+
+    def test_combines_upc_and_title(self):
+        self.assertEqual(
+            {self.standalone}, self.search(upc='5123', title='red'))
+
+
+class TestPrefixProductSearchBackend(TestProductSearchBackend):
+    backend_class = PrefixProductSearchBackend
+
+    def test_matches_upc_substrings(self):
+        self.assertEqual({self.parent}, self.search(upc='123'))
+
+    def test_matches_title_substrings(self):
+        self.assertEqual({self.standalone}, self.search(title='red'))
+        self.assertEqual(set(), self.search(title='shirt'))
+
+
+@skipUnless(connection.vendor == 'postgresql'
+            and 'django.contrib.postgres' in settings.INSTALLED_APPS,
+            "Requires PostgreSQL and django.contrib.postgres")
+class TestPostgresProductSearchBackend(TestPrefixProductSearchBackend):
+    backend_class = PostgresProductSearchBackend
+
+    def test_matches_title_substrings(self):
+        self.assertEqual(
+            {self.parent, self.standalone}, self.search(title='shirt'))
+
+
+class TestGetProductSearchBackend(TestCase):
+
+    def test_defaults_to_substring_matching(self):
+        self.assertIsInstance(
+            get_product_search_backend(), ProductSearchBackend)
+
+    @override_settings(OSCAR_DASHBOARD_PRODUCT_SEARCH_BACKEND=(
+        'oscar.apps.dashboard.catalogue.search.PrefixProductSearchBackend'))
+    def test_can_be_configured(self):
+        self.assertIsInstance(
+            get_product_search_backend(), PrefixProductSearchBackend)
@@ -1,8 +1,12 @@
-from django.test import TestCase
+from unittest import mock
 
+from django.test import TestCase, override_settings
+
+from oscar.apps.dashboard import nav
 from oscar.apps.dashboard.menu import get_nodes
 from oscar.apps.dashboard.nav import default_access_fn
 from oscar.test.factories import UserFactory
+from oscar.test.testcases import add_permissions
 
 
 class DashboardAccessFunctionTestCase(TestCase):
@@ -33,3 +37,43 @@ class DashboardNavTestCase(TestCase):
     def test_non_staff_user_has_empty_menu(self):
         menu = get_nodes(UserFactory())
         self.assertEqual(menu, [])
+
+    def test_users_with_the_same_permissions_share_a_menu(self):
+        menu = get_nodes(UserFactory(is_staff=True))
+        self.assertIs(menu, get_nodes(UserFactory(is_staff=True)))
+
+    def test_menu_depends_on_permissions(self):
+        partner_user = UserFactory()
+        add_permissions(partner_user, ['partner.dashboard_access'])
+        menu = get_nodes(partner_user)
+        self.assertTrue(menu)
+        self.assertNotEqual(
+            len(menu), len(get_nodes(UserFactory(is_staff=True))))
+        self.assertEqual([], get_nodes(UserFactory()))
+
+    def test_urls_are_only_resolved_once(self):
+        get_nodes(UserFactory(is_staff=True))
+        with mock.patch.object(nav, 'resolve') as resolve:
+            get_nodes(UserFactory(is_staff=True))
+            default_access_fn(UserFactory(is_staff=True), 'dashboard:index')
+        self.assertFalse(resolve.called)
+
+    @override_settings(OSCAR_DASHBOARD_NAVIGATION=[
+        {
+            'label': 'Dashboard',
+            'url_name': 'dashboard:index',
+        },
+        {
+            'label': 'Custom',
+            'url_name': 'dashboard:index',
+            'access_fn': lambda user, *args: user.username == 'custom',
+        },
+    ])
+    def test_custom_access_functions_are_evaluated_per_user(self):
+        custom_user = UserFactory(is_staff=True, username='custom')
+        self.assertEqual(
+            ['Dashboard', 'Custom'],
+            [node.label for node in get_nodes(custom_user)])
+        self.assertEqual(
+            ['Dashboard'],
+            [node.label for node in get_nodes(UserFactory(is_staff=True))])
@@ -1,7 +1,10 @@
+import datetime
 from decimal import Decimal as D
+from unittest import mock
 from unittest.mock import Mock
 
 from django.test import TestCase
+from django.utils import timezone
 
 from oscar.apps.offer import models
 from oscar.apps.offer.results import OfferApplications
@@ -43,6 +46,32 @@ class TestOfferApplicator(TestCase):
         applications = self.basket.offer_applications.applications
         self.assertEqual(1, applications[1]['freq'])
 
+    def test_checks_lines_against_ranges_once_per_evaluation(self):
+        for price in (D('100'), D('120'), D('150')):
+            add_product(self.basket, price, 2)
+        offer = ConditionalOfferFactory(
+            pk=1, condition=self.condition, benefit=self.benefit)
+        range_class = type(self.condition.range)
+        with mock.patch.object(range_class, 'contains_product', autospec=True,
+                               return_value=True) as condition_check, \
+                mock.patch.object(range_class, 'contains', autospec=True,
+                                  return_value=True) as benefit_check:
+            self.applicator.apply_offers(self.basket, [offer])
+
+        applications = self.basket.offer_applications.applications
+        self.assertEqual(6, applications[1]['freq'])
+        # Each of the three lines is only checked once by the condition and
+        # once by the benefit, however often the offer is applied.
+        self.assertEqual(3, condition_check.call_count)
+        self.assertEqual(3, benefit_check.call_count)
+
+    def test_removes_the_evaluation_context_after_applying_offers(self):
+        add_product(self.basket, D('100'), 1)
+        offer = ConditionalOfferFactory(
+            pk=1, condition=self.condition, benefit=self.benefit)
+        self.applicator.apply_offers(self.basket, [offer])
+        self.assertIsNone(self.basket.offer_evaluation_context)
+
     def test_uses_offers_in_order_of_descending_priority(self):
         self.applicator.get_site_offers = Mock(
             return_value=[models.ConditionalOffer(
@@ -86,3 +115,81 @@ class TestOfferApplicationsWrapper(TestCase):
 
     def test_aggregates_results_from_same_offer(self):
         self.assertEqual(1, len(list(self.applications)))
+
+
+class TestSiteOfferCache(TestCase):
+
+    def setUp(self):
+        rng = RangeFactory(includes_all_products=True)
+        self.condition = ConditionFactory(
+            range=rng, type=ConditionFactory._meta.model.VALUE,
+            value=D('100'), proxy_class=None)
+        self.benefit = BenefitFactory(
+            range=rng, type=BenefitFactory._meta.model.FIXED,
+            value=D('10'), max_affected_items=1)
+        self.offer = ConditionalOfferFactory(
+            name="Site offer", condition=self.condition, benefit=self.benefit)
+
+    def test_serves_hydrated_offers_without_queries(self):
+        Applicator().get_site_offers()
+        with self.assertNumQueries(0):
+            offers = Applicator().get_site_offers()
+            self.assertEqual(1, len(offers))
+            offer = offers[0]
+            self.assertTrue(offer.condition.range.includes_all_products)
+            self.assertEqual(offer.condition.proxy(), offer.condition)
+            self.assertEqual(offer.benefit.proxy(), offer.benefit)
+
+    def test_applies_cached_offers(self):
+        basket = BasketFactory()
+        add_product(basket, D('100'), 1)
+        Applicator().apply(basket)
+        basket.reset_offer_applications()
+
+        Applicator().apply(basket)
+        self.assertEqual(D('10'), basket.total_discount)
+
+    def test_does_not_share_instances_between_calls(self):
+        first = Applicator().get_site_offers()[0]
+        second = Applicator().get_site_offers()[0]
+        self.assertIsNot(first, second)
+        self.assertIsNot(first.condition, second.condition)
+        self.assertIsNot(first.condition.range, second.condition.range)
+
+    def test_is_invalidated_when_an_offer_is_saved(self):
+        Applicator().get_site_offers()
+        self.offer.suspend()
+        self.assertEqual([], Applicator().get_site_offers())
+
+    def test_is_not_invalidated_when_usage_is_recorded(self):
+        Applicator().get_site_offers()
+        self.offer.record_usage({'freq': 1, 'discount': D('10')})
+        with self.assertNumQueries(0):
+            Applicator().get_site_offers()
+
+    def test_is_invalidated_when_usage_of_limited_offers_is_recorded(self):
+        self.offer.max_global_applications = 1
+        self.offer.save()
+        Applicator().get_site_offers()
+        self.offer.record_usage({'freq': 1, 'discount': D('10')})
+        self.assertEqual([], Applicator().get_site_offers())
+
+    def test_is_invalidated_when_a_condition_is_saved(self):
+        Applicator().get_site_offers()
+        self.condition.value = D('50')
+        self.condition.save()
+        offer = Applicator().get_site_offers()[0]
+        self.assertEqual(D('50'), offer.condition.value)
+
+    def test_picks_up_offers_once_their_start_date_is_reached(self):
+        start = timezone.now() + datetime.timedelta(days=1)
+        ConditionalOfferFactory(
+            name="Upcoming offer", condition=self.condition,
+            benefit=self.benefit, start_datetime=start)
+        self.assertEqual(1, len(Applicator().get_site_offers()))
+
+        with mock.patch('oscar.apps.offer.cache.now',
+                        return_value=start), \
+                mock.patch('oscar.apps.offer.managers.now',
+                           return_value=start):
+            self.assertEqual(2, len(Applicator().get_site_offers()))
@@ -222,3 +222,77 @@ class TestRangeModel(TestCase):
         first_range.name = "Bar"
         first_range.save()
         models.Range.objects.create(name="Foo")
+
+
+class TestRangeIndex(TestCase):
+
+    def setUp(self):
+        self.range = models.Range.objects.create(name="Indexed range")
+        self.category = catalogue_models.Category.add_root(name="root")
+        self.product = create_product()
+        catalogue_models.ProductCategory.objects.create(
+            product=self.product, category=self.category)
+        self.range.included_categories.add(self.category)
+
+    def test_membership_checks_do_not_query_once_indexed(self):
+        self.assertTrue(self.range.contains_product(self.product))
+
+        product = catalogue_models.Product.objects.select_related(
+            'product_class').prefetch_related('categories').get(
+                pk=self.product.pk)
+        fresh_range = models.Range.objects.get(pk=self.range.pk)
+        with self.assertNumQueries(0):
+            self.assertTrue(fresh_range.contains_product(product))
+
+    def test_looks_up_product_categories_once_per_range(self):
+        self.assertTrue(self.range.contains_product(self.product))
+
+        fresh_range = models.Range.objects.get(pk=self.range.pk)
+        with self.assertNumQueries(1):
+            self.assertTrue(fresh_range.contains_product(self.product))
+            self.assertTrue(fresh_range.contains_product(self.product))
+
+    def test_index_stores_category_ids_rather_than_their_products(self):
+        for __ in range(3):
+            product = create_product()
+            catalogue_models.ProductCategory.objects.create(
+                product=product, category=self.category)
+
+        index = self.range.get_index()
+        self.assertEqual(index.category_ids, {self.category.pk})
+        self.assertEqual(index.included_product_ids, frozenset())
+
+    def test_includes_products_of_descendant_categories(self):
+        child_category = self.category.add_child(name="child")
+        product = create_product()
+        catalogue_models.ProductCategory.objects.create(
+            product=product, category=child_category)
+
+        fresh_range = models.Range.objects.get(pk=self.range.pk)
+        self.assertTrue(fresh_range.contains_product(product))
+
+    def test_is_invalidated_when_product_categories_change(self):
+        other_product = create_product()
+        self.assertFalse(self.range.contains_product(other_product))
+
+        catalogue_models.ProductCategory.objects.create(
+            product=other_product, category=self.category)
+        fresh_range = models.Range.objects.get(pk=self.range.pk)
+        self.assertTrue(fresh_range.contains_product(other_product))
+
+    def test_is_invalidated_when_range_products_change(self):
+        other_product = create_product()
+        self.assertFalse(self.range.contains_product(other_product))
+
+        models.RangeProduct.objects.create(
+            range=self.range, product=other_product)
+        fresh_range = models.Range.objects.get(pk=self.range.pk)
+        self.assertTrue(fresh_range.contains_product(other_product))
+
+    def test_is_invalidated_when_products_are_excluded(self):
+        self.assertTrue(self.range.contains_product(self.product))
+
+        self.range.excluded_products.add(self.product)
+        self.assertFalse(self.range.contains_product(self.product))
+        fresh_range = models.Range.objects.get(pk=self.range.pk)
+        self.assertFalse(fresh_range.contains_product(self.product))
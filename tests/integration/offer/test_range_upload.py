@@ -0,0 +1,114 @@
+import os
+import tempfile
+from io import StringIO
+from unittest import mock
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+
+from oscar.apps.basket.snapshots import BasketSnapshotCache
+from oscar.apps.offer.models import Range, RangeProductFileUpload
+from oscar.test.factories import UserFactory, create_product
+
+
+class TestRangeProductFileUpload(TestCase):
+
+    def setUp(self):
+        self.range = Range.objects.create(name='Uploaded range')
+        self.user = UserFactory()
+
+    def create_upload(self, content):
+        fd, filepath = tempfile.mkstemp()
+        with os.fdopen(fd, 'w') as fh:
+            fh.write(content)
+        self.addCleanup(lambda: os.path.exists(filepath) and os.unlink(filepath))
+        return RangeProductFileUpload.objects.create(
+            range=self.range, uploaded_by=self.user, filepath=filepath,
+            size=len(content))
+
+    def test_adds_products_by_sku_and_upc(self):
+        by_sku = create_product(partner_sku='sku-1')
+        by_upc = create_product(upc='upc-2', partner_sku='sku-2')
+        in_range = create_product(partner_sku='sku-3')
+        self.range.add_product(in_range)
+
+        upload = self.create_upload('sku-1,upc-2\nsku-3 sku-1\nunknown\n')
+        stats = upload.process()
+
+        self.assertEqual(RangeProductFileUpload.PROCESSED, upload.status)
+        self.assertEqual(2, upload.num_new_skus)
+        self.assertEqual(1, upload.num_duplicate_skus)
+        self.assertEqual(1, upload.num_unknown_skus)
+        self.assertEqual(4, stats.num_processed)
+        self.assertEqual(
+            {by_sku, by_upc, in_range}, set(self.range.all_products()))
+
+    def test_readds_excluded_products(self):
+        product = create_product(partner_sku='sku-1')
+        self.range.add_product(product)
+        self.range.remove_product(product)
+        self.assertFalse(self.range.contains_product(product))
+
+        self.create_upload('sku-1').process()
+
+        self.assertTrue(self.range.contains_product(product))
+        self.assertFalse(self.range.excluded_products.exists())
+        self.assertTrue(Range.objects.get(pk=self.range.pk).contains_product(
+            product))
+
+    def test_reports_skus_matching_several_products(self):
+        create_product(partner_sku='shared', partner_name='Partner 1')
+        create_product(partner_sku='shared', partner_name='Partner 2')
+        stats = self.create_upload('shared').process()
+        self.assertEqual(2, stats.num_new)
+        self.assertEqual({'shared'}, stats.duplicate_skus)
+
+    def test_reports_progress_per_chunk(self):
+        for i in range(5):
+            create_product(partner_sku='sku-%d' % i)
+        progress = mock.Mock()
+        upload = self.create_upload(' '.join('sku-%d' % i for i in range(5)))
+        upload.process(chunk_size=2, progress=progress)
+        self.assertEqual(3, progress.call_count)
+        self.assertEqual(5, upload.num_new_skus)
+
+    def test_number_of_queries_does_not_depend_on_the_number_of_products(self):
+        skus = ['sku-%d' % i for i in range(10)]
+        for sku in skus:
+            create_product(partner_sku=sku)
+
+        with CaptureQueriesContext(connection) as few_products:
+            self.create_upload(' '.join(skus[:2])).process()
+        with CaptureQueriesContext(connection) as many_products:
+            self.create_upload(' '.join(skus[2:])).process()
+        self.assertEqual(len(few_products), len(many_products))
+
+    @override_settings(OSCAR_BASKET_SNAPSHOT_TIMEOUT=60)
+    def test_invalidates_basket_snapshots(self):
+        create_product(partner_sku='sku-1')
+        key = BasketSnapshotCache.catalogue_version_key
+        cache.set(key, 'before-upload', None)
+        self.create_upload('sku-1').process()
+        self.assertNotEqual('before-upload', cache.get(key))
+
+    def test_is_marked_as_failed_if_the_file_cannot_be_read(self):
+        upload = self.create_upload('sku-1')
+        os.unlink(upload.filepath)
+        self.assertIsNone(upload.process())
+        self.assertEqual(RangeProductFileUpload.FAILED, upload.status)
+        self.assertTrue(upload.error_message)
+
+    def test_management_command_processes_pending_uploads(self):
+        product = create_product(partner_sku='sku-1')
+        upload = self.create_upload('sku-1')
+        out = StringIO()
+        call_command('oscar_process_range_uploads', stdout=out)
+
+        upload.refresh_from_db()
+        self.assertEqual(RangeProductFileUpload.PROCESSED, upload.status)
+        self.assertFalse(os.path.exists(upload.filepath))
+        self.assertTrue(self.range.contains_product(product))
+        self.assertIn('1 products added', out.getvalue())
@@ -1,17 +1,20 @@
 from decimal import Decimal as D
 import threading
 import time
+from unittest import mock
 
 import pytest
 from django.http import HttpRequest
 from django.test import TestCase, TransactionTestCase
-from django.test.utils import override_settings
+from django.db import connection
+from django.db.models.signals import post_save
+from django.test.utils import CaptureQueriesContext, override_settings
 from django.contrib.auth.models import AnonymousUser
 
 from oscar.apps.catalogue.models import ProductClass, Product
 from oscar.apps.checkout import calculators
 from oscar.apps.offer.utils import Applicator
-from oscar.apps.order.models import Order
+from oscar.apps.order.models import Line, Order
 from oscar.apps.order.utils import OrderCreator
 from oscar.apps.shipping.methods import Free, FixedPrice
 from oscar.apps.shipping.repository import Repository
@@ -23,6 +26,7 @@ from tests.utils import run_concurrently
 
 Range = get_class('offer.models', 'Range')
 Benefit = get_class('offer.models', 'Benefit')
+StockRecord = get_class('partner.models', 'StockRecord')
 
 
 def place_order(creator, **kwargs):
@@ -140,6 +144,107 @@ class TestPlacingOrderForDigitalGoods(TestCase):
         self.assertTrue(stockrecord.num_allocated is None)
 
 
+class TestBulkLineCreation(TestCase):
+
+    def setUp(self):
+        self.creator = OrderCreator()
+        self.basket = factories.create_basket(empty=True)
+
+    def test_creates_lines_and_line_prices(self):
+        add_product(self.basket, D('12.00'), quantity=2)
+        add_product(self.basket, D('5.00'), quantity=3)
+        order = place_order(self.creator, basket=self.basket, order_number='1234')
+
+        lines = order.lines.all()
+        self.assertEqual([2, 3], [line.quantity for line in lines])
+        for line in lines:
+            prices = line.prices.all()
+            self.assertEqual(1, len(prices))
+            self.assertEqual(line.quantity, prices[0].quantity)
+            self.assertEqual(order, prices[0].order)
+
+    def test_allocates_stock_for_all_lines(self):
+        add_product(self.basket, D('12.00'), quantity=2)
+        add_product(self.basket, D('5.00'), quantity=3)
+        lines = self.basket.all_lines()
+        place_order(self.creator, basket=self.basket, order_number='1234')
+
+        for line in lines:
+            line.stockrecord.refresh_from_db()
+            self.assertEqual(line.quantity, line.stockrecord.num_allocated)
+
+    def test_calls_overridden_stockrecord_allocate(self):
+        add_product(self.basket, D('12.00'), quantity=2)
+        add_product(self.basket, D('5.00'), quantity=3)
+
+        def allocate(stockrecord, quantity):
+            allocated.append((stockrecord.pk, quantity))
+        allocated = []
+        with mock.patch.object(StockRecord, 'allocate', allocate):
+            place_order(self.creator, basket=self.basket, order_number='1234')
+
+        self.assertEqual(
+            sorted((line.stockrecord.pk, line.quantity)
+                   for line in self.basket.all_lines()),
+            sorted(allocated))
+
+    def test_calls_overridden_line_hooks_for_every_line(self):
+        class CustomOrderCreator(OrderCreator):
+            def create_line_attributes(self, order, order_line, basket_line):
+                calls.append(('attributes', basket_line.pk))
+                super().create_line_attributes(order, order_line, basket_line)
+
+            def update_stock_records(self, line):
+                calls.append(('stock', line.pk))
+                super().update_stock_records(line)
+
+        calls = []
+        add_product(self.basket, D('12.00'), quantity=2)
+        add_product(self.basket, D('5.00'), quantity=3)
+        lines = list(self.basket.all_lines())
+        order = place_order(CustomOrderCreator(), basket=self.basket,
+                            order_number='1234')
+
+        self.assertEqual(
+            [(kind, line.pk) for line in lines
+             for kind in ('attributes', 'stock')], calls)
+        self.assertEqual(2, order.lines.count())
+        for line in lines:
+            line.stockrecord.refresh_from_db()
+            self.assertEqual(line.quantity, line.stockrecord.num_allocated)
+
+    def test_sends_save_signals_for_new_lines(self):
+        add_product(self.basket, D('12.00'), quantity=2)
+        add_product(self.basket, D('5.00'), quantity=3)
+        saved = []
+
+        def receiver(sender, instance, created, **kwargs):
+            saved.append((instance.pk, created))
+
+        post_save.connect(receiver, sender=Line)
+        try:
+            order = place_order(self.creator, basket=self.basket, order_number='1234')
+        finally:
+            post_save.disconnect(receiver, sender=Line)
+
+        expected = [(line.pk, True) for line in order.lines.all()]
+        self.assertEqual(expected, saved)
+
+    def test_number_of_writes_does_not_depend_on_number_of_lines(self):
+        def count_writes(num_lines, order_number):
+            basket = factories.create_basket(empty=True)
+            for __ in range(num_lines):
+                add_product(basket, D('12.00'))
+            basket.all_lines()
+            with CaptureQueriesContext(connection) as queries:
+                place_order(self.creator, basket=basket,
+                            order_number=order_number)
+            return len([query for query in queries.captured_queries
+                        if query['sql'].startswith(('INSERT', 'UPDATE'))])
+
+        self.assertEqual(count_writes(1, 'A'), count_writes(5, 'B'))
+
+
 class TestShippingOfferForOrder(TestCase):
 
     def setUp(self):
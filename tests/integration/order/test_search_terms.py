@@ -0,0 +1,116 @@
+from importlib import import_module
+from io import StringIO
+
+from django.apps import apps
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from oscar.apps.order.models import Order, OrderSearchTerm
+from oscar.test.factories import (
+    SourceFactory, SourceTypeFactory, UserFactory, create_basket,
+    create_order, create_product, create_stockrecord)
+
+
+class TestOrderSearchTerms(TestCase):
+
+    def setUp(self):
+        self.user = UserFactory(
+            first_name='Alice', last_name='Smith', email='alice@example.com')
+        product = create_product(title='The Art of War', upc='upc-1')
+        create_stockrecord(product, partner_sku='sku-1', num_in_stock=5)
+        basket = create_basket(empty=True)
+        basket.add_product(product)
+        self.order = create_order(basket=basket, user=self.user)
+
+    def get_terms(self):
+        return set(self.order.search_terms.values_list('field', 'value'))
+
+    def assertFinds(self, field, value):
+        self.assertEqual(
+            [self.order.pk],
+            list(Order.objects.filter(
+                id__in=OrderSearchTerm.get_order_ids(field, value)).values_list(
+                    'pk', flat=True)))
+
+    def test_are_created_when_the_order_is_placed(self):
+        self.assertEqual({
+            ('first_name', 'alice'),
+            ('last_name', 'smith'),
+            ('email', 'alice@example.com'),
+            ('product_title', 'the art of war'),
+            ('upc', 'upc-1'),
+            ('partner_sku', 'sku-1'),
+        }, self.get_terms())
+
+    def test_match_names_and_titles_by_prefix(self):
+        self.assertFinds(OrderSearchTerm.FIRST_NAME, 'ALI')
+        self.assertFinds(OrderSearchTerm.PRODUCT_TITLE, 'the art')
+        self.assertFinds(OrderSearchTerm.UPC, 'upc-1')
+        self.assertFalse(OrderSearchTerm.get_order_ids(
+            OrderSearchTerm.UPC, 'upc').exists())
+
+    def test_are_updated_when_a_line_is_edited(self):
+        line = self.order.lines.get()
+        line.title = 'The Prince'
+        line.save()
+        self.assertIn(('product_title', 'the prince'), self.get_terms())
+        self.assertNotIn(('product_title', 'the art of war'), self.get_terms())
+
+    def test_are_not_rebuilt_when_a_line_status_changes(self):
+        line = self.order.lines.get()
+        with CaptureQueriesContext(connection) as queries:
+            line.status = 'Shipped'
+            line.save()
+        self.assertEqual(1, len([
+            query for query in queries
+            if OrderSearchTerm._meta.db_table in query['sql']]))
+
+    def test_ignore_missing_user_fields(self):
+        # Custom user models may not have names or an email address
+        self.assertEqual(
+            [('first_name', ''), ('last_name', ''), ('email', '')],
+            OrderSearchTerm.get_user_terms(object()))
+
+    def test_include_payment_methods(self):
+        SourceFactory(
+            order=self.order, source_type=SourceTypeFactory(code='visa'))
+        self.assertIn(('payment_method', 'visa'), self.get_terms())
+
+    def test_are_updated_when_the_customer_changes_their_name(self):
+        self.user.last_name = 'Jones'
+        self.user.save()
+        self.assertIn(('last_name', 'jones'), self.get_terms())
+        self.assertNotIn(('last_name', 'smith'), self.get_terms())
+
+    def test_are_not_updated_when_the_customer_logs_in(self):
+        with CaptureQueriesContext(connection) as queries:
+            self.user.save(update_fields=['last_login'])
+        self.assertFalse([
+            query for query in queries
+            if OrderSearchTerm._meta.db_table in query['sql']])
+
+    def test_can_be_rebuilt_with_the_management_command(self):
+        other_order = create_order()
+        OrderSearchTerm.objects.all().delete()
+
+        out = StringIO()
+        call_command(
+            'oscar_update_order_search_terms', batch_size=1, verbosity=2,
+            stdout=out)
+
+        self.assertIn(('upc', 'upc-1'), self.get_terms())
+        self.assertTrue(other_order.search_terms.exists())
+        self.assertIn('Updated 1 orders', out.getvalue())
+        self.assertIn('search terms of 2 orders', out.getvalue())
+
+    def test_are_created_for_existing_orders_by_the_migration(self):
+        migration = import_module(
+            'oscar.apps.order.migrations.0007_populate_ordersearchterm')
+        terms = self.get_terms()
+        OrderSearchTerm.objects.all().delete()
+
+        migration.populate_search_terms(apps, None)
+
+        self.assertEqual(terms, self.get_terms())
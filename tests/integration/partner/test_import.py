@@ -1,11 +1,12 @@
 import os
+import tempfile
 from decimal import Decimal as D
 from django.test import TestCase
 import logging
 
-from oscar.apps.partner.importers import CatalogueImporter
+from oscar.apps.partner.importers import BulkCatalogueImporter, CatalogueImporter
 from oscar.apps.partner.exceptions import ImportingError
-from oscar.apps.catalogue.models import ProductClass, Product
+from oscar.apps.catalogue.models import Category, ProductClass, Product
 from oscar.apps.partner.models import Partner
 from oscar.test.factories import create_product
 
@@ -125,3 +126,67 @@ class ImportWithFlushTest(TestCase):
 
         with self.assertRaises(Product.DoesNotExist):
             Product.objects.get(upc=upc)
+
+
+class BulkImportSmokeTest(ImportSmokeTest):
+
+    def setUp(self):
+        self.importer = BulkCatalogueImporter(logger, batch_size=3)
+        self.importer.handle(TEST_BOOKS_CSV)
+        self.product = Product.objects.get(upc='9780115531446')
+
+    def test_slugs_are_set(self):
+        self.assertEqual('prepare-for-your-practical-driving-test', self.product.slug)
+
+    def test_categories_are_assigned(self):
+        self.assertTrue(Category.objects.exists())
+        for product in Product.objects.all():
+            self.assertEqual(1, product.categories.count())
+
+    def test_statistics_are_collected(self):
+        self.assertEqual(10, self.importer.stats['rows'])
+        self.assertEqual(10, self.importer.stats['new_items'])
+        self.assertEqual(0, self.importer.stats['updated_items'])
+
+
+class BulkImportUpdateTest(TestCase):
+
+    def test_existing_records_are_updated(self):
+        CatalogueImporter(logger).handle(TEST_BOOKS_CSV)
+        product = Product.objects.get(upc='9780115531446')
+        product.title = 'Changed'
+        product.save()
+        StockRecord.objects.filter(partner_sku='9780115531446').update(num_in_stock=100)
+
+        importer = BulkCatalogueImporter(logger)
+        importer.handle(TEST_BOOKS_CSV)
+
+        self.assertEqual(10, Product.objects.count())
+        self.assertEqual(0, importer.stats['new_items'])
+        self.assertEqual(10, importer.stats['updated_items'])
+        product.refresh_from_db()
+        self.assertEqual("Prepare for Your Practical Driving Test", product.title)
+        stockrecord = StockRecord.objects.get(partner_sku='9780115531446')
+        self.assertEqual(6, stockrecord.num_in_stock)
+        self.assertEqual(1, product.categories.count())
+
+    def test_import_uses_a_bounded_number_of_queries(self):
+        importer = BulkCatalogueImporter(logger)
+        # Warm up: create the categories, class and partner
+        importer.handle(TEST_BOOKS_CSV)
+        with self.assertNumQueries(11):
+            importer.handle(TEST_BOOKS_CSV)
+
+    def test_rows_without_a_upc_are_skipped(self):
+        fd, file_path = tempfile.mkstemp(suffix='.csv')
+        with os.fdopen(fd, 'w') as fh:
+            fh.write('Book,Books,"","No UPC",NULL\n'
+                     'Book,Books,"123","With UPC",NULL\n')
+        self.addCleanup(os.unlink, file_path)
+
+        importer = BulkCatalogueImporter(logger)
+        importer.handle(file_path)
+
+        self.assertEqual(1, importer.stats['skipped_rows'])
+        self.assertEqual(['With UPC'], list(
+            Product.objects.values_list('title', flat=True)))
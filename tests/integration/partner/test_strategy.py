@@ -57,6 +57,66 @@ class TestDefaultStrategy(TestCase):
         self.assertTrue(info.availability.is_available_to_buy)
 
 
+class TestFetchForProducts(TestCase):
+
+    def setUp(self):
+        self.strategy = strategy.Default()
+        self.parent = factories.create_product(structure='parent')
+        factories.create_product(parent=self.parent, price=D('10.00'),
+                                 num_in_stock=3)
+        factories.create_product(parent=self.parent)
+        self.products = [
+            factories.create_product(price=D('1.99'), num_in_stock=4)
+            for __ in range(3)]
+        self.products.append(factories.create_product())
+
+    def get_products(self):
+        ids = [product.pk for product in self.products + [self.parent]]
+        return list(models.Product.objects.filter(pk__in=ids))
+
+    def test_returns_purchase_infos_keyed_by_product_id(self):
+        infos = self.strategy.fetch_for_products(self.get_products())
+        self.assertEqual(len(infos), 5)
+        self.assertEqual(D('10.00'), infos[self.parent.pk].price.incl_tax)
+        self.assertEqual(D('1.99'), infos[self.products[0].pk].price.excl_tax)
+        self.assertIsNone(infos[self.products[-1].pk].stockrecord)
+
+    def test_matches_fetching_products_one_by_one(self):
+        infos = self.strategy.fetch_for_products(self.get_products())
+        for product in self.get_products():
+            if product.is_parent:
+                expected = strategy.Default().fetch_for_parent(product)
+            else:
+                expected = strategy.Default().fetch_for_product(product)
+            info = infos[product.pk]
+            self.assertEqual(expected.price.incl_tax, info.price.incl_tax)
+            self.assertEqual(expected.availability.code,
+                             info.availability.code)
+            self.assertEqual(expected.stockrecord, info.stockrecord)
+
+    def test_number_of_queries_does_not_depend_on_number_of_products(self):
+        products = self.get_products()
+        # Product classes, parent product classes, stockrecords, children and
+        # their stockrecords
+        with self.assertNumQueries(5):
+            self.strategy.fetch_for_products(products)
+
+        for __ in range(5):
+            factories.create_product(price=D('1.99'), num_in_stock=4)
+        products = list(models.Product.objects.filter(parent=None))
+        with self.assertNumQueries(5):
+            self.strategy.__class__().fetch_for_products(products)
+
+    def test_memoises_purchase_infos(self):
+        products = self.get_products()
+        infos = self.strategy.fetch_for_products(products)
+        with self.assertNumQueries(0):
+            for product in products:
+                self.assertIs(
+                    infos[product.pk], self.strategy.get_purchase_info(product))
+            self.strategy.fetch_for_products(products)
+
+
 class TestDefaultStrategyForParentProductWhoseVariantsHaveNoStockRecords(TestCase):
 
     def setUp(self):
@@ -0,0 +1,90 @@
+from datetime import timedelta
+from decimal import Decimal as D
+from io import StringIO
+from unittest import mock
+
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils.timezone import now
+from haystack.backends.simple_backend import SimpleSearchBackend
+
+from oscar.apps.catalogue.models import Product
+from oscar.apps.search.indexing import ProductIndexer
+from oscar.test import factories
+
+
+class TestProductIndexer(TestCase):
+
+    def setUp(self):
+        self.documents = []
+
+        def update(backend, index, iterable, commit=True):
+            self.documents.extend(index.full_prepare(obj) for obj in iterable)
+
+        patcher = mock.patch.object(SimpleSearchBackend, 'update', update)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def create_products(self, num_products):
+        products = []
+        for i in range(num_products):
+            product = factories.create_product(
+                title='Product %d' % i, price=D('10.00'), num_in_stock=5)
+            factories.ProductCategoryFactory(product=product)
+            products.append(product)
+        return products
+
+    def test_indexes_products_in_batches(self):
+        self.create_products(5)
+        parent = factories.create_product(structure='parent')
+        factories.create_product(parent=parent, price=D('5.00'))
+
+        progress = mock.Mock()
+        stats = ProductIndexer(batch_size=2).run(progress=progress)
+
+        self.assertEqual(6, stats.total)
+        self.assertEqual(6, stats.num_indexed)
+        self.assertEqual(3, stats.num_batches)
+        self.assertEqual(3, progress.call_count)
+        self.assertEqual(6, len(self.documents))
+
+    def test_prepares_documents(self):
+        product = self.create_products(1)[0]
+        ProductIndexer().run()
+
+        document = self.documents[0]
+        self.assertEqual('Product 0', document['title'])
+        self.assertEqual(
+            [product.categories.get().full_name], document['category'])
+        self.assertEqual(10.0, document['price'])
+        self.assertEqual(5, document['num_in_stock'])
+
+    def test_number_of_queries_does_not_depend_on_the_number_of_products(self):
+        self.create_products(2)
+        with CaptureQueriesContext(connection) as few_products:
+            ProductIndexer().run()
+        self.create_products(8)
+        with CaptureQueriesContext(connection) as many_products:
+            ProductIndexer().run()
+        self.assertEqual(len(few_products), len(many_products))
+
+    def test_can_only_index_recently_updated_products(self):
+        products = self.create_products(3)
+        Product.objects.filter(pk=products[0].pk).update(
+            date_updated=now() - timedelta(days=2))
+
+        stats = ProductIndexer().run(start_date=now() - timedelta(days=1))
+
+        self.assertEqual(2, stats.num_indexed)
+        self.assertEqual(
+            ['Product 1', 'Product 2'],
+            sorted(document['title'] for document in self.documents))
+
+    def test_management_command_reports_stats(self):
+        self.create_products(3)
+        out = StringIO()
+        call_command('oscar_update_product_index', batch_size=2, stdout=out)
+        self.assertIn('Indexed 3 of 3 products (100%)', out.getvalue())
+        self.assertEqual(3, len(self.documents))
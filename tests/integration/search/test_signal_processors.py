@@ -0,0 +1,120 @@
+from decimal import Decimal as D
+from unittest import mock
+
+import haystack
+from django.db import transaction
+from django.test import TestCase, TransactionTestCase, override_settings
+from haystack.backends.simple_backend import SimpleSearchBackend
+
+from oscar.apps.search.signal_processors import (
+    IndexUpdateQueue, QueuedSignalProcessor)
+from oscar.test import factories
+
+
+class BackendMixin(object):
+
+    def setUp(self):
+        self.documents = []
+        self.removed = []
+
+        def update(backend, index, iterable, commit=True):
+            self.documents.extend(index.full_prepare(obj) for obj in iterable)
+
+        def remove(backend, obj_or_string, commit=True):
+            self.removed.append(obj_or_string)
+
+        for name, method in (('update', update), ('remove', remove)):
+            patcher = mock.patch.object(SimpleSearchBackend, name, method)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+
+class TestQueuedSignalProcessor(BackendMixin, TransactionTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.processor = QueuedSignalProcessor(
+            haystack.connections, haystack.connection_router)
+        self.addCleanup(self.processor.teardown)
+
+    def test_queues_changed_products(self):
+        product = factories.create_product(price=D('10.00'))
+        self.assertEqual({product.pk}, self.processor.queue.product_ids)
+
+        stockrecord = product.stockrecords.get()
+        stockrecord.num_in_stock = 3
+        stockrecord.save()
+        self.assertEqual({product.pk}, self.processor.queue.product_ids)
+        self.assertEqual([], self.documents)
+
+    def test_queues_the_parent_of_deleted_child_products(self):
+        parent = factories.create_product(structure='parent')
+        child = factories.create_product(parent=parent, price=D('10.00'))
+        self.processor.queue.clear()
+        child_id = child.pk
+        child.delete()
+        self.assertEqual({parent.pk, child_id},
+                         self.processor.queue.product_ids)
+
+    def test_queues_products_once_the_transaction_is_committed(self):
+        product = factories.create_product()
+        self.processor.queue.clear()
+        with transaction.atomic():
+            factories.ProductCategoryFactory(product=product)
+            self.assertEqual(set(), self.processor.queue.product_ids)
+        self.assertEqual({product.pk}, self.processor.queue.product_ids)
+
+    def test_flushes_the_queue_at_the_end_of_requests(self):
+        product = factories.create_product(price=D('10.00'))
+        self.client.get('/')
+        self.assertEqual(set(), self.processor.queue.product_ids)
+        self.assertEqual([product.title],
+                         [document['title'] for document in self.documents])
+
+
+class TestIndexUpdateQueue(BackendMixin, TestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.queue = IndexUpdateQueue()
+
+    def test_indexes_children_through_their_parents(self):
+        parent = factories.create_product(structure='parent', title='Parent')
+        child = factories.create_product(parent=parent, price=D('5.00'))
+        self.queue.add([child.pk, parent.pk])
+        self.queue.flush()
+        self.assertEqual(['Parent'],
+                         [document['title'] for document in self.documents])
+        self.assertEqual([], self.removed)
+
+    def test_removes_deleted_products(self):
+        product = factories.create_product()
+        product_id = product.pk
+        product.delete()
+        self.queue.add([product_id])
+        self.queue.flush()
+        self.assertEqual([], self.documents)
+        self.assertEqual(['catalogue.product.%s' % product_id], self.removed)
+
+    @override_settings(OSCAR_SEARCH_INDEX_BUFFER_SIZE=2,
+                       OSCAR_SEARCH_INDEX_FLUSH_INTERVAL=60)
+    def test_is_flushed_when_full_at_the_end_of_the_request(self):
+        products = [factories.create_product() for i in range(2)]
+        self.queue.add([products[0].pk])
+        self.queue.add([products[0].pk])
+        self.queue.flush_if_due()
+        self.assertEqual([], self.documents)
+        self.queue.add([products[1].pk])
+        self.assertEqual([], self.documents)
+        self.queue.flush_if_due()
+        self.assertEqual(2, len(self.documents))
+        self.assertEqual(set(), self.queue.product_ids)
+
+    @override_settings(OSCAR_SEARCH_INDEX_FLUSH_INTERVAL=60)
+    def test_is_flushed_once_the_interval_has_passed(self):
+        self.queue.add([factories.create_product().pk])
+        self.queue.flush_if_due()
+        self.assertEqual([], self.documents)
+        self.queue._last_flush -= 60
+        self.queue.flush_if_due()
+        self.assertEqual(1, len(self.documents))
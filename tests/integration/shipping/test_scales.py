@@ -71,3 +71,23 @@ class TestScales(TestCase):
 
         basket.add(product)
         self.assertEqual(D('0.9'), scale.weigh_basket(basket))
+
+    def test_uses_weight_of_parent_product(self):
+        parent = factories.create_product(
+            structure='parent', attributes={'weight': '2'})
+        child = factories.create_product(parent=parent)
+        scale = Scale(attribute_code='weight')
+        self.assertEqual(2, scale.weigh_product(child))
+
+    def test_number_of_queries_does_not_depend_on_number_of_lines(self):
+        basket = factories.create_basket(empty=True)
+        for weight in range(1, 6):
+            basket.add(factories.create_product(
+                attributes={'weight': str(weight)}, price=D('5.00')))
+        basket = Basket.objects.get(pk=basket.pk)
+
+        scale = Scale(attribute_code='weight')
+        # Basket lines and their attributes, product images and the
+        # attribute values
+        with self.assertNumQueries(4):
+            self.assertEqual(15, scale.weigh_basket(basket))
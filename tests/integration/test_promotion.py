@@ -1,6 +1,14 @@
-from django.test import TestCase
+from unittest import mock
+
+from django.db import DatabaseError
+from django.test import TestCase, override_settings
+from django.test.client import RequestFactory
+from django.urls import reverse
 
 from oscar.apps.promotions import models
+from oscar.apps.promotions.clicks import ClickBuffer
+from oscar.apps.promotions.context_processors import promotions
+from oscar.apps.promotions.receivers import click_buffer
 
 
 class PromotionTest(TestCase):
@@ -8,3 +16,119 @@ class PromotionTest(TestCase):
     def test_default_template_name(self):
         promotion = models.Image.objects.create(name="dummy banner")
         self.assertEqual('promotions/image.html', promotion.template_name())
+
+
+class TestPromotionsContextProcessor(TestCase):
+
+    def setUp(self):
+        self.banner = models.Image.objects.create(name="banner")
+        models.PagePromotion.objects.create(
+            content_object=self.banner, page_url='/', position='page')
+        self.factory = RequestFactory()
+
+    def get_context(self, path='/', **params):
+        return promotions(self.factory.get(path, params))
+
+    def test_groups_promotions_by_position(self):
+        context = self.get_context()
+        self.assertEqual([self.banner], context['promotions_page'])
+        self.assertEqual('/', context['url_path'])
+
+    def test_caches_the_promotions_of_a_page(self):
+        self.get_context()
+        with self.assertNumQueries(0):
+            context = self.get_context()
+        self.assertEqual([self.banner], context['promotions_page'])
+
+    def test_caches_pages_per_search_query(self):
+        other_banner = models.Image.objects.create(name="other banner")
+        models.KeywordPromotion.objects.create(
+            content_object=other_banner, keyword='shoes', position='right')
+        self.get_context()
+        context = self.get_context(q='shoes')
+        self.assertEqual([other_banner], context['promotions_right'])
+        self.assertNotIn('promotions_right', self.get_context(q='hats'))
+
+    def test_is_invalidated_when_a_promotion_changes(self):
+        self.get_context()
+        self.banner.name = "new banner"
+        self.banner.save()
+        context = self.get_context()
+        self.assertEqual("new banner", context['promotions_page'][0].name)
+
+    @override_settings(OSCAR_PROMOTIONS_CACHE_TIMEOUT=0)
+    def test_cache_can_be_disabled(self):
+        self.get_context()
+        with self.assertNumQueries(2):
+            self.get_context()
+
+
+class TestClickBuffer(TestCase):
+
+    def setUp(self):
+        self.banner = models.Image.objects.create(
+            name="banner", link_url='/offers/')
+        self.page_promotion = models.PagePromotion.objects.create(
+            content_object=self.banner, page_url='/', position='page')
+        self.buffer = ClickBuffer()
+
+    def test_adds_clicks_to_the_stored_count_when_flushed(self):
+        models.PagePromotion.objects.filter(
+            pk=self.page_promotion.pk).update(clicks=10)
+        for __ in range(3):
+            self.buffer.record_click(self.page_promotion)
+        self.page_promotion.refresh_from_db()
+        self.assertEqual(10, self.page_promotion.clicks)
+
+        # A savepoint, the update and its release
+        with self.assertNumQueries(3):
+            self.buffer.flush()
+        self.page_promotion.refresh_from_db()
+        self.assertEqual(13, self.page_promotion.clicks)
+
+    def test_updates_promotions_with_the_same_count_together(self):
+        other_promotion = models.PagePromotion.objects.create(
+            content_object=self.banner, page_url='/other/', position='page')
+        keyword_promotion = models.KeywordPromotion.objects.create(
+            content_object=self.banner, keyword='shoes', position='page')
+        for linked_promotion in (self.page_promotion, other_promotion,
+                                 keyword_promotion, keyword_promotion):
+            self.buffer.record_click(linked_promotion)
+
+        # One update per model, within a savepoint
+        with self.assertNumQueries(4):
+            self.buffer.flush()
+        self.assertEqual([1, 1], list(models.PagePromotion.objects.values_list(
+            'clicks', flat=True)))
+        keyword_promotion.refresh_from_db()
+        self.assertEqual(2, keyword_promotion.clicks)
+
+    @override_settings(OSCAR_PROMOTIONS_CLICKS_BUFFER_SIZE=2)
+    def test_is_flushed_when_full(self):
+        self.buffer.record_click(self.page_promotion)
+        self.buffer.record_click(self.page_promotion)
+        self.page_promotion.refresh_from_db()
+        self.assertEqual(2, self.page_promotion.clicks)
+        self.assertEqual(0, self.buffer.num_items)
+
+    def test_keeps_clicks_if_writing_them_fails(self):
+        self.buffer.record_click(self.page_promotion)
+        with mock.patch.object(models.PagePromotion._default_manager,
+                               'filter', side_effect=DatabaseError):
+            self.buffer.flush()
+        self.assertEqual(1, self.buffer.num_items)
+
+        self.buffer.record_click(self.page_promotion)
+        self.buffer.flush()
+        self.page_promotion.refresh_from_db()
+        self.assertEqual(2, self.page_promotion.clicks)
+
+    def test_click_view_records_clicks_at_the_end_of_the_request(self):
+        url = reverse('promotions:page-click', kwargs={
+            'page_promotion_id': self.page_promotion.pk})
+        response = self.client.get(url)
+        self.assertRedirects(
+            response, '/offers/', fetch_redirect_response=False)
+        self.page_promotion.refresh_from_db()
+        self.assertEqual(1, self.page_promotion.clicks)
+        self.assertEqual(0, click_buffer.num_items)
@@ -2,8 +2,12 @@ import pytest
 import datetime
 from decimal import Decimal as D
 
+from unittest import mock
+
 from django.core import exceptions
+from django.db import IntegrityError, connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
 from django.utils.timezone import utc
 
 from oscar.apps.voucher.models import Voucher
@@ -134,3 +138,39 @@ class TestVoucherSet(object):
         voucher = voucherset.vouchers.first()
         voucher.record_usage(order, user)
         assert voucherset.num_orders == 1
+
+    def test_generates_vouchers_in_batches(self):
+        voucherset = VoucherSetFactory(count=5)
+        voucherset.count = 12
+        progress = mock.Mock()
+        voucherset.generate_vouchers(batch_size=3, progress=progress)
+
+        assert voucherset.vouchers.count() == 12
+        assert len(set(voucherset.vouchers.values_list('code', flat=True))) == 12
+        assert progress.call_args_list == [
+            mock.call(3, 7), mock.call(6, 7), mock.call(7, 7)]
+        for voucher in voucherset.vouchers.all():
+            assert voucher.code == voucher.code.upper()
+            assert voucher.usage == Voucher.SINGLE_USE
+            assert list(voucher.offers.all()) == [voucherset.offer]
+
+    def test_number_of_queries_does_not_depend_on_the_number_of_vouchers(self):
+        voucherset = VoucherSetFactory(count=1)
+        voucherset.count = 11
+        with CaptureQueriesContext(connection) as few_vouchers:
+            voucherset.generate_vouchers()
+        voucherset.count = 61
+        with CaptureQueriesContext(connection) as many_vouchers:
+            voucherset.generate_vouchers()
+        assert voucherset.vouchers.count() == 61
+        assert len(few_vouchers) == len(many_vouchers)
+
+    def test_gives_up_generating_vouchers_after_repeated_collisions(self):
+        voucherset = VoucherSetFactory(count=1)
+        voucherset.count = 3
+        with mock.patch.object(Voucher.objects, 'bulk_create',
+                               side_effect=IntegrityError) as bulk_create:
+            with pytest.raises(IntegrityError):
+                voucherset.generate_vouchers(max_retries=2)
+        assert bulk_create.call_count == 3
+        assert voucherset.vouchers.count() == 1
@@ -1,5 +1,10 @@
 
-from oscar.apps.voucher.utils import generate_code
+from unittest import mock
+
+import pytest
+
+from oscar.apps.voucher.utils import generate_code, get_unused_codes
+from oscar.test.factories import VoucherFactory
 
 
 def test_generate_code():
@@ -18,3 +23,15 @@ def test_generate_code():
     result = generate_code(length=16, group_length=16, separator=' ')
     assert len(result) == 16
     assert result.count(' ') == 0
+
+
+@pytest.mark.django_db
+def test_get_unused_codes():
+    codes = get_unused_codes(25, length=4, group_length=4, batch_size=10)
+    assert len(codes) == 25
+    assert len(set(codes)) == 25
+
+    VoucherFactory(code=codes[0])
+    with mock.patch('oscar.apps.voucher.utils.generate_code',
+                    side_effect=codes[:2]):
+        assert get_unused_codes(1) == [codes[1]]
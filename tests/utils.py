@@ -1,7 +1,10 @@
 import queue
 import threading
+from contextlib import contextmanager
+from unittest import mock
 
 from django.db import connection
+from django.db.backends.utils import CursorWrapper
 
 
 def run_concurrently(fn, kwargs=None, num_threads=5):
@@ -34,3 +37,20 @@ def run_concurrently(fn, kwargs=None, num_threads=5):
     # Retrieve exceptions
     exceptions = [exceptions.get(block=False) for i in range(num_threads)]
     return [exc for exc in exceptions if exc is not None]
+
+
+@contextmanager
+def count_query_params():
+    """
+    Yields a list that receives the number of parameters of every query
+    executed within the context
+    """
+    param_counts = []
+    execute = CursorWrapper.execute
+
+    def counting_execute(cursor, sql, params=None):
+        param_counts.append(len(params or ()))
+        return execute(cursor, sql, params)
+
+    with mock.patch.object(CursorWrapper, 'execute', counting_execute):
+        yield param_counts